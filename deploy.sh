@@ -22,7 +22,7 @@ echo -e "${CYAN}Starting Deployment Pipeline...${NC}"
 # ==========================================
 # 1. BUILD
 # ==========================================
-echo -e "${GREEN}[1/4] Building Docker Images...${NC}"
+echo -e "${GREEN}[1/5] Building Docker Images...${NC}"
 
 # Build Backend (Force AMD64 for the server)
 echo "Building Backend..."
@@ -37,7 +37,7 @@ if [ $? -ne 0 ]; then echo "Frontend build failed"; exit 1; fi
 # ==========================================
 # 2. PUSH
 # ==========================================
-echo -e "${GREEN}[2/4] Pushing Images to Docker Hub...${NC}"
+echo -e "${GREEN}[2/5] Pushing Images to Docker Hub...${NC}"
 
 echo "Pushing Backend..."
 docker push $IMG_BACKEND
@@ -50,7 +50,7 @@ if [ $? -ne 0 ]; then echo "Frontend push failed"; exit 1; fi
 # ==========================================
 # 3. CONFIGURE REMOTE SERVER
 # ==========================================
-echo -e "${GREEN}[3/4] Updating Configuration on Remote Server...${NC}"
+echo -e "${GREEN}[3/5] Updating Configuration on Remote Server...${NC}"
 
 # Create directory on VM if it doesn't exist
 ssh $NETID@$VM_HOST "mkdir -p $PROJECT_DIR"
@@ -59,9 +59,25 @@ ssh $NETID@$VM_HOST "mkdir -p $PROJECT_DIR"
 scp docker-compose.yml .env $NETID@$VM_HOST:$PROJECT_DIR/
 
 # ==========================================
-# 4. DEPLOY
+# 4. PRE-DEPLOY CHECKS
 # ==========================================
-echo -e "${GREEN}[4/4] Restarting Containers on Remote Server...${NC}"
+echo -e "${GREEN}[4/5] Checking the Database Against the New Image...${NC}"
+
+# The backend runs migrate on every start (restart: always), so a migration that cannot apply
+# would keep it restarting. Check with the new image while the old containers still serve.
+ssh $NETID@$VM_HOST "cd $PROJECT_DIR && docker-compose pull && docker-compose run --rm backend python manage.py merge_authors --check"
+if [ $? -ne 0 ]; then
+    echo "Pre-deploy check failed; the running containers were left untouched."
+    echo "Review and merge the duplicate authors listed above, then deploy again:"
+    echo "  ssh $NETID@$VM_HOST \"cd $PROJECT_DIR && docker-compose run --rm backend python manage.py merge_authors --dry-run\""
+    echo "  ssh $NETID@$VM_HOST \"cd $PROJECT_DIR && docker-compose run --rm backend python manage.py merge_authors\""
+    exit 1
+fi
+
+# ==========================================
+# 5. DEPLOY
+# ==========================================
+echo -e "${GREEN}[5/5] Restarting Containers on Remote Server...${NC}"
 
 # Run docker-compose on the VM
 ssh $NETID@$VM_HOST "cd $PROJECT_DIR && docker-compose down && docker-compose up -d --pull always"
@@ -42,8 +42,27 @@ INSTALLED_APPS = [
     'corsheaders',
     'bookapp',
     "rest_framework",
+    "adrf",
 ]
 
+# Serve the read-heavy GET endpoints (books/, sale/get_all, sale totals, grouped payments) with
+# their async views. Only worth it under ASGI (gunicorn.conf.py's uvicorn mode turns it on);
+# under WSGI every async view would run in its own event loop.
+ASYNC_READ_VIEWS = os.environ.get("DJANGO_ASYNC_VIEWS", "False") == "True"
+
+# JSON in and out through orjson (same output as DRF's JSONRenderer, see bookapp/renderers.py)
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "bookapp.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "bookapp.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -101,6 +120,18 @@ CSRF_TRUSTED_ORIGINS = [
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
+#
+# Connection reuse (each gunicorn worker process has its own connections):
+#   DB_POOL=True         psycopg 3 connection pool per worker (DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE
+#                        connections; a request waits up to DB_POOL_TIMEOUT seconds for a free one;
+#                        idle extras close after DB_POOL_MAX_IDLE, every connection is recycled
+#                        after DB_POOL_MAX_LIFETIME seconds)
+#   otherwise            one persistent connection per worker, kept for DB_CONN_MAX_AGE seconds
+#                        (0 = reconnect on every request, the old behaviour)
+# DB_CONN_HEALTH_CHECKS re-validates a reused connection before a request uses it, so a database
+# restart costs one reconnect instead of failed requests.
+DB_POOL = os.environ.get("DB_POOL", "False") == "True"
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -109,9 +140,39 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
         "HOST": os.environ.get("POSTGRES_HOST"),
         "PORT": os.environ.get("POSTGRES_PORT"),
+        # pooled connections are returned to the pool after each request instead
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "True") == "True",
     }
 }
 
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),
+            "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", "3600")),
+        },
+    }
+
+# Cache (author detail stats, services/author_stats.py):
+#   DJANGO_CACHE_BACKEND=db  one cache table in Postgres shared by every gunicorn worker and the
+#                            import worker, so a write's invalidation reaches all of them (needs
+#                            `manage.py createcachetable`, run at container start)
+#   otherwise (locmem)       a private cache per process; other workers keep serving an entry
+#                            until it expires, so stats are only as fresh as AUTHOR_STATS_TTL (30s)
+if os.environ.get("DJANGO_CACHE_BACKEND", "locmem") == "db":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -150,6 +211,22 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Uploaded files (sales import jobs). Must be shared by the web and worker containers.
+MEDIA_URL = 'media/'
+MEDIA_ROOT = os.environ.get('DJANGO_MEDIA_ROOT', BASE_DIR / 'media')
+
+# A sales import job (sale/import) whose worker has not written progress for this many seconds
+# is presumed dead and the next worker reclaims it, resuming after the last committed chunk.
+# Keep it above the longest gap between progress writes: one chunk, or a whole .csv import.
+SALE_IMPORT_STALE_SECONDS = int(os.environ.get('SALE_IMPORT_STALE_SECONDS', '600'))
+
+# Idempotency-Key support on sale creation endpoints: how long a stored response can be replayed.
+# Expired keys are removed by `manage.py purge_idempotency_keys`.
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+# A request still running after this many seconds is presumed dead (e.g. its worker was killed)
+# and a retry with the same key takes it over. Keep it above the longest sale/createmany.
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', '300'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
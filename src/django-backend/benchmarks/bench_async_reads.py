@@ -0,0 +1,188 @@
+"""
+Read throughput under many concurrent clients: WSGI (gthread workers, sync views) vs ASGI
+(uvicorn workers, async read views).
+
+Not part of the default test run (file name does not match pytest.ini's python_files).
+Run explicitly against the dev database container:
+
+    pytest benchmarks/bench_async_reads.py -s
+
+Seeds a small catalog into the test database, then for each mode starts gunicorn with
+gunicorn.conf.py (GUNICORN_WORKER_CLASS=gthread / uvicorn) on a local port, pointed at that
+database through the POSTGRES_* variables, and keeps BENCH_CLIENTS (default 200) keep-alive
+clients busy for BENCH_SECONDS (default 10) per endpoint. Prints requests/sec and p50/p95
+latency per mode and endpoint. Both modes get BENCH_WORKERS (default 2) worker processes;
+the uvicorn mode is skipped when uvicorn-worker or psycopg_pool is not installed.
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+
+from bookapp.models import Author, AuthorBook, Book, Sale
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+BENCH_CLIENTS = int(os.environ.get("BENCH_CLIENTS", "200"))
+BENCH_SECONDS = float(os.environ.get("BENCH_SECONDS", "10"))
+BENCH_WORKERS = os.environ.get("BENCH_WORKERS", "2")
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def session_cookie():
+    user = User.objects.create_user(username="bench", password="pass12345")
+    author = Author.objects.create(name="Bench Author")
+    books = Book.objects.bulk_create(
+        [Book(title=f"Bench Book {i}", publication_date="2000-01-01", isbn_13=f"{9790000000000 + i}") for i in range(50)]
+    )
+    AuthorBook.objects.bulk_create([AuthorBook(author=author, book=book, royalty_rate=Decimal("0.10")) for book in books])
+    for book in books[:20]:
+        for month in range(1, 7):
+            sale = Sale.objects.create(book=book, date=f"2023-0{month}-01", quantity=3, publisher_revenue=Decimal("30.00"))
+            sale.create_author_sales()
+    client = Client()
+    client.force_login(user)
+    ids = ",".join(str(book.id) for book in books[:20])
+    return client.cookies[settings.SESSION_COOKIE_NAME].value, ids
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(mode, port):
+    db = connection.settings_dict
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "backend.settings",
+        # same key as this process, so the session cookie below is valid on the server
+        "DJANGO_SECRET_KEY": settings.SECRET_KEY,
+        "GUNICORN_WORKER_CLASS": mode,
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": BENCH_WORKERS,
+        "POSTGRES_DB": db["NAME"],
+        "POSTGRES_USER": db["USER"] or "",
+        "POSTGRES_PASSWORD": db["PASSWORD"] or "",
+        "POSTGRES_HOST": db["HOST"] or "",
+        "POSTGRES_PORT": str(db["PORT"] or ""),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--access-logfile", "/dev/null"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"gunicorn ({mode}) did not start")
+
+
+async def _read_response(reader):
+    """Read one response; returns (status, keep_alive)."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    headers = {}
+    for line in head.split(b"\r\n")[1:]:
+        if b":" in line:
+            key, value = line.split(b":", 1)
+            headers[key.strip().lower()] = value.strip().lower()
+    if b"content-length" in headers:
+        await reader.readexactly(int(headers[b"content-length"]))
+    elif headers.get(b"transfer-encoding") == b"chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status, headers.get(b"connection") != b"close"
+
+
+async def _client(port, request, stop_at, timings):
+    writer = None
+    while time.perf_counter() < stop_at:
+        if writer is None:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        start = time.perf_counter()
+        try:
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await _read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # the server dropped an idle or recycled connection; reconnect and retry
+            writer.close()
+            writer = None
+            continue
+        assert status == 200, status
+        timings.append(time.perf_counter() - start)
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def _load(port, path, cookie, seconds):
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Cookie: {settings.SESSION_COOKIE_NAME}={cookie}\r\n\r\n"
+    ).encode()
+    timings = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(port, request, start + seconds, timings) for _ in range(BENCH_CLIENTS)))
+    return timings, time.perf_counter() - start
+
+
+def test_bench_async_reads(session_cookie):
+    cookie, ids = session_cookie
+    endpoints = ("/api/books/?page_size=25", "/api/sale/get_all?page_size=50", f"/api/sale/books/totals?ids={ids}")
+    try:
+        import uvicorn_worker  # noqa: F401
+        import psycopg_pool  # noqa: F401
+        has_asgi = True
+    except ImportError:
+        has_asgi = False
+
+    print()
+    for mode in ("gthread", "uvicorn"):
+        if mode == "uvicorn" and not has_asgi:
+            print(f"{mode:>8}  skipped (needs uvicorn-worker and psycopg_pool)")
+            continue
+        proc = _start_server(mode, port := _free_port())
+        try:
+            for path in endpoints:
+                asyncio.run(_load(port, path, cookie, 1))  # warm up workers, connections and pools
+                timings, elapsed = asyncio.run(_load(port, path, cookie, BENCH_SECONDS))
+                timings.sort()
+                p50 = statistics.median(timings) * 1000
+                p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+                print(
+                    f"{mode:>8}  {path.split('?')[0]:<22} {len(timings) / elapsed:8.1f} req/s"
+                    f"  p50 {p50:8.2f} ms  p95 {p95:8.2f} ms"
+                )
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
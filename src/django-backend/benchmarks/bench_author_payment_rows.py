@@ -0,0 +1,118 @@
+"""
+Row assembly benchmark for the grouped author payments view.
+
+Not part of the default test run (file name does not match pytest.ini's python_files).
+Run explicitly against the dev database container:
+
+    pytest benchmarks/bench_author_payment_rows.py -s
+
+Compares the previous builder (select_related model instances + per-row conversions and
+strftime("%s")) with build_payment_row() over values_list tuples: wall time and peak Python
+memory (tracemalloc) to turn BENCH_ROWS AuthorSale rows (default 100000) into response rows.
+"""
+
+import os
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from bookapp.models import Author, AuthorSale, Book, Sale
+from bookapp.views.author_payments import ROW_FIELDS, ROW_ORDERING, build_payment_row
+
+pytestmark = pytest.mark.django_db
+
+AUTHOR_COUNT = 20
+BENCH_ROWS = int(os.environ.get("BENCH_ROWS", "100000"))
+
+
+@pytest.fixture
+def payment_rows():
+    authors = Author.objects.bulk_create([Author(name=f"Bench Author {i}") for i in range(AUTHOR_COUNT)])
+    books = Book.objects.bulk_create(
+        [
+            Book(title=f"Bench Book {i}", publication_date="2000-01-01", isbn_13=f"{9790000000000 + i}")
+            for i in range(AUTHOR_COUNT)
+        ]
+    )
+    start = date(2020, 1, 1)
+    sales = Sale.objects.bulk_create(
+        [
+            Sale(
+                book=books[i % AUTHOR_COUNT],
+                date=start + timedelta(days=i % 1000),
+                quantity=1 + i % 50,
+                publisher_revenue=Decimal(f"{10 + i % 990}.00"),
+            )
+            for i in range(BENCH_ROWS)
+        ],
+        batch_size=5000,
+    )
+    AuthorSale.objects.bulk_create(
+        [
+            AuthorSale(sale=sale, author=authors[i % AUTHOR_COUNT], royalty_amount=Decimal("1.25"), author_paid=i % 3 == 0)
+            for i, sale in enumerate(sales)
+        ],
+        batch_size=5000,
+    )
+    return {a.id: a.name for a in authors}
+
+
+def _legacy_rows(author_names):
+    # previous loop body: full Author/Sale/Book instances per AuthorSale
+    rows = []
+    for ars in AuthorSale.objects.select_related("author", "sale", "sale__book").order_by("author_id", *ROW_ORDERING):
+        sale = ars.sale
+        rows.append({
+            "sale": {
+                "id": sale.id,
+                "book": sale.book_id,
+                "book_title": sale.book.title if sale.book else "",
+                "date": str(sale.date),
+                "quantity": sale.quantity,
+                "publisher_revenue": str(sale.publisher_revenue),
+            },
+            "author": {
+                "id": ars.author_id,
+                "name": ars.author.name if ars.author else "",
+                "royalty_amount": str(ars.royalty_amount),
+                "paid": bool(ars.author_paid),
+            },
+            "paid": bool(ars.author_paid),
+            "royalty": float(ars.royalty_amount or Decimal("0.00")),
+            "dateKey": int(sale.date.strftime("%s")) if sale and sale.date else 0,
+        })
+    return rows
+
+
+def _tuple_rows(author_names):
+    date_cache = {}
+    return [
+        build_payment_row(values, author_names[values[1]], date_cache)
+        for values in AuthorSale.objects.order_by("author_id", *ROW_ORDERING).values_list(*ROW_FIELDS)
+    ]
+
+
+def _run(label, fn, author_names):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = fn(author_names)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(rows) == BENCH_ROWS
+    print(f"{label:>8} {len(rows):>7} rows  {elapsed:8.2f}s  peak {peak / 2**20:8.1f} MiB")
+    return rows
+
+
+def test_bench_author_payment_rows(payment_rows):
+    print()
+    legacy = _run("models", _legacy_rows, payment_rows)
+    tuples = _run("tuples", _tuple_rows, payment_rows)
+
+    # same payload (dateKey is UTC midnight; strftime("%s") is local time, equal when TZ=UTC)
+    strip = [{**row, "dateKey": None} for row in legacy[:100]]
+    assert strip == [{**row, "dateKey": None} for row in tuples[:100]]
@@ -0,0 +1,103 @@
+"""
+Connection reuse benchmark for cheap endpoints (user/me, books/).
+
+Not part of the default test run (file name does not match pytest.ini's python_files).
+Run explicitly against the dev database container:
+
+    pytest benchmarks/bench_db_connections.py -s
+
+Replays BENCH_REQUESTS (default 300) requests per endpoint the way a gunicorn worker serves
+them (close_old_connections() around every request, as Django's request signals do) under:
+
+    reconnect   CONN_MAX_AGE=0, a new connection per request (previous settings)
+    persistent  CONN_MAX_AGE=60 with health checks
+    pool        psycopg 3 connection pool (skipped when psycopg_pool is not installed)
+
+and prints p50/p95 latency per mode. The handshake cost depends on how the database is reached;
+point POSTGRES_HOST at the database's TCP address (not a local socket) for realistic numbers.
+"""
+
+import os
+import statistics
+import time
+from copy import deepcopy
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+from django.test import Client
+
+from bookapp.models import Book
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+BENCH_REQUESTS = int(os.environ.get("BENCH_REQUESTS", "300"))
+ENDPOINTS = ("/api/user/me", "/api/books/")
+
+MODES = {
+    "reconnect": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+    "persistent": {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True},
+    "pool": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": True, "OPTIONS": {"pool": {"min_size": 1, "max_size": 2}}},
+}
+
+
+@pytest.fixture
+def client():
+    user = User.objects.create_user(username="bench", password="pass12345")
+    Book.objects.bulk_create(
+        [Book(title=f"Bench Book {i}", publication_date="2000-01-01", isbn_13=f"{9790000000000 + i}") for i in range(20)]
+    )
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def _use_mode(original, mode):
+    connection.close()
+    if connection.pool:
+        connection.close_pool()
+    connection.settings_dict.clear()
+    connection.settings_dict.update(deepcopy(original))
+    for key, value in MODES.get(mode, {}).items():
+        if key == "OPTIONS":
+            connection.settings_dict["OPTIONS"] = {**original.get("OPTIONS", {}), **value}
+        else:
+            connection.settings_dict[key] = value
+
+
+def _latencies(client, path):
+    timings = []
+    for _ in range(BENCH_REQUESTS):
+        start = time.perf_counter()
+        close_old_connections()
+        resp = client.get(path)
+        close_old_connections()
+        timings.append(time.perf_counter() - start)
+        assert resp.status_code == 200
+    return timings
+
+
+def test_bench_db_connections(client):
+    try:
+        import psycopg_pool  # noqa: F401
+        has_pool = connection.Database.__name__ == "psycopg"
+    except ImportError:
+        has_pool = False
+
+    original = deepcopy(connection.settings_dict)
+    print()
+    try:
+        for mode in MODES:
+            if mode == "pool" and not has_pool:
+                print(f"{mode:>10}  skipped (needs psycopg 3 and psycopg_pool)")
+                continue
+            _use_mode(original, mode)
+            for path in ENDPOINTS:
+                for _ in range(10):  # warm up (and open the pool)
+                    client.get(path)
+                timings = sorted(_latencies(client, path))
+                p50 = statistics.median(timings) * 1000
+                p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+                print(f"{mode:>10}  {path:<14} p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+    finally:
+        _use_mode(original, None)
@@ -0,0 +1,108 @@
+"""
+JSON render time for 10k-row responses: DRF's JSONRenderer (stdlib json) vs ORJSONRenderer.
+
+Not part of the default test run (file name does not match pytest.ini's python_files).
+Run explicitly against the dev database container:
+
+    pytest benchmarks/bench_json_render.py -s
+
+Builds three BENCH_ROWS-row payloads (default 10000) and times only the render step:
+
+    sales     SaleSerializer output for sale/get_all (Decimal strings, nested author_details)
+    grouped   author/payments/grouped groups built by build_payment_row (100 rows per author)
+    values    raw values() rows with Decimal, date and datetime objects for the encoder
+
+Prints the median of BENCH_REPEATS (default 10) renders per renderer and checks both produce
+the same bytes.
+"""
+
+import os
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from bookapp.models import Author, AuthorBook, Book, Sale
+from bookapp.renderers import ORJSONRenderer
+from bookapp.serializers.sales import SaleSerializer
+from bookapp.views.author_payments import build_payment_row
+
+pytestmark = pytest.mark.django_db
+
+BENCH_ROWS = int(os.environ.get("BENCH_ROWS", "10000"))
+BENCH_REPEATS = int(os.environ.get("BENCH_REPEATS", "10"))
+ROWS_PER_AUTHOR = 100
+
+
+def _sales_payload():
+    authors = Author.objects.bulk_create([Author(name=f"Bench Author {i}") for i in range(2)])
+    books = Book.objects.bulk_create(
+        [Book(title=f"Bench Book {i}", publication_date="2000-01-01", isbn_13=f"{9790000000000 + i}") for i in range(100)]
+    )
+    AuthorBook.objects.bulk_create(
+        [AuthorBook(author=author, book=book, royalty_rate=Decimal("0.10")) for book in books for author in authors]
+    )
+    sales = Sale.objects.bulk_create(
+        [
+            Sale(book=books[i % 100], date=date(2000 + i // 1200, i // 100 % 12 + 1, 1), quantity=i % 7 + 1,
+                 publisher_revenue=Decimal(i % 997) + Decimal("0.99"))
+            for i in range(BENCH_ROWS)
+        ]
+    )
+    for sale in sales:
+        sale.create_author_sales()
+    queryset = Sale.objects.select_related("book").prefetch_related("author_sales__author").order_by("id")
+    return {"count": BENCH_ROWS, "page": 1, "results": SaleSerializer(queryset, many=True).data}
+
+
+def _grouped_payload():
+    date_cache = {}
+    groups = []
+    for author_id in range(BENCH_ROWS // ROWS_PER_AUTHOR):
+        rows = [
+            build_payment_row(
+                (author_id * ROWS_PER_AUTHOR + i, author_id, Decimal("12.34") + i, i % 2, i, i % 50, f"Book {i % 50}",
+                 date(2020, i % 12 + 1, 1), 3, Decimal("123.40") + i),
+                f"Author {author_id}",
+                date_cache,
+            )
+            for i in range(ROWS_PER_AUTHOR)
+        ]
+        groups.append({"author": {"id": author_id, "name": f"Author {author_id}"}, "unpaidTotal": 617.0,
+                       "unpaidCount": 50, "rows": rows, "rows_cursor": None})
+    return {"count": len(groups), "results": groups}
+
+
+def _values_payload():
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"id": i, "date": date(2020, i % 12 + 1, 1), "created": created + timedelta(seconds=i),
+         "publisher_revenue": Decimal(i) / 7, "royalty_amount": Decimal("1.25") * i}
+        for i in range(BENCH_ROWS)
+    ]
+
+
+def _median_ms(renderer, payload):
+    timings = []
+    for _ in range(BENCH_REPEATS):
+        start = time.perf_counter()
+        renderer.render(payload)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def test_bench_json_render():
+    payloads = {"sales": _sales_payload(), "grouped": _grouped_payload(), "values": _values_payload()}
+    print()
+    for name, payload in payloads.items():
+        stock = JSONRenderer().render(payload)
+        assert ORJSONRenderer().render(payload) == stock
+        stdlib_ms = _median_ms(JSONRenderer(), payload)
+        orjson_ms = _median_ms(ORJSONRenderer(), payload)
+        print(
+            f"{name:>8}  {len(stock) / 1e6:5.1f} MB  json {stdlib_ms:8.2f} ms  orjson {orjson_ms:8.2f} ms"
+            f"  ({stdlib_ms / orjson_ms:4.1f}x)"
+        )
@@ -0,0 +1,97 @@
+"""
+Throughput benchmark for sale/createmany.
+
+Not part of the default test run (file name does not match pytest.ini's python_files).
+Run explicitly against the dev database container:
+
+    pytest benchmarks/bench_sales_createmany.py -s
+
+BENCH_ROWS sets the batch sizes for the bulk pipeline (default "1000,10000,20000").
+BENCH_LEGACY_ROWS caps the per-row baseline, which is much slower (default 2000).
+"""
+
+import os
+import time
+from decimal import Decimal
+
+import pytest
+from django.db import transaction
+
+from bookapp.models import Author, AuthorBook, AuthorSale, Book, Sale
+from bookapp.serializers.sales import SaleCreateSerializer
+from bookapp.services.sales_bulk import create_sales_bulk
+
+pytestmark = pytest.mark.django_db
+
+BOOK_COUNT = 200
+AUTHORS_PER_BOOK = 3
+
+
+def _sizes(env_name, default):
+    return [int(part) for part in os.environ.get(env_name, default).split(",") if part.strip()]
+
+
+@pytest.fixture
+def catalog():
+    authors = Author.objects.bulk_create(
+        [Author(name=f"Bench Author {i}") for i in range(BOOK_COUNT * AUTHORS_PER_BOOK)]
+    )
+    books = Book.objects.bulk_create(
+        [
+            Book(title=f"Bench Book {i}", publication_date="2000-01-01", isbn_13=f"{9790000000000 + i}")
+            for i in range(BOOK_COUNT)
+        ]
+    )
+    AuthorBook.objects.bulk_create(
+        [
+            AuthorBook(author=authors[i * AUTHORS_PER_BOOK + j], book=book, royalty_rate=Decimal("0.1000"))
+            for i, book in enumerate(books)
+            for j in range(AUTHORS_PER_BOOK)
+        ]
+    )
+    return books
+
+
+def _rows(books, n):
+    return [
+        {
+            "book": books[i % len(books)].id,
+            "quantity": 1 + i % 50,
+            "publisher_revenue": f"{10 + i % 990}.00",
+            "date": "2023-01-01",
+        }
+        for i in range(n)
+    ]
+
+
+def _legacy_create_many(rows):
+    # previous SaleCreateManyView body: one full serializer (and its queries) per row
+    with transaction.atomic():
+        for row in rows:
+            serializer = SaleCreateSerializer(data=row)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+
+def _bulk_create_many(rows):
+    sale_ids, errors = create_sales_bulk(rows)
+    assert not errors
+
+
+def _run(label, fn, rows):
+    Sale.objects.all().delete()
+    start = time.perf_counter()
+    fn(rows)
+    elapsed = time.perf_counter() - start
+
+    assert Sale.objects.count() == len(rows)
+    assert AuthorSale.objects.count() == len(rows) * AUTHORS_PER_BOOK
+    print(f"{label:>8} {len(rows):>7} rows  {elapsed:8.2f}s  {len(rows) / elapsed:10.0f} rows/s")
+
+
+def test_bench_createmany_throughput(catalog):
+    print()
+    for n in _sizes("BENCH_LEGACY_ROWS", "2000"):
+        _run("per-row", _legacy_create_many, _rows(catalog, n))
+    for n in _sizes("BENCH_ROWS", "1000,10000,20000"):
+        _run("bulk", _bulk_create_many, _rows(catalog, n))
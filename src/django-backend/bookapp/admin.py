@@ -1,9 +1,14 @@
 from django.contrib import admin
-from .models import Author, Book, Sale, AuthorSale, AuthorBook
+from .models import Author, Book, Sale, AuthorSale, AuthorBook, SaleImportJob, IdempotencyKey, PaymentBatch, PaymentLine, AuthorBalance
 
 # Register your models here.
 admin.site.register(Author)
 admin.site.register(Book)
 admin.site.register(Sale)
 admin.site.register(AuthorSale)
-admin.site.register(AuthorBook)
\ No newline at end of file
+admin.site.register(AuthorBook)
+admin.site.register(SaleImportJob)
+admin.site.register(IdempotencyKey)
+admin.site.register(PaymentBatch)
+admin.site.register(PaymentLine)
+admin.site.register(AuthorBalance)
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.sales_csv import SaleCsvImportError, import_sales_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Import sales from a CSV file (columns: book, date, quantity, publisher_revenue) "
+        "via COPY into a staging table and set-based validation/inserts. All-or-nothing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the CSV file.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate only; report errors without writing anything.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], "rb") as fh:
+                result = import_sales_csv(fh, dry_run=options["dry_run"])
+        except OSError as exc:
+            raise CommandError(f"Could not open {options['path']}: {exc}")
+        except SaleCsvImportError as exc:
+            raise CommandError(str(exc))
+
+        for error in result["errors"]:
+            self.stderr.write(f"row {error['index']}: {error['errors']}")
+
+        if result["error_count"]:
+            raise CommandError(
+                f"{result['error_count']} of {result['total_rows']} row(s) failed validation; nothing was imported."
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(f"Dry run: {result['total_rows']} row(s) valid; nothing was written.")
+        else:
+            self.stdout.write(f"Imported {result['created_count']} sale(s).")
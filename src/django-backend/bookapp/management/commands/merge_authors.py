@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ...models import Author
+from ...services.author_merge import AuthorMergeError, find_duplicate_authors, merge_authors
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge duplicate authors into a canonical author. Without --canonical, every group of "
+        "authors whose names differ only by case or spacing is merged into its oldest author."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--canonical", type=int, help="Author id to keep.")
+        parser.add_argument("--duplicates", type=int, nargs="+", help="Author ids to fold into --canonical.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Run the merge and roll it back; prints what would change.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Pre-deploy check: like --dry-run, but exit non-zero when there is anything to merge.",
+        )
+
+    def handle(self, *args, **options):
+        if (options["canonical"] is None) != (options["duplicates"] is None):
+            raise CommandError("--canonical and --duplicates go together.")
+
+        if options["check"] and Author._meta.db_table not in connection.introspection.table_names():
+            self.stdout.write("No authors table yet; nothing to merge.")
+            return
+
+        if options["canonical"] is not None:
+            plan = {options["canonical"]: options["duplicates"]}
+        else:
+            plan = find_duplicate_authors()
+
+        try:
+            result = merge_authors(plan, dry_run=options["dry_run"] or options["check"])
+        except AuthorMergeError as exc:
+            raise CommandError(str(exc)) from exc
+
+        for group in result["groups"]:
+            canonical = group["canonical"]
+            duplicates = ", ".join(f"{d['id']} {d['name']!r}" for d in group["duplicates"])
+            self.stdout.write(f"{canonical['id']} {canonical['name']!r} <- {duplicates}")
+
+        prefix = "Would merge" if result["dry_run"] else "Merged"
+        self.stdout.write(
+            f"{prefix} {result['authors_merged']} author(s) into {len(result['groups'])}: "
+            f"{result['author_books_repointed']} book link(s) moved, {result['author_books_combined']} combined, "
+            f"{result['author_sales_repointed']} royalty row(s) moved, {result['author_sales_combined']} combined, "
+            f"{result['payment_lines_repointed']} payment line(s) moved."
+        )
+        if options["check"] and result["authors_merged"]:
+            # migration 0014 (case-insensitive unique author names) cannot apply until these are merged
+            raise CommandError(
+                "Duplicate authors found; review with `manage.py merge_authors --dry-run` "
+                "and merge them with `manage.py merge_authors` before migrating."
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ...services.idempotency import purge_expired_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = "Delete expired Idempotency-Key records (run periodically, e.g. from cron)."
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_idempotency_keys()
+        self.stdout.write(f"Deleted {deleted} expired idempotency key(s).")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.balances import author_balance_drift, rebuild_author_balances
+
+
+class Command(BaseCommand):
+    help = "Recompute AuthorBalance from AuthorSale (or, with --verify, only report drift)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Compare balances with AuthorSale without changing anything; exits non-zero on drift.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["verify"]:
+            written = rebuild_author_balances()
+            self.stdout.write(f"Rebuilt {written} author balance(s).")
+            return
+
+        drift = author_balance_drift()
+        for author_id, stored, expected in drift:
+            self.stdout.write(
+                f"author {author_id}: stored (earned, paid, unpaid, unpaid_count)={stored}, expected={expected}"
+            )
+        if drift:
+            raise CommandError(f"{len(drift)} author balance(s) out of date; run rebuild_author_balances.")
+        self.stdout.write("All author balances match AuthorSale.")
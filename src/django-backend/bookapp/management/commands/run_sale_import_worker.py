@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...services.sales_bulk import SALE_BULK_CHUNK_SIZE
+from ...services.sales_import import SaleImportJobLost, claim_next_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued sales import jobs (the SaleImportJob table is the queue; no external broker). "
+        "Jobs left running by a dead worker are picked up again after SALE_IMPORT_STALE_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process every queued job and exit instead of polling forever.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=SALE_BULK_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        while True:
+            # long-running process: drop connections that outlived CONN_MAX_AGE or broke
+            close_old_connections()
+
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Sale import {job.id}: started")
+            try:
+                run_import_job(job, chunk_size=options["chunk_size"])
+            except SaleImportJobLost:
+                self.stderr.write(f"Sale import {job.id}: reclaimed by another worker, stopping")
+                continue
+            except Exception as exc:  # recorded on the job; keep serving the queue
+                self.stderr.write(f"Sale import {job.id}: crashed: {exc!r}")
+                continue
+
+            self.stdout.write(
+                f"Sale import {job.id}: {job.status} "
+                f"({job.created_count}/{job.total_rows} created, {job.error_count} errors)"
+            )
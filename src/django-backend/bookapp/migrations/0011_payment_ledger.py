@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookapp', '0010_idempotencykey'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('author', 'Author payout'), ('sale', 'Sale payout'), ('run', 'Payment run')], max_length=16)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('line_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PaymentLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('paid_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='authorsale',
+            index=models.Index(condition=models.Q(('author_paid', False)), fields=['author'], name='authorsale_unpaid_by_author'),
+        ),
+        migrations.AddField(
+            model_name='paymentbatch',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='paymentline',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_lines', to='bookapp.author'),
+        ),
+        migrations.AddField(
+            model_name='paymentline',
+            name='author_sale',
+            field=models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='bookapp.authorsale'),
+        ),
+        migrations.AddField(
+            model_name='paymentline',
+            name='batch',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='bookapp.paymentbatch'),
+        ),
+        migrations.AddField(
+            model_name='paymentline',
+            name='sale',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='bookapp.sale'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentline',
+            index=models.Index(fields=['author', 'paid_at'], name='paymentline_author_paid_at'),
+        ),
+    ]
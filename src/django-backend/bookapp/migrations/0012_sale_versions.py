@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookapp', '0011_payment_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorsale',
+            name='version',
+            field=models.PositiveIntegerField(db_default=1, default=1),
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='version',
+            field=models.PositiveIntegerField(db_default=1, default=1),
+        ),
+    ]
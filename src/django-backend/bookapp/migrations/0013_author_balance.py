@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_balances(apps, schema_editor):
+    AuthorSale = apps.get_model("bookapp", "AuthorSale")
+    AuthorBalance = apps.get_model("bookapp", "AuthorBalance")
+    totals = (
+        AuthorSale.objects
+        .order_by()
+        .values("author_id")
+        .annotate(
+            earned=Sum("royalty_amount"),
+            paid=Sum("royalty_amount", filter=Q(author_paid=True)),
+            unpaid=Sum("royalty_amount", filter=Q(author_paid=False)),
+            unpaid_count=Count("id", filter=Q(author_paid=False)),
+        )
+    )
+    AuthorBalance.objects.bulk_create(
+        (
+            AuthorBalance(
+                author_id=row["author_id"],
+                earned_total=row["earned"] or 0,
+                paid_total=row["paid"] or 0,
+                unpaid_total=row["unpaid"] or 0,
+                unpaid_count=row["unpaid_count"],
+            )
+            for row in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookapp', '0012_sale_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorBalance',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='balance', serialize=False, to='bookapp.author')),
+                ('earned_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('paid_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('unpaid_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('unpaid_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
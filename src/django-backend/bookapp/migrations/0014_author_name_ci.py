@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:14
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_collisions(apps, schema_editor):
+    """
+    Refuse to migrate while authors differ only by case: the new unique index would fail
+    anyway, and this reports which rows to merge first and how. Deploys should run
+    `manage.py merge_authors --check` beforehand (deploy.sh does), since the backend container
+    runs migrate on every start and would otherwise keep restarting on this error.
+    """
+    Author = apps.get_model("bookapp", "Author")
+    collisions = (
+        Author.objects
+        .annotate(name_ci=Lower("name"))
+        .values("name_ci")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .order_by("name_ci")
+    )
+    lines = []
+    for row in collisions:
+        authors = Author.objects.annotate(name_ci=Lower("name")).filter(name_ci=row["name_ci"]).order_by("id")
+        lines.append(", ".join(f"#{a.id} {a.name!r}" for a in authors))
+    if lines:
+        raise RuntimeError(
+            "Cannot add unique_author_name_ci: these authors differ only by case:\n  "
+            + "\n  ".join(lines)
+            + "\nMerge each group into its oldest author, then migrate again:\n"
+            "  python manage.py merge_authors --dry-run   # review what would change\n"
+            "  python manage.py merge_authors\n"
+            "(with docker compose: docker compose run --rm backend python manage.py merge_authors ...)"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookapp', '0013_author_balance'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_collisions, migrations.RunPython.noop),
+        # add the case-insensitive index before dropping the case-sensitive one, so names are
+        # never left without a unique constraint
+        migrations.AddConstraint(
+            model_name='author',
+            constraint=models.UniqueConstraint(Lower('name'), name='unique_author_name_ci', violation_error_message='An author with this name already exists.'),
+        ),
+        migrations.AlterField(
+            model_name='author',
+            name='name',
+            field=models.CharField(max_length=255),
+        ),
+    ]
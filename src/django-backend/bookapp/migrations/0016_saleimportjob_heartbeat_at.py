@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookapp', '0015_idempotency_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saleimportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
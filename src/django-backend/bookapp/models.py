@@ -1,5 +1,11 @@
 # models.py
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Lower
+from django.utils import timezone
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 
 # -----------------------------
@@ -18,10 +24,31 @@ isbn_10_format = RegexValidator(
 
 
 # 1. AUTHOR Table
+class AuthorQuerySet(models.QuerySet):
+    def with_name(self, name):
+        """
+        Case-insensitive exact match on name. Compares LOWER(name) so the lookup is an index
+        scan on unique_author_name_ci (name__iexact compiles to UPPER(...) and cannot use it).
+        """
+        return self.alias(name_ci=Lower("name")).filter(name_ci=Lower(Value(name)))
+
+
 class Author(models.Model):
-    name = models.CharField(max_length=255, unique=True)
+    name = models.CharField(max_length=255)
     bio = models.TextField(blank=True, null=True)
 
+    objects = AuthorQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # case-insensitive uniqueness: "Jane Doe" and "jane doe" are the same author
+            models.UniqueConstraint(
+                Lower("name"),
+                name="unique_author_name_ci",
+                violation_error_message="An author with this name already exists.",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -84,24 +111,28 @@ class Sale(models.Model):
     # Relationships
     authors = models.ManyToManyField(Author, through="AuthorSale", related_name="sales")
 
+    # Optimistic concurrency: bumped by every edit (see services/versioning.py)
+    version = models.PositiveIntegerField(default=1, db_default=1)
+
     def __str__(self):
         return f"{self.quantity} x {self.book.title} on {self.date.strftime('%Y-%m-%d')}"
 
-    def create_author_sales(self, author_royalties={}, author_paid={}):
-        author_books = AuthorBook.objects.filter(book=self.book)
-        for ab in author_books:
-            # Check for override
-            if str(ab.author.id) in author_royalties:
-                royalty_amount = author_royalties[str(ab.author.id)]
-            else:
-                royalty_amount = self.publisher_revenue * ab.royalty_rate
-
-            AuthorSale.objects.create(
-                sale=self,
-                author=ab.author,
-                royalty_amount=royalty_amount,
-                author_paid=author_paid.get(str(ab.author.id), False),
-            )
+    def create_author_sales(self, author_royalties=None, author_paid=None, rates=None):
+        """
+        Allocate royalties for this sale from the book's current AuthorBook rates.
+        Costs one query for the rates (skipped when the caller passes preloaded
+        (author_id, royalty_rate) pairs), one bulk INSERT and one AuthorBalance upsert,
+        regardless of author count.
+        """
+        from .services.balances import record_author_sales
+
+        if rates is None:
+            rates = AuthorBook.objects.filter(book_id=self.book_id).values_list("author_id", "royalty_rate")
+        author_sales = AuthorSale.objects.bulk_create(
+            allocate_author_sales(self, rates, author_royalties, author_paid)
+        )
+        record_author_sales(author_sales)
+        return author_sales
 
 
 # 5. AUTHOR_SALE Table
@@ -111,5 +142,183 @@ class AuthorSale(models.Model):
     royalty_amount = models.DecimalField(max_digits=10, decimal_places=2)
     author_paid = models.BooleanField(default=False)
 
+    # Optimistic concurrency: bumped by override edits and payouts
+    version = models.PositiveIntegerField(default=1, db_default=1)
+
     def __str__(self):
         return f"{self.author.name} paid ${self.royalty_amount} for Sale {self.sale.id}"
+
+    class Meta:
+        indexes = [
+            # unpaid balances only touch unpaid rows, not an author's whole history
+            models.Index(
+                fields=["author"],
+                condition=models.Q(author_paid=False),
+                name="authorsale_unpaid_by_author",
+            ),
+        ]
+
+
+
+# 6. SALE_IMPORT_JOB Table (DB-backed queue for large sales uploads)
+class SaleImportJob(models.Model):
+    STATUS_QUEUED = "queued"
+    STATUS_VALIDATING = "validating"
+    STATUS_IMPORTING = "importing"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_VALIDATING, "Validating"),
+        (STATUS_IMPORTING, "Importing"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    upload = models.FileField(upload_to="sale_imports/")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+
+    # Progress / results
+    total_rows = models.IntegerField(default=0)
+    validated_rows = models.IntegerField(default=0)
+    created_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # first N row errors: [{"index", "errors"}]
+    message = models.TextField(blank=True, default="")  # job-level failure (bad file, crash)
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)  # also identifies the current claim
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # last progress write of the claiming worker
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Sale import {self.id} ({self.status})"
+
+
+
+# 7. IDEMPOTENCY_KEY Table (replayable responses for retried sale creation requests)
+class IdempotencyKey(models.Model):
+    endpoint = models.CharField(max_length=64)
+    key = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64)  # sha256 of user + method + path + body
+
+    # NULL until the first request finishes ("in progress")
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    # start of the in-progress lease; a claim older than IDEMPOTENCY_LEASE_SECONDS belongs to a
+    # request that died (worker killed) and can be taken over by a retry
+    claimed_at = models.DateTimeField(default=timezone.now)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["endpoint", "key"], name="unique_idempotency_key_per_endpoint"),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.key}"
+
+
+
+# 8. PAYMENT_BATCH Table (one payout: author payout, sale payout or payments/run)
+class PaymentBatch(models.Model):
+    SOURCE_AUTHOR = "author"
+    SOURCE_SALE = "sale"
+    SOURCE_RUN = "run"
+
+    SOURCE_CHOICES = [
+        (SOURCE_AUTHOR, "Author payout"),
+        (SOURCE_SALE, "Sale payout"),
+        (SOURCE_RUN, "Payment run"),
+    ]
+
+    source = models.CharField(max_length=16, choices=SOURCE_CHOICES)
+    filters = models.JSONField(default=dict, blank=True)  # what was paid (author_id / sale_id / run filters)
+    line_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"Payment batch {self.id} ({self.source}, {self.total_amount})"
+
+
+# 9. PAYMENT_LINE Table (ledger: one row per AuthorSale royalty paid)
+class PaymentLine(models.Model):
+    batch = models.ForeignKey(PaymentBatch, on_delete=models.CASCADE, related_name="lines")
+    author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name="payment_lines")
+
+    # History outlives edits/deletes of the sale: no DB constraint, no cascade
+    sale = models.ForeignKey(
+        Sale, null=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    author_sale = models.ForeignKey(
+        AuthorSale, null=True, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name="+"
+    )
+
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    paid_at = models.DateTimeField()  # copy of batch.created_at for (author, paid_at) lookups
+
+    class Meta:
+        indexes = [models.Index(fields=["author", "paid_at"], name="paymentline_author_paid_at")]
+
+    def __str__(self):
+        return f"{self.author_id} paid ${self.amount} for Sale {self.sale_id}"
+
+
+
+# 10. AUTHOR_BALANCE Table (running royalty totals per author, kept in step with AuthorSale)
+class AuthorBalance(models.Model):
+    # Updated by every AuthorSale write via services/balances.py; rebuild_author_balances
+    # recomputes it from AuthorSale (and --verify reports drift).
+    author = models.OneToOneField(Author, primary_key=True, on_delete=models.CASCADE, related_name="balance")
+    earned_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    unpaid_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    unpaid_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.author_id}: ${self.unpaid_total} unpaid ({self.unpaid_count})"
+
+
+ROYALTY_CENT = Decimal("0.01")
+
+
+def allocate_author_sales(sale, rates, author_royalties=None, author_paid=None):
+    """
+    Build (unsaved) AuthorSale rows for ``sale`` from (author_id, royalty_rate) pairs.
+
+    author_royalties / author_paid are keyed by author id as a string (request payload shape);
+    an override replaces the computed ``publisher_revenue * royalty_rate`` amount.
+
+    The computed amount is rounded to cents here (half up, like the CSV path's SQL round()),
+    so the AuthorBalance deltas built from these rows match what the database stores.
+    """
+    author_royalties = author_royalties or {}
+    author_paid = author_paid or {}
+
+    rows = []
+    for author_id, royalty_rate in rates:
+        key = str(author_id)
+        if key in author_royalties:
+            royalty_amount = author_royalties[key]
+        else:
+            royalty_amount = (Decimal(str(sale.publisher_revenue)) * royalty_rate).quantize(ROYALTY_CENT, ROUND_HALF_UP)
+
+        rows.append(
+            AuthorSale(
+                sale=sale,
+                author_id=author_id,
+                royalty_amount=royalty_amount,
+                author_paid=bool(author_paid.get(key, False)),
+            )
+        )
+    return rows
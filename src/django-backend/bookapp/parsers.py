@@ -0,0 +1,38 @@
+# parsers.py
+# orjson-backed JSON request parsing (settings.REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"]).
+
+import io
+import re
+
+import orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer
+
+# orjson reads integers past 64 bits as floats; bodies that may hold one take the stock path
+_LONG_NUMBER = re.compile(rb"\d{20}")
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser on orjson for UTF-8 bodies. Bodies orjson rejects (malformed JSON) or could
+    read differently (integers over 64 bits) go through the stock parser, so parsed data and
+    ParseError messages stay the same.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if _LONG_NUMBER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,45 @@
+# renderers.py
+# orjson-backed JSON rendering (settings.REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]).
+#
+# Output is byte-for-byte what DRF's JSONRenderer sends with the default API settings: compact
+# separators, raw UTF-8, datetimes as ISO 8601 with "Z" for UTC, dates/times as isoformat(),
+# bare Decimals as numbers, \u2028/\u2029 escaped. Only floats needing an exponent are spelled
+# differently (1e-5 instead of 1e-05), which parses to the same value.
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+# datetime/date/time are native (OPT_UTC_Z gives DRF's "Z"); integer dict keys become strings
+# as with json.dumps
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+_fallback = encoders.JSONEncoder()
+
+
+def _default(obj):
+    # everything orjson has no native form for (Decimal, lazy strings, timedelta, QuerySet, ...)
+    # gets DRF's representation
+    return _fallback.default(obj)
+
+
+def json_dumps(data):
+    """``data`` as JSON bytes, exactly as ORJSONRenderer renders a response body."""
+    try:
+        ret = orjson.dumps(data, default=_default, option=_OPTIONS)
+    except orjson.JSONEncodeError:
+        # past orjson's limits (integers over 64 bits, very deep nesting) or not serializable
+        # at all: the stock renderer either copes or raises its usual error
+        return JSONRenderer().render(data)
+    return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer on orjson. Pretty-printing (?indent, browsable API) uses the stock path."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        return json_dumps(data)
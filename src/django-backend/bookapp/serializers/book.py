@@ -5,6 +5,7 @@ from decimal import Decimal
 from django.db import IntegrityError
 
 from ..models import Book, AuthorBook, Author
+from ..services.author_stats import invalidate_author_stats, invalidate_book_author_stats
 
 
 def _normalize_isbn(value):
@@ -36,7 +37,7 @@ def _get_or_create_author_by_name(name: str) -> Author:
     if not cleaned:
         raise serializers.ValidationError({"authors": "Author name cannot be blank."})
 
-    existing = Author.objects.filter(name__iexact=cleaned).first()
+    existing = Author.objects.with_name(cleaned).first()
     if existing:
         return existing
 
@@ -44,7 +45,7 @@ def _get_or_create_author_by_name(name: str) -> Author:
         return Author.objects.create(name=cleaned)
     except IntegrityError:
         # race: another request created it
-        existing = Author.objects.filter(name__iexact=cleaned).first()
+        existing = Author.objects.with_name(cleaned).first()
         if existing:
             return existing
         raise
@@ -301,6 +302,7 @@ class BookCreateSerializer(serializers.ModelSerializer):
         # (transaction.atomic is enforced in the view).
         book = Book.objects.create(**validated_data)
 
+        author_ids = []
         for entry in authors_data:
             author = _get_or_create_author_by_name(entry["author_name"])
             AuthorBook.objects.create(
@@ -308,6 +310,8 @@ class BookCreateSerializer(serializers.ModelSerializer):
                 author=author,
                 royalty_rate=entry["royalty_rate"],
             )
+            author_ids.append(author.id)
+        invalidate_author_stats(author_ids)
 
         return book
 
@@ -371,12 +375,17 @@ class BookUpdateSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         authors_data = validated_data.pop("authors", None)
 
+        title_changed = "title" in validated_data and validated_data["title"] != instance.title
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
+        if title_changed:
+            # the title shows in the latest_sale of every author credited on this book's sales
+            invalidate_book_author_stats(instance.pk)
 
         if authors_data is not None:
             # Full replace
+            author_ids = list(instance.authorbook_set.values_list("author_id", flat=True))
             instance.authorbook_set.all().delete()
 
             for entry in authors_data:
@@ -386,5 +395,7 @@ class BookUpdateSerializer(serializers.ModelSerializer):
                     author=author,
                     royalty_rate=entry["royalty_rate"],
                 )
+                author_ids.append(author.id)
+            invalidate_author_stats(author_ids)
 
         return instance
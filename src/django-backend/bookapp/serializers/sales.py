@@ -3,6 +3,9 @@
 from rest_framework import serializers
 import datetime
 from ..models import Sale, Book, Author, AuthorSale, AuthorBook
+from ..services.author_stats import invalidate_author_stats
+from ..services.balances import author_sale_rows, record_author_sale_changes
+from ..services.versioning import update_with_version, bulk_update_with_versions
 
 
 class SaleSerializer(serializers.ModelSerializer):
@@ -11,18 +14,26 @@ class SaleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Sale
-        fields = ["id", "book", "book_title", "date", "quantity", "publisher_revenue", "author_details"]
+        fields = ["id", "book", "book_title", "date", "quantity", "publisher_revenue", "version", "author_details"]
 
     def get_author_details(self, obj):
-        """Get author details for the sale - royalty amounts and paid status."""
+        """
+        Get author details for the sale - royalty amounts and paid status.
+        Uses prefetched author_sales__author when the caller provided it (list endpoints).
+        """
+        author_sales = obj.author_sales.all()
+        if "author_sales" not in getattr(obj, "_prefetched_objects_cache", {}):
+            author_sales = author_sales.select_related("author")
+
         details = []
-        for ars in obj.author_sales.select_related("author").all():
+        for ars in author_sales:
             details.append(
                 {
                     "id": ars.author.id,
                     "name": ars.author.name,
                     "royalty_amount": ars.royalty_amount,
                     "paid": ars.author_paid,
+                    "version": ars.version,
                 }
             )
         return details
@@ -39,6 +50,29 @@ class PlaceholderDecimalField(serializers.DecimalField):
         return super().to_internal_value(data)
 
 
+class ContextBookField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that resolves the book from ``context["books"]`` ({id: Book})
+    when the caller preloaded it, so bulk validation does not query once per row.
+    Error messages are identical to the queryset lookup.
+    """
+    def to_internal_value(self, data):
+        books = self.context.get("books")
+        if books is None:
+            return super().to_internal_value(data)
+
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            book = books.get(int(data))
+        except (TypeError, ValueError, OverflowError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        if book is None:
+            self.fail("does_not_exist", pk_value=data)
+        return book
+
+
 # TODO: need to get all authors (id, name) of the book to display the authors to allow the user the option to put a royalty amount for each author (instead of using the default amount)
 class SaleCreateSerializer(serializers.ModelSerializer):
     author_royalties = serializers.DictField(
@@ -63,7 +97,7 @@ class SaleCreateSerializer(serializers.ModelSerializer):
     )
 
     date = serializers.CharField(required=False, allow_null=True, allow_blank=True)
-    book = serializers.PrimaryKeyRelatedField(queryset=Book.objects.all(), required=False, allow_null=True)
+    book = ContextBookField(queryset=Book.objects.all(), required=False, allow_null=True)
 
     class Meta:
         model = Sale
@@ -158,15 +192,19 @@ class SaleCreateSerializer(serializers.ModelSerializer):
             error["date"] = f"Sale date ({date}) cannot be before book publication date ({book.publication_date})."
 
         # Author Royalties
+        # (names come from context["author_names"] when preloaded; DB lookup otherwise)
+        author_names = self.context.get("author_names", {})
         error_author_royalties = []
         for author_id, amount in author_royalties.items():
             if amount < 0:
-                author_name = str(author_id)
-                try:
-                    author = Author.objects.get(id=author_id)
-                    author_name = author.name
-                except Author.DoesNotExist:
-                    pass
+                author_name = author_names.get(str(author_id))
+                if author_name is None:
+                    author_name = str(author_id)
+                    try:
+                        author = Author.objects.get(id=author_id)
+                        author_name = author.name
+                    except Author.DoesNotExist:
+                        pass
                 error_author_royalties.append(f"Royalty amount for author {author_name} cannot be negative.")
 
         if error_author_royalties:
@@ -184,28 +222,58 @@ class SaleCreateSerializer(serializers.ModelSerializer):
         author_royalties = validated_data.pop("author_royalties", {})
         author_paid = validated_data.pop("author_paid", {})
         sale = super().create(validated_data)
-        sale.create_author_sales(author_royalties, author_paid)
+        sale.create_author_sales(author_royalties, author_paid, rates=self.context_rates(sale.book_id))
         return sale
 
     def update(self, instance, validated_data):
         """
         Update a Sale instance WITHOUT recreating associated AuthorSales.
         (Past sales must not change authors/default royalties retroactively.)
+
+        Writes are version-checked (raises VersionConflict): the sale against
+        context["expected_version"] (the version the client loaded; defaults to the one read
+        for this request), overridden AuthorSales against context["author_versions"]
+        ({"<author_id>": version}; defaults to the versions read here).
         """
         author_royalties = validated_data.pop("author_royalties", {})
         author_paid = validated_data.pop("author_paid", {})
 
-        sale = super().update(instance, validated_data)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        expected_version = self.context.get("expected_version") or instance.version
+        update_with_version(instance, list(validated_data), expected_version)
+        sale = instance
+        author_sales = list(sale.author_sales.all())
+        if validated_data:
+            # quantity/date/book feed the authors' lifetime units and latest sale
+            invalidate_author_stats(ars.author_id for ars in author_sales)
 
         # Apply explicit overrides ONLY to existing AuthorSale rows (no recreation).
+        # One SELECT (above) + one conditional bulk UPDATE (+ one AuthorBalance upsert), however
+        # many authors are overridden.
         if author_royalties or author_paid:
-            qs = sale.author_sales.all()
-            for ars in qs:
+            author_versions = self.context.get("author_versions") or {}
+            changed = []
+            before = []
+            expected = {}
+            for ars in author_sales:
                 key = str(ars.author_id)
-                if key in author_royalties:
-                    ars.royalty_amount = author_royalties[key]
-                if key in author_paid:
-                    ars.author_paid = bool(author_paid[key])
-                ars.save()
+                if key in author_royalties or key in author_paid:
+                    before.extend(author_sale_rows([ars]))
+                    if key in author_royalties:
+                        ars.royalty_amount = author_royalties[key]
+                    if key in author_paid:
+                        ars.author_paid = bool(author_paid[key])
+                    changed.append(ars)
+                    expected[ars.pk] = author_versions.get(key, ars.version)
+            bulk_update_with_versions(changed, ["royalty_amount", "author_paid"], expected)
+            record_author_sale_changes(before, author_sale_rows(changed))
 
         return sale
+
+    def context_rates(self, book_id):
+        """Preloaded (author_id, royalty_rate) pairs for ``book_id``, or None when not preloaded."""
+        rates = self.context.get("rates")
+        if rates is None:
+            return None
+        return rates.get(book_id, ())
@@ -0,0 +1,21 @@
+from rest_framework import serializers
+from ..models import SaleImportJob
+
+
+class SaleImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SaleImportJob
+        fields = [
+            "id",
+            "status",
+            "total_rows",
+            "validated_rows",
+            "created_count",
+            "error_count",
+            "errors",
+            "message",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
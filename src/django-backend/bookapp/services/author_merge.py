@@ -0,0 +1,289 @@
+# services/author_merge.py
+# Merging duplicate authors (authors/merge, `manage.py merge_authors`).
+#
+# A merge plan maps canonical author ids to the duplicates folded into them. The plan is loaded
+# into a temp table and every move is one UPDATE/DELETE joined against it, so merging thousands
+# of authors costs the same handful of statements as merging one pair:
+#   AuthorBook     rows of one group on the same book collapse into one: the canonical author's
+#                  row (and rate) if it has one, else the oldest; the rest are repointed
+#   AuthorSale     rows of one group on the same sale collapse into one (same keeper rule) whose
+#                  royalty_amount is the sum; a sale whose rows differ in paid status refuses the
+#                  merge (pay or edit it first). The rest are repointed. Version bumped on all
+#                  touched rows (open edit forms for those rows go stale)
+#   PaymentLine    repointed, so ledger history follows the person (and the surviving AuthorSale)
+#   AuthorBalance  duplicate totals are added to the canonical balance
+#   Author         duplicates deleted; a canonical name with stray whitespace is normalized
+# A dry run executes the same statements and rolls back, so its counts are exact.
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+
+from ..models import Author, AuthorBalance, AuthorBook, AuthorSale, PaymentLine
+from .author_stats import invalidate_author_stats
+from .balances import ZERO, apply_balance_deltas
+
+MERGE_TABLE = "author_merge_map"
+SALE_MERGE_TABLE = "author_merge_sale_map"
+_INSERT_BATCH = 500
+
+
+class AuthorMergeError(Exception):
+    """The merge plan is invalid (unknown ids, an author merged twice or into a duplicate)."""
+
+
+def _q(name):
+    return connection.ops.quote_name(name)
+
+
+def normalize_author_name(name):
+    # same spacing rule new authors get (AuthorCreateSerializer / _normalize_author_name)
+    return " ".join(str(name).split())
+
+
+def find_duplicate_authors():
+    """
+    {canonical_id: [duplicate_id, ...]} for authors whose names are equal once whitespace is
+    collapsed and case ignored. The oldest author (lowest id) of each group is canonical.
+    """
+    groups = defaultdict(list)
+    names = Author.objects.order_by("id").values_list("id", "name")
+    for author_id, name in names.iterator(chunk_size=2000):
+        groups[normalize_author_name(name).lower()].append(author_id)
+    return {ids[0]: ids[1:] for ids in groups.values() if len(ids) > 1}
+
+
+def _check_plan(plan):
+    duplicate_ids = [author_id for duplicates in plan.values() for author_id in duplicates]
+    if len(duplicate_ids) != len(set(duplicate_ids)):
+        raise AuthorMergeError("An author can only be merged into one canonical author.")
+    if set(duplicate_ids) & set(plan):
+        raise AuthorMergeError("A canonical author cannot also be merged as a duplicate.")
+
+
+def _load_plan(cursor, plan, names):
+    """Fill the temp table: one row per author of the plan (canonicals map to themselves)."""
+    cursor.execute(f"DROP TABLE IF EXISTS {MERGE_TABLE}")
+    cursor.execute(
+        f"CREATE TEMP TABLE {MERGE_TABLE} "
+        "(author_id bigint PRIMARY KEY, canonical_id bigint NOT NULL, canonical_name varchar(255))"
+    )
+    rows = []
+    for canonical_id, duplicates in plan.items():
+        normalized = normalize_author_name(names[canonical_id])
+        rows.append((canonical_id, canonical_id, normalized if normalized != names[canonical_id] else None))
+        rows.extend((author_id, canonical_id, None) for author_id in duplicates)
+    for start in range(0, len(rows), _INSERT_BATCH):
+        batch = rows[start:start + _INSERT_BATCH]
+        cursor.execute(
+            f"INSERT INTO {MERGE_TABLE} (author_id, canonical_id, canonical_name) VALUES "
+            + ", ".join(["(%s, %s, %s)"] * len(batch)),
+            [value for row in batch for value in row],
+        )
+
+
+def _keepers(table, group_field):
+    """
+    SELECT of the surviving row id per (canonical author, ``group_field``) among ``table``'s rows
+    of the plan's authors: the canonical author's own row when it has one, else the oldest.
+    """
+    return (
+        f"SELECT COALESCE(MIN(CASE WHEN x.author_id = mx.canonical_id THEN x.id END), MIN(x.id)) AS keeper_id, "
+        f"mx.canonical_id, x.{group_field} "
+        f"FROM {table} x JOIN {MERGE_TABLE} mx ON mx.author_id = x.author_id "
+        f"GROUP BY mx.canonical_id, x.{group_field}"
+    )
+
+
+def _check_paid_status(cursor, author_sale):
+    cursor.execute(
+        f"SELECT DISTINCT x.sale_id FROM {author_sale} x JOIN {MERGE_TABLE} mx ON mx.author_id = x.author_id "
+        "GROUP BY mx.canonical_id, x.sale_id "
+        "HAVING MIN(CASE WHEN x.author_paid THEN 1 ELSE 0 END) <> MAX(CASE WHEN x.author_paid THEN 1 ELSE 0 END) "
+        "ORDER BY x.sale_id"
+    )
+    sale_ids = [row[0] for row in cursor.fetchall()]
+    if sale_ids:
+        raise AuthorMergeError(
+            "Sale(s) "
+            + ", ".join(map(str, sale_ids))
+            + " have both paid and unpaid royalties for authors being merged; pay or edit them first."
+        )
+
+
+def _combine_author_sales(cursor, author_sale, canonical_for):
+    """
+    Collapse each group's rows on the same sale into the keeper row (summed royalty_amount).
+    Returns (rows removed, {canonical_id: unpaid rows removed}) for the counts and balances.
+    """
+    keepers = _keepers(author_sale, "sale_id")
+    cursor.execute(f"DROP TABLE IF EXISTS {SALE_MERGE_TABLE}")
+    cursor.execute(
+        f"CREATE TEMP TABLE {SALE_MERGE_TABLE} (author_sale_id bigint PRIMARY KEY, keeper_id bigint NOT NULL)"
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO {SALE_MERGE_TABLE} (author_sale_id, keeper_id)
+        SELECT x.id, k.keeper_id
+        FROM {author_sale} x
+        JOIN {MERGE_TABLE} mx ON mx.author_id = x.author_id
+        JOIN ({keepers}) k ON k.canonical_id = mx.canonical_id AND k.sale_id = x.sale_id
+        WHERE x.id <> k.keeper_id
+        """
+    )
+    cursor.execute(
+        f"""
+        UPDATE {author_sale} SET
+            royalty_amount = royalty_amount + (
+                SELECT SUM(d.royalty_amount) FROM {author_sale} d
+                JOIN {SALE_MERGE_TABLE} sm ON sm.author_sale_id = d.id
+                WHERE sm.keeper_id = {author_sale}.id
+            ),
+            version = version + 1
+        WHERE id IN (SELECT keeper_id FROM {SALE_MERGE_TABLE})
+        """
+    )
+    payment_line = _q(PaymentLine._meta.db_table)
+    cursor.execute(
+        f"UPDATE {payment_line} SET author_sale_id = "
+        f"(SELECT keeper_id FROM {SALE_MERGE_TABLE} sm WHERE sm.author_sale_id = {payment_line}.author_sale_id) "
+        f"WHERE author_sale_id IN (SELECT author_sale_id FROM {SALE_MERGE_TABLE})"
+    )
+    cursor.execute(
+        f"DELETE FROM {author_sale} WHERE id IN (SELECT author_sale_id FROM {SALE_MERGE_TABLE}) "
+        "RETURNING author_id, author_paid"
+    )
+    removed = cursor.fetchall()
+    cursor.execute(f"DROP TABLE {SALE_MERGE_TABLE}")
+
+    # keepers prefer the canonical row, so every removed row belonged to a duplicate
+    unpaid_removed = defaultdict(int)
+    for author_id, paid in removed:
+        if not paid:
+            unpaid_removed[canonical_for[author_id]] += 1
+    return len(removed), unpaid_removed
+
+
+def _merge(cursor, canonical_for):
+    """Run the set-based statements against the loaded plan. Returns the row counts."""
+    author_book = _q(AuthorBook._meta.db_table)
+    author_sale = _q(AuthorSale._meta.db_table)
+    duplicates = f"(SELECT author_id FROM {MERGE_TABLE} WHERE author_id <> canonical_id)"
+    canonical_of = f"(SELECT canonical_id FROM {MERGE_TABLE} m WHERE m.author_id = {{table}}.author_id)"
+    counts = {}
+
+    _check_paid_status(cursor, author_sale)
+
+    # one surviving AuthorBook row (and royalty rate) per (canonical author, book)
+    cursor.execute(
+        f"DELETE FROM {author_book} "
+        f"WHERE author_id IN (SELECT author_id FROM {MERGE_TABLE}) "
+        f"AND id NOT IN (SELECT keeper_id FROM ({_keepers(author_book, 'book_id')}) k)"
+    )
+    counts["author_books_combined"] = cursor.rowcount
+    cursor.execute(
+        f"UPDATE {author_book} SET author_id = {canonical_of.format(table=author_book)} "
+        f"WHERE author_id IN {duplicates}"
+    )
+    counts["author_books_repointed"] = cursor.rowcount
+
+    counts["author_sales_combined"], unpaid_removed = _combine_author_sales(cursor, author_sale, canonical_for)
+    cursor.execute(
+        f"UPDATE {author_sale} SET author_id = {canonical_of.format(table=author_sale)}, version = version + 1 "
+        f"WHERE author_id IN {duplicates}"
+    )
+    counts["author_sales_repointed"] = cursor.rowcount
+
+    payment_line = _q(PaymentLine._meta.db_table)
+    cursor.execute(
+        f"UPDATE {payment_line} SET author_id = {canonical_of.format(table=payment_line)} "
+        f"WHERE author_id IN {duplicates}"
+    )
+    counts["payment_lines_repointed"] = cursor.rowcount
+
+    balance = _q(AuthorBalance._meta.db_table)
+    cursor.execute(
+        f"DELETE FROM {balance} WHERE author_id IN {duplicates} "
+        "RETURNING author_id, earned_total, paid_total, unpaid_total, unpaid_count"
+    )
+    deltas = defaultdict(lambda: [ZERO, ZERO, ZERO, 0])
+    for author_id, earned, paid, unpaid, unpaid_count in cursor.fetchall():
+        delta = deltas[canonical_for[author_id]]
+        delta[0] += Decimal(str(earned))
+        delta[1] += Decimal(str(paid))
+        delta[2] += Decimal(str(unpaid))
+        delta[3] += unpaid_count
+    for canonical_id, removed in unpaid_removed.items():
+        deltas[canonical_id][3] -= removed  # the amounts now sit on the surviving rows
+    apply_balance_deltas(deltas)
+
+    author = _q(Author._meta.db_table)
+    cursor.execute(f"DELETE FROM {author} WHERE id IN {duplicates}")
+    counts["authors_merged"] = cursor.rowcount
+    # after the delete, so a merged duplicate no longer holds the normalized name; an author
+    # left out of the merge that does hold it keeps the canonical name as it is
+    cursor.execute(
+        f"""
+        UPDATE {author} SET name = m.canonical_name
+        FROM {MERGE_TABLE} m
+        WHERE m.author_id = {author}.id AND m.canonical_name IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM {author} other
+              WHERE LOWER(other.name) = LOWER(m.canonical_name) AND other.id <> m.author_id
+          )
+        """
+    )
+    counts["canonical_names_normalized"] = cursor.rowcount
+    cursor.execute(f"DROP TABLE {MERGE_TABLE}")
+    return counts
+
+
+def merge_authors(plan, dry_run=False):
+    """
+    Merge each duplicate in ``plan`` ({canonical_id: [duplicate_id, ...]}) into its canonical
+    author, in one transaction. With dry_run the merge runs and is rolled back.
+
+    Returns {"dry_run", "groups": [{"canonical", "duplicates"}], <row counts>}.
+    Raises AuthorMergeError when the plan is invalid.
+    """
+    plan = {int(c): sorted({int(d) for d in dups}) for c, dups in plan.items() if dups}
+    _check_plan(plan)
+
+    with transaction.atomic():
+        author_ids = set(plan) | {d for dups in plan.values() for d in dups}
+        # locking the rows keeps new AuthorBook/AuthorSale rows from pointing at a duplicate mid-merge
+        names = dict(
+            Author.objects.select_for_update().filter(id__in=author_ids).order_by("id").values_list("id", "name")
+        )
+        missing = sorted(author_ids - names.keys())
+        if missing:
+            raise AuthorMergeError(f"Unknown author id(s): {', '.join(map(str, missing))}.")
+
+        counts = {
+            "authors_merged": 0,
+            "author_books_combined": 0,
+            "author_books_repointed": 0,
+            "author_sales_combined": 0,
+            "author_sales_repointed": 0,
+            "payment_lines_repointed": 0,
+            "canonical_names_normalized": 0,
+        }
+        if plan:
+            with connection.cursor() as cursor:
+                _load_plan(cursor, plan, names)
+                counts = _merge(cursor, {d: c for c, dups in plan.items() for d in dups})
+
+        if dry_run:
+            transaction.set_rollback(True)
+        else:
+            invalidate_author_stats(author_ids)
+
+    groups = [
+        {
+            "canonical": {"id": canonical_id, "name": names[canonical_id]},
+            "duplicates": [{"id": author_id, "name": names[author_id]} for author_id in duplicates],
+        }
+        for canonical_id, duplicates in sorted(plan.items())
+    ]
+    return {"dry_run": dry_run, "groups": groups, **counts}
@@ -0,0 +1,127 @@
+# services/author_stats.py
+# Per-author statistics for the author detail endpoint.
+#
+# One SELECT over Author: royalty totals come from the AuthorBalance rollup, book count, units
+# and the latest sale from correlated subqueries on the author's own rows. The result is cached
+# for AUTHOR_STATS_TTL seconds; every write that changes an author's numbers (balance deltas,
+# AuthorBook replacement, book delete, CSV import, sale field edits, book title edits) calls
+# invalidate_author_stats(). Invalidation only reaches other processes through a shared cache
+# (settings.CACHES, DJANGO_CACHE_BACKEND=db); with the per-process locmem default a worker can
+# serve numbers up to AUTHOR_STATS_TTL seconds old. The TTL also bounds staleness for writes
+# that bypass the services.
+
+from decimal import Decimal
+from itertools import chain
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from ..models import Author, AuthorBook, AuthorSale
+
+AUTHOR_STATS_TTL = 30
+
+_MONEY = DecimalField(max_digits=14, decimal_places=2)
+_CENTS = Decimal("0.01")
+
+
+def author_stats_key(author_id):
+    return f"author-stats:{int(author_id)}"
+
+
+def invalidate_author_stats(author_ids):
+    """
+    Drop cached stats for these authors now and again when the transaction commits (so a read
+    that cached the pre-commit numbers in between does not survive the write).
+    """
+    keys = [author_stats_key(author_id) for author_id in set(author_ids)]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_sale_author_stats(sale_ids):
+    """Invalidate the authors credited on these sales (an edit moves their units or latest sale)."""
+    invalidate_author_stats(AuthorSale.objects.filter(sale_id__in=sale_ids).values_list("author_id", flat=True))
+
+
+def invalidate_book_author_stats(book_id):
+    """Invalidate the book's authors and everyone credited on its sales (latest sale shows the title)."""
+    invalidate_author_stats(chain(
+        AuthorBook.objects.filter(book_id=book_id).values_list("author_id", flat=True),
+        AuthorSale.objects.filter(sale__book_id=book_id).values_list("author_id", flat=True),
+    ))
+
+
+def _count_per_author(queryset, aggregate):
+    return Subquery(
+        queryset.filter(author_id=OuterRef("pk")).order_by().values("author_id").annotate(n=aggregate).values("n")
+    )
+
+
+def author_stats_queryset():
+    latest = AuthorSale.objects.filter(author_id=OuterRef("pk")).order_by("-sale__date", "-sale_id")
+    zero = Value(Decimal("0.00"), output_field=_MONEY)
+    return Author.objects.annotate(
+        book_count=Coalesce(_count_per_author(AuthorBook.objects, Count("id")), 0, output_field=IntegerField()),
+        lifetime_units=Coalesce(
+            _count_per_author(AuthorSale.objects, Sum("sale__quantity")), 0, output_field=IntegerField()
+        ),
+        earned_total=Coalesce(F("balance__earned_total"), zero),
+        paid_total=Coalesce(F("balance__paid_total"), zero),
+        unpaid_total=Coalesce(F("balance__unpaid_total"), zero),
+        unpaid_count=Coalesce(F("balance__unpaid_count"), 0),
+        latest_sale_id=Subquery(latest.values("sale_id")[:1]),
+        latest_sale_date=Subquery(latest.values("sale__date")[:1]),
+        latest_sale_book_title=Subquery(latest.values("sale__book__title")[:1]),
+    )
+
+
+def _money(value):
+    return str(Decimal(value).quantize(_CENTS))
+
+
+def compute_author_stats(author_id):
+    """The stats payload for one author (one query), or None if the author does not exist."""
+    row = author_stats_queryset().filter(id=author_id).values(
+        "id", "name", "bio", "book_count", "lifetime_units",
+        "earned_total", "paid_total", "unpaid_total", "unpaid_count",
+        "latest_sale_id", "latest_sale_date", "latest_sale_book_title",
+    ).first()
+    if row is None:
+        return None
+
+    latest_sale = None
+    if row["latest_sale_id"] is not None:
+        latest_sale = {
+            "id": row["latest_sale_id"],
+            "date": str(row["latest_sale_date"]),
+            "book_title": row["latest_sale_book_title"],
+        }
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "bio": row["bio"],
+        "book_count": row["book_count"],
+        "lifetime_units": row["lifetime_units"],
+        "royalties": {
+            "earned": _money(row["earned_total"]),
+            "paid": _money(row["paid_total"]),
+            "unpaid": _money(row["unpaid_total"]),
+            "unpaid_count": row["unpaid_count"],
+        },
+        "latest_sale": latest_sale,
+    }
+
+
+def author_stats(author_id):
+    """Cached compute_author_stats(); missing authors are not cached."""
+    key = author_stats_key(author_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_author_stats(author_id)
+        if stats is not None:
+            cache.set(key, stats, AUTHOR_STATS_TTL)
+    return stats
@@ -0,0 +1,172 @@
+# services/balances.py
+# Running per-author royalty totals (AuthorBalance).
+#
+# Every AuthorSale write (create, override edit, book-change rebuild, delete, payout) turns the
+# rows it touched into per-author deltas and applies them with one
+# INSERT ... ON CONFLICT (author_id) DO UPDATE SET total = total + delta, in the writer's
+# transaction. Reading an author's balance is then a primary-key lookup instead of an aggregate
+# over their whole history. Writes that bypass these helpers (admin edits, manual SQL) are
+# repaired by ``manage.py rebuild_author_balances`` (``--verify`` only reports drift).
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+
+from ..models import AuthorBalance, AuthorSale
+from .author_stats import invalidate_author_stats
+
+ZERO = Decimal("0.00")
+
+_BALANCE_FIELDS = ("earned_total", "paid_total", "unpaid_total", "unpaid_count")
+
+
+def _q(name):
+    return connection.ops.quote_name(name)
+
+
+def balance_deltas(rows, sign=1, deltas=None):
+    """
+    Add (author_id, royalty_amount, author_paid) rows to per-author deltas
+    {author_id: [earned, paid, unpaid, unpaid_count]}; sign=-1 subtracts them.
+    """
+    deltas = defaultdict(lambda: [ZERO, ZERO, ZERO, 0]) if deltas is None else deltas
+    for author_id, amount, paid in rows:
+        amount = Decimal(amount or 0) * sign
+        delta = deltas[author_id]
+        delta[0] += amount
+        if paid:
+            delta[1] += amount
+        else:
+            delta[2] += amount
+            delta[3] += sign
+    return deltas
+
+
+def apply_balance_deltas(deltas):
+    """One upsert for every author with a non-zero delta (in author_id order, so concurrent
+    writers lock balance rows in the same order)."""
+    values = [
+        (author_id, *delta)
+        for author_id, delta in sorted(deltas.items())
+        if any(delta)
+    ]
+    if not values:
+        return
+
+    table = _q(AuthorBalance._meta.db_table)
+    columns = ", ".join(_q(f) for f in _BALANCE_FIELDS)
+    updates = ", ".join(f"{_q(f)} = {table}.{_q(f)} + EXCLUDED.{_q(f)}" for f in _BALANCE_FIELDS)
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(values))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({_q('author_id')}, {columns}) VALUES {placeholders} "
+            f"ON CONFLICT ({_q('author_id')}) DO UPDATE SET {updates}",
+            [param for row in values for param in row],
+        )
+    invalidate_author_stats(row[0] for row in values)
+
+
+def author_sale_rows(author_sales):
+    """(author_id, royalty_amount, author_paid) for AuthorSale instances."""
+    return [(ars.author_id, ars.royalty_amount, ars.author_paid) for ars in author_sales]
+
+
+def record_author_sales(author_sales, sign=1):
+    """Count newly inserted AuthorSales (or, with sign=-1, removed ones) in the balances."""
+    apply_balance_deltas(balance_deltas(author_sale_rows(author_sales), sign))
+
+
+def record_author_sale_changes(before, after):
+    """Apply an edit: ``before``/``after`` are author_sale_rows() of the same rows."""
+    apply_balance_deltas(balance_deltas(after, 1, balance_deltas(before, -1)))
+
+
+def record_payout(rows):
+    """Move paid royalties from unpaid to paid; rows are mark_paid_returning() rows."""
+    deltas = balance_deltas([(author_id, amount, False) for _, author_id, _, amount in rows], -1)
+    balance_deltas([(author_id, amount, True) for _, author_id, _, amount in rows], 1, deltas)
+    apply_balance_deltas(deltas)
+
+
+def delete_author_sales(queryset):
+    """
+    DELETE the AuthorSales selected by ``queryset`` with RETURNING, and take exactly the
+    deleted rows out of the balances. Returns the number of rows deleted.
+    """
+    ids_sql, ids_params = queryset.values("id").query.sql_with_params()
+    table = _q(AuthorSale._meta.db_table)
+    with transaction.atomic(savepoint=False):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE id IN ({ids_sql}) RETURNING author_id, royalty_amount, author_paid",
+                ids_params,
+            )
+            rows = cursor.fetchall()
+        apply_balance_deltas(balance_deltas(rows, -1))
+    return len(rows)
+
+
+def expected_author_balances():
+    """{author_id: (earned, paid, unpaid, unpaid_count)} aggregated from AuthorSale."""
+    totals = (
+        AuthorSale.objects
+        .order_by()
+        .values("author_id")
+        .annotate(
+            earned=Sum("royalty_amount"),
+            paid=Sum("royalty_amount", filter=Q(author_paid=True)),
+            unpaid=Sum("royalty_amount", filter=Q(author_paid=False)),
+            unpaid_count=Count("id", filter=Q(author_paid=False)),
+        )
+    )
+    return {
+        row["author_id"]: (row["earned"] or ZERO, row["paid"] or ZERO, row["unpaid"] or ZERO, row["unpaid_count"])
+        for row in totals
+    }
+
+
+def author_balance_drift():
+    """
+    Compare AuthorBalance with AuthorSale. Returns [(author_id, stored, expected), ...] for
+    every author whose balance is wrong (a missing row counts as all zeros).
+    """
+    expected = expected_author_balances()
+    stored = {
+        row[0]: tuple(row[1:])
+        for row in AuthorBalance.objects.values_list("author_id", *_BALANCE_FIELDS)
+    }
+    zero = (ZERO, ZERO, ZERO, 0)
+    drift = []
+    for author_id in sorted(expected.keys() | stored.keys()):
+        have = stored.get(author_id, zero)
+        want = expected.get(author_id, zero)
+        if tuple(Decimal(v) for v in have) != tuple(Decimal(v) for v in want):
+            drift.append((author_id, have, want))
+    return drift
+
+
+def rebuild_author_balances(batch_size=1000):
+    """Recompute every AuthorBalance from AuthorSale. Returns the number of balances written."""
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # keep AuthorSale writers out until the new balances are in place
+            with connection.cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {_q(AuthorSale._meta.db_table)} IN SHARE MODE")
+        AuthorBalance.objects.all().delete()
+        balances = AuthorBalance.objects.bulk_create(
+            (
+                AuthorBalance(
+                    author_id=author_id,
+                    earned_total=earned,
+                    paid_total=paid,
+                    unpaid_total=unpaid,
+                    unpaid_count=unpaid_count,
+                )
+                for author_id, (earned, paid, unpaid, unpaid_count) in expected_author_balances().items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(balances)
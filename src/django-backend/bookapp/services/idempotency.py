@@ -0,0 +1,180 @@
+# services/idempotency.py
+# Idempotency-Key support for sale creation endpoints.
+#
+# A client that times out (e.g. a large sale/createmany behind nginx) can retry with the same
+# Idempotency-Key header: the first request's response is stored and replayed, so the retry
+# costs one indexed lookup and never re-runs validation or inserts.
+
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+import orjson
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils import encoders
+
+from ..models import IdempotencyKey
+from ..renderers import json_dumps
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, cls=encoders.JSONEncoder)
+    parts = [str(request.user.pk or ""), request.method, request.path, body]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _to_json(data):
+    # Store exactly what the JSON renderer would have sent (Decimal, dates, ErrorDetail, ...)
+    return orjson.loads(json_dumps(data))
+
+
+def _claim(endpoint, key, fingerprint):
+    """
+    Return (record, created). A live record is returned as-is (retries cost one lookup);
+    otherwise the key is inserted as "in progress". Expired records are treated as absent, and
+    a stale in-progress claim for the same request is taken over (created=True).
+    """
+    record = IdempotencyKey.objects.filter(endpoint=endpoint, key=key).first()
+    if record is not None and record.expires_at > timezone.now():
+        if record.request_fingerprint == fingerprint and _take_over(record):
+            return record, True
+        return record, False
+
+    expires_at = timezone.now() + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    for _ in range(2):
+        if record is not None:
+            record.delete()
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    endpoint=endpoint,
+                    key=key,
+                    request_fingerprint=fingerprint,
+                    expires_at=expires_at,
+                )
+            return record, True
+        except IntegrityError:
+            # another request claimed it first
+            record = IdempotencyKey.objects.filter(endpoint=endpoint, key=key).first()
+            if record is None:
+                continue  # deleted in between (failed request or purge); try again
+            if record.expires_at <= timezone.now():
+                continue
+            return record, False
+
+    return None, False  # lost the race twice; report as in progress
+
+
+def _take_over(record):
+    """
+    Move a stale in-progress claim to this request. Its original request died without
+    finishing or cleaning up, so its writes were rolled back with it. The UPDATE is conditional
+    on the old lease, so of several concurrent retries exactly one wins.
+    """
+    now = timezone.now()
+    if record.response_status is not None:
+        return False
+    if record.claimed_at > now - timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS):
+        return False
+    taken = _holding(record).update(
+        claimed_at=now,
+        expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+    )
+    if taken:
+        record.claimed_at = now
+    return bool(taken)
+
+
+def _holding(record):
+    # the claim row, as long as this request's lease was not taken over in the meantime
+    return IdempotencyKey.objects.filter(pk=record.pk, claimed_at=record.claimed_at, response_status__isnull=True)
+
+
+def _in_progress():
+    return Response(
+        {"error": f"A request with this {IDEMPOTENCY_HEADER} is still in progress."},
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
+def idempotent(endpoint):
+    """
+    Decorator for APIView handler methods. Without the header the view runs as usual.
+
+    With it:
+      - first request: runs the view and stores its status + body (5xx/exceptions are not stored)
+      - retry, same request: replays the stored response (header Idempotent-Replayed: true)
+      - retry, different request body/user: 422
+      - retry while the first request is still running: 409; once its claim is older than
+        IDEMPOTENCY_LEASE_SECONDS (the request died, e.g. its worker was killed) the retry runs it
+
+    The view and the stored response share one transaction: a request that dies, raises or
+    answers 5xx leaves neither writes nor a stored response behind, and one whose claim was
+    taken over meanwhile rolls back and answers 409.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return view_method(self, request, *args, **kwargs)
+
+            if len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {"error": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            fingerprint = _fingerprint(request)
+            record, created = _claim(endpoint, key, fingerprint)
+
+            if not created:
+                if record is not None and record.request_fingerprint != fingerprint:
+                    return Response(
+                        {"error": f"{IDEMPOTENCY_HEADER} was already used for a different request."},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+                if record is None or record.response_status is None:
+                    return _in_progress()
+                return Response(
+                    record.response_body,
+                    status=record.response_status,
+                    headers={REPLAYED_HEADER: "true"},
+                )
+
+            try:
+                with transaction.atomic():
+                    response = view_method(self, request, *args, **kwargs)
+                    if response.status_code >= 500:
+                        transaction.set_rollback(True)
+                    elif not _holding(record).update(
+                        response_status=response.status_code, response_body=_to_json(response.data)
+                    ):
+                        transaction.set_rollback(True)
+                        return _in_progress()
+            except Exception:
+                _holding(record).delete()  # let the client retry
+                raise
+
+            if response.status_code >= 500:
+                _holding(record).delete()
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def purge_expired_idempotency_keys():
+    """Delete expired keys (uses the expires_at index). Returns the number removed."""
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
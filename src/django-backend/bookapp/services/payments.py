@@ -0,0 +1,156 @@
+# services/payments.py
+# Marking AuthorSale royalties as paid.
+#
+# Payouts use UPDATE ... SET author_paid = true WHERE author_paid = false ... RETURNING, so the
+# rows that actually flipped come back from the UPDATE itself: totals and affected sales are
+# computed from them, with no separate lock/aggregate queries. Re-checking author_paid in the
+# UPDATE also means two concurrent payouts can never both report the same royalty.
+#
+# Every payout also writes the ledger (PaymentBatch + one PaymentLine per royalty paid) in the
+# same transaction as its UPDATE, from the same RETURNING rows, and moves the paid amounts
+# from unpaid to paid in AuthorBalance.
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from ..models import Author, AuthorSale, PaymentBatch, PaymentLine
+from .balances import record_payout
+
+PAYMENT_RUN_CHUNK_SIZE = 5000
+
+CENT = Decimal("0.01")
+
+
+def _amount(value):
+    # PostgreSQL returns Decimal; backends without a numeric type may return float/str.
+    return value if isinstance(value, Decimal) else Decimal(str(value)).quantize(CENT)
+
+
+def mark_paid_returning(where, params=()):
+    """
+    One statement: mark the unpaid AuthorSales matching ``where`` (SQL over the AuthorSale
+    table, %s placeholders) as paid. Returns [(id, author_id, sale_id, royalty_amount), ...]
+    for exactly the rows this statement changed.
+    """
+    table = connection.ops.quote_name(AuthorSale._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET author_paid = %s, version = version + 1 "
+            f"WHERE author_paid = %s AND ({where}) "
+            f"RETURNING id, author_id, sale_id, royalty_amount",
+            [True, False, *params],
+        )
+        return [(pk, author_id, sale_id, _amount(amount)) for pk, author_id, sale_id, amount in cursor.fetchall()]
+
+
+def pay_royalties(where, params=(), *, source, filters=None, user=None, batch=None):
+    """
+    mark_paid_returning() plus the ledger and AuthorBalance, in one transaction: the PaymentLines
+    are exactly the returned rows. The PaymentBatch is created on the first non-empty payout (or, when ``batch``
+    is given, its totals are incremented).
+
+    Returns (rows, batch); batch stays None when nothing was paid.
+    """
+    with transaction.atomic():
+        rows = mark_paid_returning(where, params)
+        if not rows:
+            return rows, batch
+
+        total = sum((amount for _, _, _, amount in rows), Decimal("0.00"))
+        if batch is None:
+            batch = PaymentBatch.objects.create(
+                source=source,
+                filters=filters or {},
+                line_count=len(rows),
+                total_amount=total,
+                created_by=user if user is not None and user.is_authenticated else None,
+            )
+        else:
+            PaymentBatch.objects.filter(pk=batch.pk).update(
+                line_count=F("line_count") + len(rows),
+                total_amount=F("total_amount") + total,
+            )
+
+        PaymentLine.objects.bulk_create(
+            PaymentLine(
+                batch=batch,
+                author_id=author_id,
+                sale_id=sale_id,
+                author_sale_id=pk,
+                amount=amount,
+                paid_at=batch.created_at,
+            )
+            for pk, author_id, sale_id, amount in rows
+        )
+        record_payout(rows)
+
+    return rows, batch
+
+
+def run_payout(queryset, chunk_size=PAYMENT_RUN_CHUNK_SIZE, *, filters=None, user=None):
+    """
+    Pay every unpaid AuthorSale selected by ``queryset`` (any AuthorSale filter), chunk by chunk:
+    each chunk is one UPDATE ... RETURNING over the next ``chunk_size`` unpaid ids (keyset on id)
+    plus its ledger lines, committed on its own so row locks are held only for that chunk.
+    All chunks share one PaymentBatch.
+
+    Returns (by_author, batch) with by_author = {author_id: {"author_sales", "total", "sale_ids"}}.
+    """
+    unpaid = queryset.filter(author_paid=False).order_by("id")
+    by_author = defaultdict(lambda: {"author_sales": 0, "total": Decimal("0.00"), "sale_ids": set()})
+    batch = None
+    last_id = 0
+
+    while True:
+        ids_sql, ids_params = unpaid.filter(id__gt=last_id).values("id")[:chunk_size].query.sql_with_params()
+        rows, batch = pay_royalties(
+            f"id IN ({ids_sql})",
+            ids_params,
+            source=PaymentBatch.SOURCE_RUN,
+            filters=filters,
+            user=user,
+            batch=batch,
+        )
+
+        if not rows:
+            # every picked row was paid concurrently in between; stop only when none are left
+            if not unpaid.filter(id__gt=last_id).exists():
+                break
+            continue
+
+        for pk, author_id, sale_id, amount in rows:
+            totals = by_author[author_id]
+            totals["author_sales"] += 1
+            totals["total"] += amount
+            totals["sale_ids"].add(sale_id)
+        last_id = max(row[0] for row in rows)
+
+    return dict(by_author), batch
+
+
+def payout_summary(by_author, batch=None):
+    """Response payload for a run_payout() result: overall totals + per-author rows (by name)."""
+    names = dict(Author.objects.filter(id__in=list(by_author)).values_list("id", "name"))
+
+    authors = []
+    for author_id, totals in by_author.items():
+        authors.append(
+            {
+                "author_id": author_id,
+                "author_name": names.get(author_id, ""),
+                "author_sales_marked_paid": totals["author_sales"],
+                "total_royalties_paid": str(totals["total"]),
+                "sales_affected": len(totals["sale_ids"]),
+            }
+        )
+    authors.sort(key=lambda row: (row["author_name"].lower(), row["author_id"]))
+
+    return {
+        "payment_batch_id": batch.pk if batch is not None else None,
+        "author_sales_marked_paid": sum(t["author_sales"] for t in by_author.values()),
+        "total_royalties_paid": str(sum((t["total"] for t in by_author.values()), Decimal("0.00"))),
+        "authors": authors,
+    }
@@ -0,0 +1,401 @@
+# services/sales_bulk.py
+# Bulk sale creation (sale/createmany and background imports), bulk edits (sale/bulk_edit)
+# and bulk deletes (sale/bulk_delete).
+#
+# Validation still goes through SaleCreateSerializer, so every row gets exactly the same
+# error messages as sale/create, but books, royalty rates and author names are preloaded
+# with ONE query instead of being looked up per row. Inserts are bulk_create'd in chunks.
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from rest_framework import serializers
+
+from ..models import Book, Sale, AuthorSale, allocate_author_sales
+from ..serializers.sales import SaleSerializer, SaleCreateSerializer
+from .author_stats import invalidate_sale_author_stats
+from .balances import author_sale_rows, delete_author_sales, record_author_sale_changes, record_author_sales
+from .versioning import bulk_update_with_versions, parse_version
+
+SALE_BULK_CHUNK_SIZE = 2000
+
+# How many sale ids a bulk delete dry run lists.
+SALE_DELETE_PREVIEW_SIZE = 100
+
+_BOOK_FIELDS = ["id", "title", "publication_date", "isbn_13", "isbn_10"]
+
+
+def referenced_book_ids(rows):
+    """Collect the (int) book ids referenced by raw sale rows, ignoring malformed values."""
+    book_ids = set()
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        try:
+            book_ids.add(int(row.get("book")))
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return book_ids
+
+
+def load_sale_context(book_ids):
+    """
+    Preload what sale validation + royalty allocation need for ``book_ids`` in a single query
+    (Book LEFT JOIN AuthorBook LEFT JOIN Author).
+
+    Returns a dict usable directly as SaleCreateSerializer context:
+      books:        {book_id: Book}
+      rates:        {book_id: [(author_id, royalty_rate), ...]}
+      author_names: {"<author_id>": name}
+    """
+    books = {}
+    rates = defaultdict(list)
+    author_names = {}
+
+    rows = (
+        Book.objects
+        .filter(id__in=book_ids)
+        .order_by("id", "authorbook__author_id")
+        .values_list(
+            *_BOOK_FIELDS,
+            "authorbook__author_id",
+            "authorbook__royalty_rate",
+            "authorbook__author__name",
+        )
+    )
+
+    book_field_count = len(_BOOK_FIELDS)
+    for row in rows:
+        book_id = row[0]
+        if book_id not in books:
+            books[book_id] = Book.from_db(Book.objects.db, _BOOK_FIELDS, row[:book_field_count])
+
+        author_id, royalty_rate, author_name = row[book_field_count:]
+        if author_id is not None:
+            rates[book_id].append((author_id, royalty_rate))
+            author_names[str(author_id)] = author_name
+
+    return {"books": books, "rates": dict(rates), "author_names": author_names}
+
+
+def validate_sale_rows(rows, context):
+    """
+    Validate raw sale rows in memory against a preloaded context.
+
+    Returns (validated_rows, errors); errors use the createmany shape
+    [{"index": i, "errors": {...}}, ...].
+    """
+    serializer = SaleCreateSerializer(context=context)
+
+    validated = []
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            validated.append(serializer.run_validation(row))
+        except serializers.ValidationError as exc:
+            errors.append({"index": index, "errors": exc.detail})
+
+    return validated, errors
+
+
+def bulk_create_sales(validated_rows, context, chunk_size=SALE_BULK_CHUNK_SIZE):
+    """
+    Insert validated rows: per chunk, one bulk INSERT for Sales, one for their AuthorSales and
+    one AuthorBalance upsert.
+    Callers wrap this in transaction.atomic() when the batch must be all-or-nothing.
+
+    Returns the created sale ids in input order.
+    """
+    rates = context["rates"]
+    sale_ids = []
+
+    for start in range(0, len(validated_rows), chunk_size):
+        chunk = validated_rows[start:start + chunk_size]
+
+        sales = Sale.objects.bulk_create([
+            Sale(
+                book=row["book"],
+                date=row["date"],
+                quantity=row["quantity"],
+                publisher_revenue=row["publisher_revenue"],
+            )
+            for row in chunk
+        ])
+
+        author_sales = []
+        for sale, row in zip(sales, chunk):
+            author_sales.extend(
+                allocate_author_sales(
+                    sale,
+                    rates.get(sale.book_id, ()),
+                    row.get("author_royalties"),
+                    row.get("author_paid"),
+                )
+            )
+        AuthorSale.objects.bulk_create(author_sales, batch_size=chunk_size)
+        record_author_sales(author_sales)
+
+        sale_ids.extend(sale.pk for sale in sales)
+
+    return sale_ids
+
+
+def create_sales_bulk(rows, chunk_size=SALE_BULK_CHUNK_SIZE):
+    """
+    Validate every row first, then insert them all in one transaction.
+    Nothing is written if any row is invalid.
+
+    Returns (sale_ids, errors).
+    """
+    context = load_sale_context(referenced_book_ids(rows))
+
+    validated, errors = validate_sale_rows(rows, context)
+    if errors:
+        return [], errors
+
+    with transaction.atomic():
+        sale_ids = bulk_create_sales(validated, context, chunk_size)
+
+    return sale_ids, []
+
+
+def serialize_sales(sale_ids, chunk_size=SALE_BULK_CHUNK_SIZE):
+    """SaleSerializer output for ``sale_ids`` (in id order), a constant number of queries per chunk."""
+    data = []
+    for start in range(0, len(sale_ids), chunk_size):
+        sales = (
+            Sale.objects
+            .filter(id__in=sale_ids[start:start + chunk_size])
+            .select_related("book")
+            .prefetch_related("author_sales__author")
+            .order_by("id")
+        )
+        data.extend(SaleSerializer(sales, many=True).data)
+    return data
+
+
+SALE_EDITABLE_FIELDS = ["book", "date", "quantity", "publisher_revenue"]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _parse_sale_id(update):
+    if not isinstance(update, dict):
+        return None
+    sale_id = update.get("id")
+    if isinstance(sale_id, bool):
+        return None
+    try:
+        return int(sale_id)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _current_values(sale):
+    """The sale as a request row, so partial updates validate like a full sale/edit payload."""
+    return {
+        "book": sale.book_id,
+        "date": sale.date.isoformat(),
+        "quantity": sale.quantity,
+        "publisher_revenue": sale.publisher_revenue,
+    }
+
+
+def _update_versions(update):
+    """The optional optimistic-concurrency versions of one update (see services/versioning.py)."""
+    author_versions = update.get("author_versions") or {}
+    if not isinstance(author_versions, dict):
+        raise ValueError("author_versions must map author ids to versions.")
+    parsed = {str(k): parse_version(v) for k, v in author_versions.items()}
+    return {
+        "version": parse_version(update.get("version")),
+        "author_versions": {k: v for k, v in parsed.items() if v is not None},
+    }
+
+
+def validate_sale_updates(updates):
+    """
+    Validate partial updates [{"id": sale_id, <sale/edit fields>}, ...] against one snapshot:
+    the referenced sales (one query) and the books/rates/authors they use before and after
+    the edit (one load_sale_context query). Omitted fields keep their current values.
+
+    Returns (pairs, context, errors) where pairs is [(Sale, validated_data), ...].
+    """
+    sale_ids = [_parse_sale_id(update) for update in updates]
+    sales = Sale.objects.only(*SALE_EDITABLE_FIELDS, "version").in_bulk([i for i in sale_ids if i is not None])
+
+    book_ids = {sale.book_id for sale in sales.values()} | referenced_book_ids(updates)
+    context = load_sale_context(book_ids)
+    serializer = SaleCreateSerializer(context=context)
+
+    pairs = []
+    errors = []
+    seen = set()
+    for index, (update, sale_id) in enumerate(zip(updates, sale_ids)):
+        if sale_id is None:
+            errors.append({"index": index, "errors": {"id": ["A valid sale id is required."]}})
+            continue
+        if sale_id in seen:
+            errors.append({"index": index, "errors": {"id": [f"Sale {sale_id} appears more than once."]}})
+            continue
+        seen.add(sale_id)
+
+        sale = sales.get(sale_id)
+        if sale is None:
+            errors.append({"index": index, "errors": {"id": [f"Sale {sale_id} does not exist."]}})
+            continue
+
+        try:
+            versions = _update_versions(update)
+        except ValueError as exc:
+            errors.append({"index": index, "errors": {"version": [str(exc)]}})
+            continue
+
+        row = _current_values(sale)
+        row.update({k: v for k, v in update.items() if k not in ("id", "version", "author_versions")})
+        try:
+            validated = serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            errors.append({"index": index, "errors": exc.detail})
+            continue
+        validated.update(versions)
+        pairs.append((sale, validated))
+
+    return pairs, context, errors
+
+
+def apply_sale_updates(pairs, context, chunk_size=SALE_BULK_CHUNK_SIZE):
+    """
+    Write validated updates with sale/{id}/edit semantics:
+      - sale fields: one version-checked bulk UPDATE per batch
+      - book changed: the sale's AuthorSales are rebuilt from the new book's rates
+        (one DELETE + one bulk INSERT per chunk; overrides still win)
+      - otherwise overrides go to the existing AuthorSales (one SELECT + one version-checked
+        bulk UPDATE per chunk)
+    AuthorBalance follows every AuthorSale change (one upsert per DELETE/INSERT/UPDATE); the
+    edited sales' authors get their cached stats dropped (one SELECT per chunk).
+    Raises VersionConflict when a row changed since the client (or the snapshot) read it.
+    Callers wrap this in transaction.atomic().
+    """
+    rates = context["rates"]
+    rebuild = []
+    overridden = {}
+    sale_versions = {}
+
+    for sale, data in pairs:
+        sale_versions[sale.pk] = data.get("version") or sale.version
+        old_book_id = sale.book_id
+        for field in SALE_EDITABLE_FIELDS:
+            setattr(sale, field, data[field])
+
+        royalties = data.get("author_royalties") or {}
+        paid = data.get("author_paid") or {}
+        if sale.book_id != old_book_id:
+            rebuild.append((sale, royalties, paid))
+        elif royalties or paid:
+            overridden[sale.pk] = (royalties, paid, data.get("author_versions") or {})
+
+    bulk_update_with_versions([sale for sale, _ in pairs], SALE_EDITABLE_FIELDS, sale_versions)
+    # before any rebuild, so the authors a sale is moved away from are included
+    for chunk in _chunks([sale.pk for sale, _ in pairs], chunk_size):
+        invalidate_sale_author_stats(chunk)
+
+    for chunk in _chunks(rebuild, chunk_size):
+        delete_author_sales(AuthorSale.objects.filter(sale_id__in=[sale.pk for sale, _, _ in chunk]))
+        author_sales = []
+        for sale, royalties, paid in chunk:
+            author_sales.extend(allocate_author_sales(sale, rates.get(sale.book_id, ()), royalties, paid))
+        AuthorSale.objects.bulk_create(author_sales, batch_size=chunk_size)
+        record_author_sales(author_sales)
+
+    for chunk in _chunks(list(overridden), chunk_size):
+        changed = []
+        before = []
+        expected = {}
+        for ars in AuthorSale.objects.filter(sale_id__in=chunk):
+            royalties, paid, author_versions = overridden[ars.sale_id]
+            key = str(ars.author_id)
+            if key in royalties or key in paid:
+                before.extend(author_sale_rows([ars]))
+                if key in royalties:
+                    ars.royalty_amount = royalties[key]
+                if key in paid:
+                    ars.author_paid = bool(paid[key])
+                changed.append(ars)
+                expected[ars.pk] = author_versions.get(key, ars.version)
+        bulk_update_with_versions(changed, ["royalty_amount", "author_paid"], expected)
+        record_author_sale_changes(before, author_sale_rows(changed))
+
+
+def edit_sales_bulk(updates, chunk_size=SALE_BULK_CHUNK_SIZE):
+    """
+    Validate every update first, then apply them all in one transaction.
+    Nothing is written if any update is invalid.
+
+    Returns (sale_ids, errors); sale_ids are in input order.
+    """
+    pairs, context, errors = validate_sale_updates(updates)
+    if errors:
+        return [], errors
+
+    with transaction.atomic():
+        apply_sale_updates(pairs, context, chunk_size)
+
+    return [sale.pk for sale, _ in pairs], []
+
+
+def preview_sale_deletion(queryset, sample_size=SALE_DELETE_PREVIEW_SIZE):
+    """What delete_sales_chunked(queryset) would remove, in three aggregate/limit queries."""
+    sales = queryset.aggregate(sales=Count("id"), publisher_revenue=Sum("publisher_revenue"))
+    author_sales = AuthorSale.objects.filter(sale_id__in=queryset.values("id")).aggregate(
+        author_sales=Count("id"),
+        paid_author_sales=Count("id", filter=Q(author_paid=True)),
+        royalty_amount=Sum("royalty_amount"),
+    )
+    sample_ids = list(queryset.order_by("id").values_list("id", flat=True)[:sample_size])
+
+    return {
+        "sales": sales["sales"],
+        "author_sales": author_sales["author_sales"],
+        "paid_author_sales": author_sales["paid_author_sales"],
+        "publisher_revenue": sales["publisher_revenue"] or 0,
+        "royalty_amount": author_sales["royalty_amount"] or 0,
+        "sale_ids": sample_ids,
+    }
+
+
+def delete_sales_chunked(queryset, chunk_size=SALE_BULK_CHUNK_SIZE):
+    """
+    Delete the sales selected by ``queryset`` and their AuthorSales in bounded chunks.
+
+    Per chunk (keyset over id): one id SELECT, one AuthorSale DELETE (+ AuthorBalance upsert) and one Sale DELETE,
+    committed together, so locks stay short and large ranges are never loaded at once.
+    A failure leaves earlier chunks deleted; re-running with the same selection continues.
+
+    Returns (deleted_sales, deleted_author_sales).
+    """
+    ids = queryset.order_by("id").values_list("id", flat=True)
+    deleted_sales = deleted_author_sales = 0
+    last_id = None
+
+    while True:
+        page = ids if last_id is None else ids.filter(id__gt=last_id)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            break
+
+        with transaction.atomic():
+            author_sales = delete_author_sales(AuthorSale.objects.filter(sale_id__in=chunk))
+            # AuthorSale is Sale's only dependent and was just removed, so skip the
+            # collector (which would SELECT every Sale row first) and delete directly.
+            sales = Sale.objects.filter(id__in=chunk)._raw_delete(Sale.objects.db)
+
+        deleted_author_sales += author_sales
+        deleted_sales += sales
+        last_id = chunk[-1]
+
+    return deleted_sales, deleted_author_sales
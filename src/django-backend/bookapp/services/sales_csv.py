@@ -0,0 +1,299 @@
+# services/sales_csv.py
+# Set-based CSV sales import (sale/createmany/csv, `manage.py import_sales`, CSV import jobs).
+#
+# The file is never parsed row-by-row in Python: the header is read to map columns, and the
+# rest of the stream is piped through COPY into a temp staging table. Parsing, validation
+# (same messages as SaleCreateSerializer) and the Sale/AuthorSale inserts are all single SQL
+# statements over that table, so large backfills cost a handful of round trips.
+#
+# PostgreSQL only (COPY, temp tables, sequences).
+
+import codecs
+import csv
+
+from django.db import DatabaseError, connection, transaction
+
+from ..models import AuthorBalance, AuthorBook, AuthorSale, Book, Sale
+from .author_stats import invalidate_author_stats
+
+STAGING_TABLE = "sale_csv_staging"
+PARSED_TABLE = "sale_csv_parsed"
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Only the first N failing rows are returned (error_count has the full number).
+CSV_IMPORT_MAX_ERRORS = 1000
+
+# CSV header name -> staging column
+CSV_COLUMNS = {
+    "book": "book",
+    "book_id": "book",
+    "date": "date",
+    "quantity": "quantity",
+    "publisher_revenue": "publisher_revenue",
+}
+REQUIRED_COLUMNS = ("book", "date", "quantity", "publisher_revenue")
+
+INT_MAX = 2147483647
+
+
+class SaleCsvImportError(Exception):
+    """The CSV as a whole cannot be imported (bad header, malformed file, wrong database)."""
+
+
+def _q(name):
+    return connection.ops.quote_name(name)
+
+
+def _staging_columns(header_line):
+    """Map the CSV header to staging column names (unknown columns are kept but ignored)."""
+    try:
+        names = next(csv.reader([codecs.decode(header_line, "utf-8-sig")]))
+    except (StopIteration, UnicodeDecodeError, csv.Error) as exc:
+        raise SaleCsvImportError("Could not read the CSV header row.") from exc
+
+    columns = []
+    for index, name in enumerate(names):
+        columns.append(CSV_COLUMNS.get(name.strip().lower(), f"ignored_{index}"))
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise SaleCsvImportError(f"CSV is missing required column(s): {', '.join(missing)}.")
+
+    duplicated = sorted({c for c in columns if columns.count(c) > 1 and not c.startswith("ignored_")})
+    if duplicated:
+        raise SaleCsvImportError(f"CSV has duplicate column(s): {', '.join(duplicated)}.")
+
+    return columns
+
+
+def _create_staging(cursor, columns):
+    # ON COMMIT DROP only fires at the outermost commit; drop leftovers from an earlier
+    # import in the same (outer) transaction first.
+    cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}, {PARSED_TABLE}")
+
+    text_columns = ", ".join(f"{_q(c)} text" for c in columns)
+    cursor.execute(
+        f"CREATE TEMP TABLE {STAGING_TABLE} ("
+        f"row_no bigint GENERATED ALWAYS AS IDENTITY, {text_columns}"
+        f") ON COMMIT DROP"
+    )
+
+
+def _copy_rows(cursor, columns, stream):
+    sql = (
+        f"COPY {STAGING_TABLE} ({', '.join(_q(c) for c in columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, ENCODING 'UTF8')"
+    )
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, stream, size=COPY_BUFFER_SIZE)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                while chunk := stream.read(COPY_BUFFER_SIZE):
+                    copy.write(chunk)
+    except (DatabaseError, connection.Database.Error) as exc:
+        raise SaleCsvImportError(f"Could not read CSV: {exc}".strip()) from exc
+
+
+# Parse the raw text columns into typed columns (CREATE TABLE AS: one sequential pass, no
+# UPDATE churn). Every cast is guarded by a CASE so malformed values become NULL instead of
+# aborting the statement; the trimmed raw values are kept for error messages.
+_PARSE_SQL = f"""
+CREATE TEMP TABLE {PARSED_TABLE} ON COMMIT DROP AS
+WITH raw AS (
+    SELECT
+        row_no,
+        NULLIF(btrim(book), '') AS book,
+        NULLIF(btrim(date), '') AS date,
+        NULLIF(btrim(quantity), '') AS quantity,
+        NULLIF(NULLIF(btrim(publisher_revenue), ''), '--') AS revenue
+    FROM {STAGING_TABLE}
+),
+-- MATERIALIZED: evaluate each regex once per row instead of once per use
+checked AS MATERIALIZED (
+    SELECT
+        raw.*,
+        book ~ '^[0-9]{{1,18}}$' AS book_ok,
+        quantity ~ '^[+-]?[0-9]+(\\.0*)?$' AS quantity_ok,
+        revenue ~ '^[+-]?([0-9]+(\\.[0-9]*)?|\\.[0-9]+)$' AS revenue_ok,
+        date ~ '^[0-9]{{4}}-[0-9]{{1,2}}-[0-9]{{1,2}}$' AS date_ok
+    FROM raw
+),
+parts AS (
+    SELECT
+        row_no, book, date, quantity, revenue,
+        CASE WHEN book_ok THEN book::bigint END AS book_id,
+        CASE WHEN quantity_ok THEN quantity::numeric END AS quantity_num,
+        CASE WHEN revenue_ok THEN revenue::numeric END AS revenue_num,
+        CASE WHEN revenue_ok THEN length(ltrim(split_part(ltrim(revenue, '+-'), '.', 1), '0')) END AS revenue_whole,
+        CASE WHEN revenue_ok THEN length(split_part(revenue, '.', 2)) END AS revenue_places,
+        CASE WHEN date_ok THEN split_part(date, '-', 1)::int END AS y,
+        CASE WHEN date_ok THEN split_part(date, '-', 2)::int END AS m,
+        CASE WHEN date_ok THEN split_part(date, '-', 3)::int END AS d
+    FROM checked
+)
+SELECT
+    parts.*,
+    CASE WHEN y >= 1 AND m BETWEEN 1 AND 12 THEN
+        CASE WHEN d BETWEEN 1 AND extract(day FROM make_date(y, m, 1) + interval '1 month - 1 day')
+            THEN make_date(y, m, d)
+        END
+    END AS sale_date
+FROM parts
+"""
+
+
+def _errors_sql(book_table):
+    # One row per failing row. "field_*" columns are field-level errors (the serializer reports
+    # only those when present); the others are SaleCreateSerializer.validate() errors.
+    # An empty cell counts as a missing value.
+    return f"""
+WITH checks AS (
+    SELECT
+        p.row_no,
+        CASE
+            WHEN p.book IS NOT NULL AND p.book_id IS NULL
+                THEN 'Incorrect type. Expected pk value, received str.'
+            WHEN p.book_id IS NOT NULL AND b.id IS NULL
+                THEN 'Invalid pk "' || p.book || '" - object does not exist.'
+        END AS field_book,
+        CASE
+            WHEN p.quantity IS NOT NULL AND p.quantity_num IS NULL THEN 'A valid integer is required.'
+            WHEN p.quantity_num > {INT_MAX} THEN 'Ensure this value is less than or equal to {INT_MAX}.'
+        END AS field_quantity,
+        CASE
+            WHEN p.revenue IS NOT NULL AND p.revenue_num IS NULL THEN 'A valid number is required.'
+            WHEN p.revenue_whole + p.revenue_places > 10
+                THEN 'Ensure that there are no more than 10 digits in total.'
+            WHEN p.revenue_places > 2 THEN 'Ensure that there are no more than 2 decimal places.'
+            WHEN p.revenue_whole > 8 THEN 'Ensure that there are no more than 8 digits before the decimal point.'
+        END AS field_publisher_revenue,
+        CASE WHEN p.book IS NULL THEN 'Book is required.' END AS book,
+        CASE
+            WHEN p.date IS NULL THEN 'Date is required.'
+            WHEN p.sale_date IS NULL THEN 'Please provide sale date in Month, Year format.'
+            WHEN p.sale_date < b.publication_date
+                THEN 'Sale date (' || to_char(p.sale_date, 'YYYY-MM-DD')
+                    || ') cannot be before book publication date ('
+                    || to_char(b.publication_date, 'YYYY-MM-DD') || ').'
+        END AS date,
+        CASE
+            WHEN p.quantity IS NULL THEN 'Quantity is required.'
+            WHEN p.quantity_num <= 0 THEN 'Quantity must be a positive integer.'
+        END AS quantity,
+        CASE
+            WHEN p.revenue IS NULL THEN 'Publisher revenue is required.'
+            WHEN p.revenue_num < 0 THEN 'Publisher revenue cannot be negative.'
+        END AS publisher_revenue
+    FROM {PARSED_TABLE} p
+    LEFT JOIN {book_table} b ON b.id = p.book_id
+)
+SELECT * FROM checks
+WHERE field_book IS NOT NULL OR field_quantity IS NOT NULL OR field_publisher_revenue IS NOT NULL
+   OR book IS NOT NULL OR date IS NOT NULL OR quantity IS NOT NULL OR publisher_revenue IS NOT NULL
+ORDER BY row_no
+"""
+
+
+def _collect_errors(cursor):
+    cursor.execute(_errors_sql(_q(Book._meta.db_table)))
+    names = [col[0] for col in cursor.description]
+
+    error_count = 0
+    errors = []
+    for record in cursor:
+        error_count += 1
+        if len(errors) >= CSV_IMPORT_MAX_ERRORS:
+            continue
+
+        row = dict(zip(names, record))
+        field_level = {k[len("field_"):]: v for k, v in row.items() if k.startswith("field_") and v}
+        validate_level = {
+            k: v for k, v in row.items()
+            if k in ("book", "date", "quantity", "publisher_revenue") and v
+        }
+        found = field_level or validate_level
+        errors.append({"index": row["row_no"] - 1, "errors": {k: [v] for k, v in found.items()}})
+
+    return error_count, errors
+
+
+def _insert_sales(cursor):
+    """
+    One statement: insert the Sales and, from their RETURNING rows, the AuthorSales
+    (same allocation as Sale.create_author_sales: revenue * current AuthorBook rate, unpaid),
+    adding the new royalties to AuthorBalance.
+    Returns the number of sales created and drops the cached stats of the authors paid.
+    """
+    cursor.execute(
+        f"""
+        WITH new_sales AS (
+            INSERT INTO {_q(Sale._meta.db_table)} (book_id, date, quantity, publisher_revenue)
+            SELECT book_id, sale_date, quantity_num::int, revenue_num
+            FROM {PARSED_TABLE}
+            ORDER BY row_no
+            RETURNING id, book_id, publisher_revenue
+        ),
+        new_author_sales AS (
+            INSERT INTO {_q(AuthorSale._meta.db_table)} (sale_id, author_id, royalty_amount, author_paid)
+            SELECT s.id, ab.author_id, round(s.publisher_revenue * ab.royalty_rate, 2), false
+            FROM new_sales s
+            JOIN {_q(AuthorBook._meta.db_table)} ab ON ab.book_id = s.book_id
+            RETURNING author_id, royalty_amount
+        ),
+        balances AS (
+            INSERT INTO {_q(AuthorBalance._meta.db_table)}
+                (author_id, earned_total, paid_total, unpaid_total, unpaid_count)
+            SELECT author_id, sum(royalty_amount), 0, sum(royalty_amount), count(*)
+            FROM new_author_sales
+            GROUP BY author_id
+            ORDER BY author_id
+            ON CONFLICT (author_id) DO UPDATE SET
+                earned_total = {_q(AuthorBalance._meta.db_table)}.earned_total + EXCLUDED.earned_total,
+                unpaid_total = {_q(AuthorBalance._meta.db_table)}.unpaid_total + EXCLUDED.unpaid_total,
+                unpaid_count = {_q(AuthorBalance._meta.db_table)}.unpaid_count + EXCLUDED.unpaid_count
+            RETURNING author_id
+        )
+        SELECT (SELECT count(*) FROM new_sales), ARRAY(SELECT author_id FROM balances)
+        """
+    )
+    created, author_ids = cursor.fetchone()
+    invalidate_author_stats(author_ids)
+    return created
+
+
+def import_sales_csv(stream, dry_run=False):
+    """
+    Import a CSV (binary stream; header row with book, date, quantity, publisher_revenue).
+
+    All-or-nothing like sale/createmany: when any row is invalid nothing is written.
+    Returns {"total_rows", "created_count", "error_count", "errors"} where errors use the
+    createmany shape [{"index": <0-based data row>, "errors": {field: [message]}}].
+    Raises SaleCsvImportError when the file as a whole cannot be imported.
+    """
+    if connection.vendor != "postgresql":
+        raise SaleCsvImportError("CSV import requires PostgreSQL.")
+
+    header_line = stream.readline()
+    if not header_line.strip():
+        raise SaleCsvImportError("CSV is empty.")
+    columns = _staging_columns(header_line)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            _create_staging(cursor, columns)
+            _copy_rows(cursor, columns, stream)
+
+            cursor.execute(_PARSE_SQL)
+            total_rows = cursor.rowcount
+            cursor.execute(f"ANALYZE {PARSED_TABLE}")
+            error_count, errors = _collect_errors(cursor)
+
+            result = {"total_rows": total_rows, "created_count": 0, "error_count": error_count, "errors": errors}
+            if error_count or dry_run:
+                transaction.set_rollback(True)
+                return result
+
+            result["created_count"] = _insert_sales(cursor)
+
+    return result
@@ -0,0 +1,310 @@
+# services/sales_import.py
+# Background processing of SaleImportJob rows (queued by sale/import, run by
+# `manage.py run_sale_import_worker`). The job table itself is the queue.
+#
+# A job is processed in two chunked passes over the stored upload (read as a stream, never held
+# in memory as a whole):
+#   1. validating - every row is validated (same rules/messages as sale/createmany);
+#                   if any row fails, the job fails and nothing is written.
+#   2. importing  - rows are bulk inserted chunk by chunk; each chunk commits together
+#                   with the job's created_count, so progress always matches the DB.
+#
+# created_count is the resume point: a job whose worker died (no progress write for
+# SALE_IMPORT_STALE_SECONDS) is claimed again and continues after the rows already committed.
+# Progress writes only succeed for the claim that is still current (started_at), so a worker
+# that lost its job rolls back its open chunk instead of importing rows twice.
+#
+# .csv uploads go through the COPY-based importer instead (one transaction, set-based SQL).
+
+import codecs
+import json
+import re
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import SaleImportJob
+from .sales_bulk import (
+    SALE_BULK_CHUNK_SIZE,
+    referenced_book_ids,
+    load_sale_context,
+    validate_sale_rows,
+    bulk_create_sales,
+)
+from .sales_csv import SaleCsvImportError, import_sales_csv
+
+# Only the first N row errors are stored on the job (error_count has the full number).
+SALE_IMPORT_MAX_STORED_ERRORS = 1000
+
+# Uploads with these suffixes hold one JSON sale per line; anything else (but .csv) is a JSON list.
+SALE_IMPORT_NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+# Bytes read from the upload at a time while streaming a JSON list.
+SALE_IMPORT_READ_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"\s*")
+_decoder = json.JSONDecoder()
+
+
+class SaleImportFileError(Exception):
+    """The uploaded file could not be turned into sale rows."""
+
+
+class SaleImportJobLost(Exception):
+    """The job was reclaimed by another worker after this one stopped writing progress."""
+
+
+def _parse_error(detail):
+    return SaleImportFileError(f"Could not parse upload as JSON: {detail}")
+
+
+def _iter_json_lines(fh):
+    for number, line in enumerate(fh, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise _parse_error(f"line {number}: {exc}") from exc
+
+
+def _iter_json_list(fh):
+    """
+    Yield the items of a top-level JSON list, reading SALE_IMPORT_READ_SIZE bytes at a time.
+    Only the unparsed tail of the input is buffered (a malformed item is only reported at the
+    end of the file, where it can no longer be an item cut off by the block boundary).
+    """
+    decode = codecs.getincrementaldecoder("utf-8-sig")().decode
+    buf, pos, eof = "", 0, False
+    expect = "open"  # open -> first -> next -> item -> next ... -> None after the closing "]"
+
+    def read_more():
+        nonlocal buf, pos, eof
+        block = fh.read(SALE_IMPORT_READ_SIZE)
+        eof = not block
+        buf = buf[pos:] + decode(block, final=eof)
+        pos = 0
+
+    while expect:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            if eof:
+                raise _parse_error("unexpected end of file")
+            read_more()
+            continue
+
+        char = buf[pos]
+        if expect == "open":
+            if char != "[":
+                raise _parse_error("expected a list of sales")
+            pos += 1
+            expect = "first"
+        elif char == "]" and expect in ("first", "next"):
+            pos += 1
+            expect = None
+        elif expect == "next":
+            if char != ",":
+                raise _parse_error(f"expected ',' or ']' at character {pos}")
+            pos += 1
+            expect = "item"
+        else:
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise _parse_error(exc) from exc
+                read_more()
+                continue
+            if end == len(buf) and not eof:
+                # a number (or the whole item) may continue in the next block
+                read_more()
+                continue
+            pos = end
+            expect = "next"
+            yield item
+
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos < len(buf):
+            raise _parse_error("extra data after the list")
+        if eof:
+            return
+        read_more()
+
+
+def iter_import_rows(job):
+    """
+    Yield the rows of the stored upload one at a time: a JSON list (same shape as
+    sale/createmany) or, for .ndjson/.jsonl files, one JSON sale per line.
+    Raises SaleImportFileError when the file cannot be parsed.
+    """
+    name = job.upload.name.lower()
+    reader = _iter_json_lines if name.endswith(SALE_IMPORT_NDJSON_SUFFIXES) else _iter_json_list
+    with job.upload.open("rb") as fh:
+        try:
+            yield from reader(fh)
+        except UnicodeDecodeError as exc:
+            raise _parse_error(exc) from exc
+
+
+def _chunks(rows, size):
+    """(index of the first row, list of rows) for consecutive chunks of an iterable."""
+    rows = iter(rows)
+    start = 0
+    while chunk := list(islice(rows, size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+def claim_next_job():
+    """
+    Take the oldest queued job, or a validating/importing job whose worker stopped writing
+    progress SALE_IMPORT_STALE_SECONDS ago, and mark it as started by this worker.
+    SKIP LOCKED lets several workers poll the table without handing out a job twice.
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.SALE_IMPORT_STALE_SECONDS)
+    running = Q(status__in=[SaleImportJob.STATUS_VALIDATING, SaleImportJob.STATUS_IMPORTING])
+    with transaction.atomic():
+        job = (
+            SaleImportJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status=SaleImportJob.STATUS_QUEUED)
+                | running & Q(heartbeat_at__lt=stale_before)
+                | running & Q(heartbeat_at__isnull=True, started_at__lt=stale_before)
+            )
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+
+        # a reclaimed job validates again from the top; created_count (committed rows) is kept
+        job.status = SaleImportJob.STATUS_VALIDATING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.total_rows = job.validated_rows = job.error_count = 0
+        job.errors = []
+        job.save(update_fields=[
+            "status", "started_at", "heartbeat_at", "total_rows", "validated_rows", "error_count", "errors",
+        ])
+
+    return job
+
+
+def _save_progress(job, fields):
+    """
+    Save ``fields`` and a fresh heartbeat, but only while ``job`` is still this worker's claim
+    (raises SaleImportJobLost otherwise; inside a chunk's transaction that rolls the chunk back).
+    """
+    job.heartbeat_at = timezone.now()
+    updated = SaleImportJob.objects.filter(pk=job.pk, started_at=job.started_at).update(
+        heartbeat_at=job.heartbeat_at, **{field: getattr(job, field) for field in fields}
+    )
+    if not updated:
+        raise SaleImportJobLost(f"Sale import {job.pk} was reclaimed by another worker")
+
+
+def _finish(job, status, message=""):
+    job.status = status
+    job.message = message
+    job.finished_at = timezone.now()
+    _save_progress(job, ["status", "message", "finished_at"])
+
+
+def _validate(job, chunk_size):
+    for start, rows in _chunks(iter_import_rows(job), chunk_size):
+        context = load_sale_context(referenced_book_ids(rows))
+        _, chunk_errors = validate_sale_rows(rows, context)
+
+        for error in chunk_errors:
+            error["index"] += start
+            if len(job.errors) < SALE_IMPORT_MAX_STORED_ERRORS:
+                job.errors.append(error)
+
+        job.error_count += len(chunk_errors)
+        job.validated_rows = start + len(rows)
+        _save_progress(job, ["validated_rows", "error_count", "errors"])
+
+    job.total_rows = job.validated_rows
+    _save_progress(job, ["total_rows"])
+
+
+def _import(job, chunk_size):
+    job.status = SaleImportJob.STATUS_IMPORTING
+    _save_progress(job, ["status"])
+
+    for start, rows in _chunks(iter_import_rows(job), chunk_size):
+        # rows before created_count were committed by an earlier claim of this job
+        skip = max(job.created_count - start, 0)
+        rows = rows[skip:]
+        if not rows:
+            continue
+
+        context = load_sale_context(referenced_book_ids(rows))
+        validated, errors = validate_sale_rows(rows, context)
+        if errors:
+            # e.g. a book was deleted after the validation pass
+            raise SaleImportFileError(
+                f"Import stopped after {job.created_count} row(s) were created: "
+                f"row {start + skip + errors[0]['index']} no longer validates: {errors[0]['errors']}"
+            )
+
+        with transaction.atomic():
+            bulk_create_sales(validated, context, chunk_size)
+            job.created_count += len(validated)
+            _save_progress(job, ["created_count"])
+
+
+def _import_csv(job):
+    with job.upload.open("rb") as fh, transaction.atomic():
+        result = import_sales_csv(fh)
+
+        job.total_rows = result["total_rows"]
+        job.validated_rows = result["total_rows"]
+        job.error_count = result["error_count"]
+        job.errors = result["errors"][:SALE_IMPORT_MAX_STORED_ERRORS]
+        job.created_count = result["created_count"]
+        # commits with the imported rows, so a reclaimed job's worker imports nothing
+        _save_progress(job, ["total_rows", "validated_rows", "error_count", "errors", "created_count"])
+
+
+def run_import_job(job, chunk_size=SALE_BULK_CHUNK_SIZE):
+    """
+    Process a claimed job to completion. Always leaves the job succeeded or failed;
+    unexpected exceptions are recorded on the job and re-raised for the worker to log.
+    Raises SaleImportJobLost (nothing recorded) when another worker reclaimed the job.
+    """
+    try:
+        if job.upload.name.lower().endswith(".csv"):
+            _import_csv(job)
+        else:
+            _validate(job, chunk_size)
+            if not job.error_count:
+                _import(job, chunk_size)
+
+        if job.error_count:
+            _finish(
+                job,
+                SaleImportJob.STATUS_FAILED,
+                f"{job.error_count} row(s) failed validation; nothing was imported.",
+            )
+            return job
+    except SaleImportJobLost:
+        raise
+    except (SaleImportFileError, SaleCsvImportError) as exc:
+        _finish(job, SaleImportJob.STATUS_FAILED, str(exc))
+        return job
+    except Exception as exc:
+        _finish(
+            job,
+            SaleImportJob.STATUS_FAILED,
+            f"Import stopped after {job.created_count} row(s) were created: {exc}",
+        )
+        raise
+
+    _finish(job, SaleImportJob.STATUS_SUCCEEDED)
+    return job
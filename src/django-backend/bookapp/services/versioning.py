@@ -0,0 +1,111 @@
+# services/versioning.py
+# Optimistic concurrency for Sale / AuthorSale edits.
+#
+# Versioned rows carry a counter that every write bumps. Writers check it inside the UPDATE
+# itself (WHERE id = ... AND version = <version the client saw>), so edits never take row locks
+# and never block payouts; an UPDATE that matches fewer rows than expected means someone else
+# changed them first, and the edit is rejected (HTTP 409) instead of silently overwriting.
+
+from django.db import connection
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Cast
+from django.db.models.sql import UpdateQuery
+
+VERSIONED_UPDATE_BATCH_SIZE = 500
+
+
+class VersionConflict(Exception):
+    """Versioned rows changed since the caller read them."""
+
+    def __init__(self, model, pks):
+        self.model = model
+        self.pks = sorted(pks)
+        ids = ", ".join(str(pk) for pk in self.pks)
+        super().__init__(f"{model._meta.verbose_name.capitalize()} {ids} was changed by someone else. Reload and try again.")
+
+
+def parse_version(value):
+    """A client-supplied version: None when absent, else a positive int (ValueError otherwise)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError("version must be a positive integer.")
+    try:
+        version = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("version must be a positive integer.")
+    if version < 1:
+        raise ValueError("version must be a positive integer.")
+    return version
+
+
+def update_with_version(instance, fields, expected_version):
+    """
+    UPDATE ``fields`` of ``instance`` and bump its version, only if the stored version is still
+    ``expected_version``. One statement; raises VersionConflict when the row has moved on.
+    """
+    model = type(instance)
+    values = {}
+    for name in fields:
+        attname = model._meta.get_field(name).attname
+        values[attname] = getattr(instance, attname)
+
+    updated = model.objects.filter(pk=instance.pk, version=expected_version).update(
+        **values, version=F("version") + 1
+    )
+    if not updated:
+        raise VersionConflict(model, [instance.pk])
+    instance.version = expected_version + 1
+
+
+def _update_returning_pks(model, condition, values):
+    """QuerySet.update() that also reports which rows matched (UPDATE ... RETURNING pk)."""
+    query = UpdateQuery(model)
+    query.add_update_values(values)
+    query.add_q(condition)
+    sql, params = query.get_compiler(connection=connection).as_sql()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"{sql} RETURNING {connection.ops.quote_name(model._meta.pk.column)}", params)
+        return {row[0] for row in cursor.fetchall()}
+
+
+def bulk_update_with_versions(objs, fields, expected_versions=None, batch_size=VERSIONED_UPDATE_BATCH_SIZE):
+    """
+    bulk_update() with a version check: per batch one UPDATE ... SET field = CASE pk ... END,
+    version = version + 1 WHERE (pk = a AND version = va) OR ... RETURNING pk
+
+    ``expected_versions`` maps pk -> version (defaults to each object's loaded version).
+    Raises VersionConflict (listing exactly the rows that failed the check) when any does;
+    callers run this inside transaction.atomic() so nothing partial is kept.
+    """
+    objs = list(objs)
+    if not objs:
+        return
+    model = type(objs[0])
+    model_fields = [model._meta.get_field(name) for name in fields]
+    expected_versions = expected_versions or {}
+    requires_casting = connection.features.requires_casted_case_in_updates
+
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        expected = {obj.pk: expected_versions.get(obj.pk, obj.version) for obj in batch}
+
+        updates = {}
+        for field in model_fields:
+            case = Case(
+                *[When(pk=obj.pk, then=Value(getattr(obj, field.attname), output_field=field)) for obj in batch],
+                output_field=field,
+            )
+            updates[field.attname] = Cast(case, output_field=field) if requires_casting else case
+
+        condition = Q()
+        for pk, version in expected.items():
+            condition |= Q(pk=pk, version=version)
+
+        updated = _update_returning_pks(model, condition, {**updates, "version": F("version") + 1})
+        if len(updated) != len(batch):
+            raise VersionConflict(model, [pk for pk in expected if pk not in updated])
+
+        for obj in batch:
+            obj.version = expected[obj.pk] + 1
@@ -0,0 +1,113 @@
+import json
+import pytest
+from decimal import Decimal
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from bookapp.models import Book, Author, AuthorBook, Sale
+from bookapp.views.book import BookListCreateView, AsyncBookListCreateView
+from bookapp.views.sales import (
+    SaleGetView,
+    AsyncSaleGetView,
+    BookSalesTotalsView,
+    AsyncBookSalesTotalsView,
+    BookSalesTotalsBatchView,
+    AsyncBookSalesTotalsBatchView,
+)
+from bookapp.views.author_payments import AuthorPaymentsGroupedView, AsyncAuthorPaymentsGroupedView
+
+pytestmark = pytest.mark.django_db
+
+factory = APIRequestFactory()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def catalog():
+    alice = Author.objects.create(name="Alice")
+    bob = Author.objects.create(name="Bob")
+    books = []
+    for i in range(3):
+        book = Book.objects.create(title=f"Async Book {i}", publication_date="2020-01-01", isbn_13=f"978000000000{i}")
+        AuthorBook.objects.create(author=alice, book=book, royalty_rate=Decimal("0.10"))
+        if i:
+            AuthorBook.objects.create(author=bob, book=book, royalty_rate=Decimal("0.20"))
+        for month in range(1, 4):
+            Sale.objects.create(
+                book=book, date=f"2023-0{month}-01", quantity=month, publisher_revenue=Decimal("10.00") * month
+            ).create_author_sales()
+        books.append(book)
+    return books
+
+
+def call(view_class, user, path, params=None, **kwargs):
+    request = factory.get(path, params or {})
+    force_authenticate(request, user=user)
+    view = view_class.as_view()
+    if view_class.view_is_async:
+        return async_to_sync(view)(request, **kwargs)
+    return view(request, **kwargs)
+
+
+def body(response):
+    if response.streaming:
+        async def collect():
+            return b"".join([chunk.encode() if isinstance(chunk, str) else chunk async for chunk in response.streaming_content])
+        return json.loads(async_to_sync(collect)() if response.is_async else b"".join(response.streaming_content))
+    response.render()
+    return json.loads(response.content)
+
+
+@pytest.mark.parametrize(
+    "sync_view, async_view, path, params",
+    [
+        (BookListCreateView, AsyncBookListCreateView, "/api/books/", {"page_size": 2, "ordering": "-total_sales_to_date"}),
+        (BookListCreateView, AsyncBookListCreateView, "/api/books/", {"all": "true", "q": "Async", "fields": "id,title"}),
+        (SaleGetView, AsyncSaleGetView, "/api/sale/get_all", {"page": 2, "page_size": 4}),
+        (SaleGetView, AsyncSaleGetView, "/api/sale/get_all", {"all": "true", "start_date": "2023-02"}),
+        (BookSalesTotalsBatchView, AsyncBookSalesTotalsBatchView, "/api/sale/books/totals", None),
+        (BookSalesTotalsBatchView, AsyncBookSalesTotalsBatchView, "/api/sale/books/totals", {"ids": "x"}),
+        (AuthorPaymentsGroupedView, AsyncAuthorPaymentsGroupedView, "/api/author/payments/grouped", {"rows_per_author": 2}),
+        (AuthorPaymentsGroupedView, AsyncAuthorPaymentsGroupedView, "/api/author/payments/grouped", {"ordering": "-unpaid_total", "page_size": 1}),
+        (AuthorPaymentsGroupedView, AsyncAuthorPaymentsGroupedView, "/api/author/payments/grouped", {"all": "true", "rows_per_author": 2}),
+    ],
+)
+def test_async_views_match_sync_views(user, catalog, sync_view, async_view, path, params):
+    if params is None:
+        params = {"ids": ",".join(str(book.id) for book in catalog)}
+    expected = call(sync_view, user, path, params)
+    actual = call(async_view, user, path, params)
+    assert actual.status_code == expected.status_code
+    assert body(actual) == body(expected)
+
+
+def test_async_single_sale_and_book_totals(user, catalog):
+    sale = Sale.objects.filter(book=catalog[1]).first()
+    expected = call(SaleGetView, user, f"/api/sale/{sale.id}/get", sale_id=sale.id)
+    assert body(call(AsyncSaleGetView, user, f"/api/sale/{sale.id}/get", sale_id=sale.id)) == body(expected)
+    assert call(AsyncSaleGetView, user, "/api/sale/999999/get", sale_id=999999).status_code == 404
+
+    book_id = catalog[2].id
+    expected = call(BookSalesTotalsView, user, f"/api/sale/book/{book_id}/totals", book_id=book_id)
+    actual = call(AsyncBookSalesTotalsView, user, f"/api/sale/book/{book_id}/totals", book_id=book_id)
+    assert body(actual) == body(expected)
+    assert Decimal(body(actual)["total_royalties"]) == Decimal("18")
+
+
+def test_async_book_create_uses_sync_path(user):
+    payload = {
+        "title": "Async Created",
+        "publication_date": "2020-01-01",
+        "isbn_13": "9780000000099",
+        "authors": [{"author_name": "Alice", "royalty_rate": "0.15"}],
+    }
+    request = factory.post("/api/books/", payload, format="json")
+    force_authenticate(request, user=user)
+    response = async_to_sync(AsyncBookListCreateView.as_view())(request)
+    assert response.status_code == 201, response.data
+    assert Book.objects.filter(title="Async Created").exists()
@@ -0,0 +1,200 @@
+import json
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale, AuthorBalance
+from bookapp.services.balances import author_balance_drift
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def catalog():
+    alice = Author.objects.create(name="Alice")
+    bob = Author.objects.create(name="Bob")
+    b1 = Book.objects.create(title="Balance Book 1", publication_date="2020-01-01", isbn_13="9780000000001")
+    b2 = Book.objects.create(title="Balance Book 2", publication_date="2020-01-01", isbn_13="9780000000002")
+    AuthorBook.objects.create(author=alice, book=b1, royalty_rate=Decimal("0.10"))
+    AuthorBook.objects.create(author=bob, book=b1, royalty_rate=Decimal("0.20"))
+    AuthorBook.objects.create(author=bob, book=b2, royalty_rate=Decimal("0.50"))
+    return alice, bob, b1, b2
+
+
+def make_sale(book, revenue="100.00"):
+    sale = Sale.objects.create(book=book, date="2023-01-01", quantity=1, publisher_revenue=Decimal(revenue))
+    sale.create_author_sales()
+    return sale
+
+
+def balance(author):
+    b = AuthorBalance.objects.get(author=author)
+    return b.earned_total, b.paid_total, b.unpaid_total, b.unpaid_count
+
+
+def test_create_and_payout_update_balances(authed_client, catalog):
+    alice, bob, b1, b2 = catalog
+    resp = authed_client.post(
+        "/api/sale/create",
+        {"book": b1.id, "date": "2023-01-01", "quantity": 1, "publisher_revenue": "100.00"},
+        format="json",
+    )
+    assert resp.status_code == 201, resp.content
+    make_sale(b2)
+
+    assert balance(bob) == (Decimal("70.00"), Decimal("0.00"), Decimal("70.00"), 2)
+
+    assert authed_client.post(f"/api/author/{bob.id}/pay_unpaid_sales").status_code == 200
+    assert balance(bob) == (Decimal("70.00"), Decimal("70.00"), Decimal("0.00"), 0)
+    assert balance(alice) == (Decimal("10.00"), Decimal("0.00"), Decimal("10.00"), 1)
+    assert author_balance_drift() == []
+
+
+def test_edits_and_deletes_keep_balances_exact(authed_client, catalog):
+    alice, bob, b1, b2 = catalog
+    s1, s2, s3 = make_sale(b1), make_sale(b1), make_sale(b1)
+
+    # override + paid flag
+    resp = authed_client.post(
+        f"/api/sale/{s1.id}/edit",
+        {
+            "book": b1.id, "date": "2023-01-01", "quantity": 1, "publisher_revenue": "100.00",
+            "author_royalties": {str(alice.id): "3.00"}, "author_paid": {str(bob.id): True},
+        },
+        format="json",
+    )
+    assert resp.status_code == 200, resp.content
+    # book change rebuilds the allocations
+    resp = authed_client.post(
+        "/api/sale/bulk_edit", [{"id": s2.id, "book": b2.id}], format="json"
+    )
+    assert resp.status_code == 200, resp.content
+    assert author_balance_drift() == []
+
+    assert authed_client.delete(f"/api/sale/{s3.id}").status_code == 204
+    assert authed_client.post("/api/sale/bulk_delete", {"ids": [s1.id]}, format="json").status_code == 200
+    assert author_balance_drift() == []
+    assert balance(alice) == (Decimal("0.00"), Decimal("0.00"), Decimal("0.00"), 0)
+    assert balance(bob) == (Decimal("50.00"), Decimal("0.00"), Decimal("50.00"), 1)
+
+    assert authed_client.delete(f"/api/books/{b2.id}/").status_code == 204
+    assert author_balance_drift() == []
+
+
+def test_uneven_royalties_are_rounded_per_sale(authed_client, catalog):
+    alice, bob, b1, b2 = catalog
+    # 10.05 * 0.10 = 1.005 and 10.15 * 0.10 = 1.015: each AuthorSale is stored as 1.01 / 1.02
+    rows = [
+        {"book": b1.id, "date": "2023-01-01", "quantity": 1, "publisher_revenue": revenue}
+        for revenue in ("10.05", "10.05", "10.15")
+    ]
+    resp = authed_client.post("/api/sale/createmany", rows, format="json")
+    assert resp.status_code == 201, resp.content
+    assert sorted(AuthorSale.objects.filter(author=alice).values_list("royalty_amount", flat=True)) == [
+        Decimal("1.01"), Decimal("1.01"), Decimal("1.02")
+    ]
+    assert balance(alice) == (Decimal("3.04"), Decimal("0.00"), Decimal("3.04"), 3)
+
+    # rebuilt allocations round the same way (10.05 * 0.50 = 5.025)
+    resp = authed_client.post("/api/sale/bulk_edit", [{"id": resp.data[0]["id"], "book": b2.id}], format="json")
+    assert resp.status_code == 200, resp.content
+    assert balance(bob)[0] == Decimal("9.07")  # 2.01 + 2.03 on book 1, 5.03 on book 2
+    assert author_balance_drift() == []
+
+
+def test_views_read_balances(authed_client, catalog):
+    alice, bob, b1, _ = catalog
+    make_sale(b1)
+    # a write that bypasses the balance helpers is not seen until the balances are rebuilt
+    AuthorSale.objects.filter(author=alice).update(royalty_amount=Decimal("99.00"))
+
+    resp = authed_client.get(f"/api/author/{alice.id}/unpaid/subtotal")
+    assert resp.data["unpaid_subtotal"] == "10.00"
+
+    call_command("rebuild_author_balances")
+    resp = authed_client.get(f"/api/author/{alice.id}/unpaid/subtotal")
+    assert resp.data["unpaid_subtotal"] == "99.00"
+
+    resp = authed_client.get("/api/author/payments/grouped")
+    groups = {g["author"]["name"]: g for g in resp.data["results"]}
+    assert groups["Alice"]["unpaidTotal"] == 99.0
+    assert groups["Bob"]["unpaidCount"] == 1
+
+
+def test_verify_reports_drift(catalog, capsys):
+    alice, bob, b1, _ = catalog
+    make_sale(b1)
+    call_command("rebuild_author_balances", verify=True)
+
+    AuthorBalance.objects.filter(author=bob).update(unpaid_count=7)
+    with pytest.raises(CommandError):
+        call_command("rebuild_author_balances", verify=True)
+    assert f"author {bob.id}" in capsys.readouterr().out
+
+    call_command("rebuild_author_balances")
+    assert author_balance_drift() == []
+
+
+def names(resp):
+    return [g["author"]["name"] for g in resp.data["results"]]
+
+
+def test_grouped_filters_and_orders_by_balance(authed_client, catalog):
+    alice, bob, b1, b2 = catalog
+    carol = Author.objects.create(name="Carol")  # owed nothing
+    make_sale(b1)
+    make_sale(b2)
+
+    resp = authed_client.get("/api/author/payments/grouped", {"ordering": "-unpaid_total"})
+    assert names(resp) == ["Bob", "Alice", "Carol"]
+
+    resp = authed_client.get("/api/author/payments/grouped", {"ordering": "unpaid_total", "unpaid_only": "true"})
+    assert names(resp) == ["Alice", "Bob"]
+    assert resp.data["count"] == 2
+
+    resp = authed_client.get("/api/author/payments/grouped", {"min_unpaid": "50"})
+    assert names(resp) == ["Bob"]
+
+    resp = authed_client.get("/api/author/payments/grouped", {"q": "aro"})
+    assert names(resp) == ["Carol"]
+
+    # paginated after filtering/sorting
+    resp = authed_client.get("/api/author/payments/grouped", {"ordering": "-unpaid_total", "page_size": 1, "page": 2})
+    assert names(resp) == ["Alice"]
+    assert resp.data["total_pages"] == 3
+
+
+def test_grouped_stream_follows_ordering(authed_client, catalog, monkeypatch):
+    alice, bob, b1, b2 = catalog
+    Author.objects.create(name="Carol")
+    make_sale(b1)
+    make_sale(b2)
+    monkeypatch.setattr("bookapp.views.author_payments.STREAM_AUTHOR_CHUNK_SIZE", 1)
+
+    resp = authed_client.get("/api/author/payments/grouped", {"all": "true", "ordering": "-unpaid_total"})
+    body = json.loads(b"".join(resp.streaming_content))
+    assert [g["author"]["name"] for g in body["results"]] == ["Bob", "Alice", "Carol"]
+
+
+def test_grouped_rejects_bad_filters(authed_client, catalog):
+    assert authed_client.get("/api/author/payments/grouped", {"ordering": "id"}).status_code == 400
+    assert authed_client.get("/api/author/payments/grouped", {"min_unpaid": "lots"}).status_code == 400
@@ -0,0 +1,173 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale, AuthorBalance, PaymentLine
+from bookapp.services.balances import author_balance_drift
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def duplicates():
+    """'Jane  Doe' (oldest) with spacing duplicates sharing and splitting books."""
+    canon = Author.objects.create(name="Jane  Doe")
+    dup1 = Author.objects.create(name="Jane Doe")
+    dup2 = Author.objects.create(name=" jane doe")
+    other = Author.objects.create(name="John Roe")
+    books = [
+        Book.objects.create(title=f"Merge Book {i}", publication_date="2020-01-01", isbn_13=f"978000000000{i}")
+        for i in range(3)
+    ]
+    AuthorBook.objects.create(author=canon, book=books[0], royalty_rate=Decimal("0.10"))
+    AuthorBook.objects.create(author=dup1, book=books[0], royalty_rate=Decimal("0.05"))
+    AuthorBook.objects.create(author=dup1, book=books[1], royalty_rate=Decimal("0.10"))
+    AuthorBook.objects.create(author=dup2, book=books[1], royalty_rate=Decimal("0.20"))
+    AuthorBook.objects.create(author=dup2, book=books[2], royalty_rate=Decimal("0.50"))
+    AuthorBook.objects.create(author=other, book=books[2], royalty_rate=Decimal("0.25"))
+    for book in books:
+        Sale.objects.create(book=book, date="2023-01-01", quantity=1, publisher_revenue=Decimal("100.00")).create_author_sales()
+    return canon, dup1, dup2, other, books
+
+
+def test_auto_merge_keeps_canonical_rates_and_combines_shared_sales(authed_client, duplicates):
+    canon, dup1, dup2, other, books = duplicates
+    before = {ars.id: ars.version for ars in AuthorSale.objects.exclude(author=other)}
+
+    resp = authed_client.post("/api/authors/merge", {"auto": True}, format="json")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["groups"] == [
+        {
+            "canonical": {"id": canon.id, "name": "Jane  Doe"},
+            "duplicates": [{"id": dup1.id, "name": "Jane Doe"}, {"id": dup2.id, "name": " jane doe"}],
+        }
+    ]
+    assert resp.data["authors_merged"] == 2
+    assert resp.data["author_books_combined"] == 2
+    assert resp.data["author_books_repointed"] == 2
+    assert resp.data["author_sales_combined"] == 2
+    assert resp.data["author_sales_repointed"] == 2
+
+    assert list(Author.objects.order_by("id").values_list("name", flat=True)) == ["Jane Doe", "John Roe"]
+    # the canonical rate wins on book 0; with no canonical row, the oldest duplicate's on book 1
+    rates = dict(AuthorBook.objects.filter(author=canon).values_list("book_id", "royalty_rate"))
+    assert rates == {books[0].id: Decimal("0.10"), books[1].id: Decimal("0.10"), books[2].id: Decimal("0.50")}
+    assert AuthorBook.objects.get(author=other).royalty_rate == Decimal("0.25")
+
+    # one AuthorSale per (sale, author), holding the summed royalties
+    amounts = dict(AuthorSale.objects.filter(author=canon).values_list("sale__book_id", "royalty_amount"))
+    assert amounts == {books[0].id: Decimal("15.00"), books[1].id: Decimal("30.00"), books[2].id: Decimal("50.00")}
+    assert AuthorSale.objects.filter(author=canon).count() == 3
+    # every surviving row was touched, so open edit forms go stale
+    assert all(ars.version > before[ars.id] for ars in AuthorSale.objects.filter(author=canon))
+
+    assert author_balance_drift() == []
+    assert AuthorBalance.objects.get(author=canon).unpaid_count == 3
+    assert AuthorBalance.objects.get(author=canon).unpaid_total == Decimal("95.00")
+    detail = authed_client.get(f"/api/author/{canon.id}/")
+    assert detail.data["lifetime_units"] == 3
+
+
+def test_merge_combines_paid_sales_and_keeps_payment_history(authed_client, duplicates):
+    canon, dup1, dup2, _, books = duplicates
+    for author in (canon, dup1):
+        assert authed_client.post(f"/api/author/{author.id}/pay_unpaid_sales").status_code == 200
+    dup1_line = PaymentLine.objects.get(author=dup1, sale__book=books[0])
+
+    resp = authed_client.post(
+        "/api/authors/merge", {"canonical_id": canon.id, "duplicate_ids": [dup1.id]}, format="json"
+    )
+    assert resp.status_code == 200, resp.content
+    assert resp.data["author_sales_combined"] == 1
+
+    kept = AuthorSale.objects.get(author=canon, sale__book=books[0])
+    assert (kept.royalty_amount, kept.author_paid) == (Decimal("15.00"), True)
+    dup1_line.refresh_from_db()
+    assert (dup1_line.author_id, dup1_line.author_sale_id) == (canon.id, kept.id)
+    assert author_balance_drift() == []
+    assert AuthorBalance.objects.get(author=canon).paid_total == Decimal("25.00")
+
+
+def test_merge_refuses_sales_with_mixed_paid_status(authed_client, duplicates):
+    canon, dup1, _, _, books = duplicates
+    assert authed_client.post(f"/api/author/{dup1.id}/pay_unpaid_sales").status_code == 200
+    shared_sale = Sale.objects.get(book=books[0])
+
+    resp = authed_client.post(
+        "/api/authors/merge", {"canonical_id": canon.id, "duplicate_ids": [dup1.id]}, format="json"
+    )
+    assert resp.status_code == 400
+    assert str(shared_sale.id) in resp.data["error"]
+    assert Author.objects.filter(id=dup1.id).exists()
+    assert AuthorSale.objects.filter(author=dup1).count() == 2
+    assert author_balance_drift() == []
+
+
+def test_dry_run_reports_counts_and_changes_nothing(authed_client, duplicates):
+    canon, dup1, dup2, _, _ = duplicates
+    before = list(AuthorBook.objects.order_by("id").values_list("id", "author_id", "royalty_rate"))
+
+    resp = authed_client.post(
+        "/api/authors/merge", {"canonical_id": canon.id, "duplicate_ids": [dup2.id], "dry_run": True}, format="json"
+    )
+    assert resp.status_code == 200, resp.content
+    assert resp.data["dry_run"] is True
+    assert resp.data["authors_merged"] == 1
+    assert resp.data["author_books_repointed"] == 2
+    # "Jane Doe" still belongs to an author outside this merge
+    assert resp.data["canonical_names_normalized"] == 0
+
+    assert Author.objects.count() == 4
+    assert list(AuthorBook.objects.order_by("id").values_list("id", "author_id", "royalty_rate")) == before
+    assert author_balance_drift() == []
+
+
+def test_merge_rejects_bad_plans(authed_client, duplicates):
+    canon, dup1, _, _, _ = duplicates
+    url = "/api/authors/merge"
+    assert authed_client.post(url, {"canonical_id": canon.id}, format="json").status_code == 400
+    resp = authed_client.post(url, {"canonical_id": canon.id, "duplicate_ids": [canon.id]}, format="json")
+    assert resp.status_code == 400
+    resp = authed_client.post(url, {"canonical_id": canon.id, "duplicate_ids": [999999]}, format="json")
+    assert resp.status_code == 400
+    assert "999999" in resp.data["error"]
+    assert Author.objects.filter(id=dup1.id).exists()
+
+
+def test_merge_authors_command(duplicates, capsys):
+    canon, _, _, _, _ = duplicates
+    call_command("merge_authors", dry_run=True)
+    assert "Would merge 2 author(s) into 1" in capsys.readouterr().out
+    assert Author.objects.count() == 4
+
+    call_command("merge_authors")
+    assert Author.objects.count() == 2
+    assert Author.objects.get(id=canon.id).name == "Jane Doe"
+
+
+def test_merge_authors_check_fails_until_duplicates_are_merged(duplicates):
+    with pytest.raises(CommandError, match="merge_authors --dry-run"):
+        call_command("merge_authors", check=True)
+    assert Author.objects.count() == 4
+
+    call_command("merge_authors")
+    call_command("merge_authors", check=True)
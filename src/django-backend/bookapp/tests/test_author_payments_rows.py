@@ -0,0 +1,139 @@
+import json
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def catalog():
+    alice = Author.objects.create(name="Alice")
+    bob = Author.objects.create(name="Bob")
+    book = Book.objects.create(title="Rows Book", publication_date="2020-01-01", isbn_13="9780000000001")
+    AuthorBook.objects.create(author=alice, book=book, royalty_rate=Decimal("0.10"))
+    return alice, bob, book
+
+
+def make_sales(book, count, start=date(2023, 1, 1)):
+    sales = []
+    for i in range(count):
+        sale = Sale.objects.create(
+            book=book, date=start + timedelta(days=i // 2), quantity=1, publisher_revenue=Decimal("10.00")
+        )
+        sale.create_author_sales()
+        sales.append(sale)
+    return sales
+
+
+def newest_first(sales):
+    return [s.id for s in sorted(sales, key=lambda s: (s.date, s.id), reverse=True)]
+
+
+def test_grouped_caps_rows_per_author_and_returns_cursor(authed_client, catalog):
+    alice, bob, book = catalog
+    sales = make_sales(book, 7)
+
+    resp = authed_client.get("/api/author/payments/grouped", {"rows_per_author": 3})
+    assert resp.status_code == 200, resp.content
+    alice_group, bob_group = resp.data["results"]
+
+    assert [r["sale"]["id"] for r in alice_group["rows"]] == newest_first(sales)[:3]
+    assert alice_group["unpaidCount"] == 7
+    assert alice_group["rows_cursor"]
+    assert bob_group["rows"] == []
+    assert bob_group["rows_cursor"] is None
+
+
+def test_rows_endpoint_walks_remaining_rows_with_cursor(authed_client, catalog):
+    alice, _, book = catalog
+    sales = make_sales(book, 7)
+
+    resp = authed_client.get("/api/author/payments/grouped", {"rows_per_author": 3})
+    cursor = resp.data["results"][0]["rows_cursor"]
+    seen = [r["sale"]["id"] for r in resp.data["results"][0]["rows"]]
+
+    while cursor:
+        resp = authed_client.get(f"/api/author/{alice.id}/payments/rows", {"cursor": cursor, "limit": 2})
+        assert resp.status_code == 200, resp.content
+        seen += [r["sale"]["id"] for r in resp.data["rows"]]
+        cursor = resp.data["next_cursor"]
+
+    assert seen == newest_first(sales)
+
+
+def test_rows_endpoint_rejects_bad_cursor_and_unknown_author(authed_client, catalog):
+    alice, _, _ = catalog
+    assert authed_client.get(f"/api/author/{alice.id}/payments/rows", {"cursor": "nope"}).status_code == 400
+    assert authed_client.get("/api/author/999999/payments/rows").status_code == 404
+
+
+def test_grouped_page_query_count_does_not_grow_with_history(authed_client, catalog, django_assert_num_queries):
+    _, _, book = catalog
+    make_sales(book, 30)
+
+    # count + page of authors + capped rows
+    with django_assert_num_queries(3):
+        resp = authed_client.get("/api/author/payments/grouped", {"rows_per_author": 5})
+    assert len(resp.data["results"][0]["rows"]) == 5
+
+
+def test_grouped_all_streams_every_author(authed_client, catalog, monkeypatch):
+    alice, bob, book = catalog
+    monkeypatch.setattr("bookapp.views.author_payments.STREAM_AUTHOR_CHUNK_SIZE", 1)
+    make_sales(book, 4)
+
+    resp = authed_client.get("/api/author/payments/grouped", {"all": "true", "rows_per_author": 2})
+    assert resp.status_code == 200
+    assert resp.streaming
+    body = json.loads(b"".join(resp.streaming_content))
+
+    assert body["count"] == 2
+    assert [g["author"]["name"] for g in body["results"]] == ["Alice", "Bob"]
+    assert len(body["results"][0]["rows"]) == 2
+    assert body["results"][0]["rows_cursor"]
+    assert body["results"][0]["unpaidTotal"] == 4.0
+
+
+def test_rows_shape_and_date_key(authed_client, catalog):
+    alice, _, book = catalog
+    sale = make_sales(book, 1)[0]
+
+    resp = authed_client.get(f"/api/author/{alice.id}/payments/rows")
+    assert resp.data["rows"] == [
+        {
+            "sale": {
+                "id": sale.id,
+                "book": book.id,
+                "book_title": "Rows Book",
+                "date": "2023-01-01",
+                "quantity": 1,
+                "publisher_revenue": "10.00",
+            },
+            "author": {"id": alice.id, "name": "Alice", "royalty_amount": "1.00", "paid": False},
+            "paid": False,
+            "royalty": 1.0,
+            "dateKey": 1672531200,  # 2023-01-01T00:00:00Z
+        }
+    ]
+    assert resp.data["next_cursor"] is None
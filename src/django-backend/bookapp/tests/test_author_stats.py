@@ -0,0 +1,121 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def catalog():
+    alice = Author.objects.create(name="Alice", bio="Writes.")
+    b1 = Book.objects.create(title="Stats Book 1", publication_date="2020-01-01", isbn_13="9780000000001")
+    b2 = Book.objects.create(title="Stats Book 2", publication_date="2020-01-01", isbn_13="9780000000002")
+    AuthorBook.objects.create(author=alice, book=b1, royalty_rate=Decimal("0.10"))
+    AuthorBook.objects.create(author=alice, book=b2, royalty_rate=Decimal("0.20"))
+    return alice, b1, b2
+
+
+def make_sale(book, day, quantity, revenue):
+    sale = Sale.objects.create(book=book, date=day, quantity=quantity, publisher_revenue=Decimal(revenue))
+    sale.create_author_sales()
+    return sale
+
+
+def test_author_detail_returns_stats_in_one_query(authed_client, catalog, django_assert_num_queries):
+    alice, b1, b2 = catalog
+    make_sale(b1, "2023-01-01", 3, "100.00")
+    latest = make_sale(b2, "2023-02-01", 4, "50.00")
+    authed_client.post(f"/api/sale/{latest.id}/pay_authors")
+
+    with django_assert_num_queries(1):
+        resp = authed_client.get(f"/api/author/{alice.id}/")
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "id": alice.id,
+        "name": "Alice",
+        "bio": "Writes.",
+        "book_count": 2,
+        "lifetime_units": 7,
+        "royalties": {"earned": "20.00", "paid": "10.00", "unpaid": "10.00", "unpaid_count": 1},
+        "latest_sale": {"id": latest.id, "date": "2023-02-01", "book_title": "Stats Book 2"},
+    }
+
+    # served from the cache until the author's numbers change
+    with django_assert_num_queries(0):
+        authed_client.get(f"/api/author/{alice.id}/")
+
+
+def test_author_detail_without_activity(authed_client):
+    author = Author.objects.create(name="Nobody")
+    resp = authed_client.get(f"/api/author/{author.id}/")
+    assert resp.data["book_count"] == 0
+    assert resp.data["lifetime_units"] == 0
+    assert resp.data["royalties"] == {"earned": "0.00", "paid": "0.00", "unpaid": "0.00", "unpaid_count": 0}
+    assert resp.data["latest_sale"] is None
+
+    assert authed_client.get("/api/author/999999/").status_code == 404
+
+
+def test_author_writes_invalidate_cached_stats(authed_client, catalog):
+    alice, b1, b2 = catalog
+    assert authed_client.get(f"/api/author/{alice.id}/").data["lifetime_units"] == 0
+
+    make_sale(b1, "2023-01-01", 5, "100.00")
+    resp = authed_client.get(f"/api/author/{alice.id}/")
+    assert resp.data["lifetime_units"] == 5
+    assert resp.data["royalties"]["unpaid"] == "10.00"
+
+    assert authed_client.post(f"/api/author/{alice.id}/pay_unpaid_sales").status_code == 200
+    assert authed_client.get(f"/api/author/{alice.id}/").data["royalties"]["paid"] == "10.00"
+
+    assert authed_client.delete(f"/api/books/{b2.id}/").status_code == 204
+    assert authed_client.get(f"/api/author/{alice.id}/").data["book_count"] == 1
+
+
+def test_sale_and_title_edits_invalidate_cached_stats(authed_client, catalog):
+    alice, b1, b2 = catalog
+    sale = make_sale(b1, "2023-01-01", 5, "100.00")
+    other = make_sale(b2, "2022-01-01", 2, "40.00")
+    url = f"/api/author/{alice.id}/"
+    assert authed_client.get(url).data["lifetime_units"] == 7
+
+    # quantity/date-only edits leave royalties (and the balance) alone
+    payload = {"book": b1.id, "date": "2023-01-01", "quantity": 8, "publisher_revenue": "100.00"}
+    resp = authed_client.post(f"/api/sale/{sale.id}/edit", payload, format="json")
+    assert resp.status_code == 200, resp.data
+    assert authed_client.get(url).data["lifetime_units"] == 10
+
+    resp = authed_client.post("/api/sale/bulk_edit", [{"id": other.id, "date": "2024-06-01"}], format="json")
+    assert resp.status_code == 200, resp.data
+    assert authed_client.get(url).data["latest_sale"]["id"] == other.id
+
+    resp = authed_client.patch(f"/api/books/{b2.id}/", {"title": "Renamed"}, format="json")
+    assert resp.status_code == 200, resp.data
+    assert authed_client.get(url).data["latest_sale"]["book_title"] == "Renamed"
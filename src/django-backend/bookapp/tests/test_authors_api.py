@@ -0,0 +1,108 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def authors():
+    return [Author.objects.create(name=name) for name in ("Carol", "alan", "Bea", "Alice", "Bob")]
+
+
+def test_authors_cursor_pagination_walks_every_author(authed_client, authors):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        resp = authed_client.get("/api/authors/", params)
+        assert resp.status_code == 200, resp.content
+        assert len(resp.data["results"]) <= 2
+        seen += [row["name"] for row in resp.data["results"]]
+        cursor = resp.data["next_cursor"]
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(a.name for a in authors)
+    assert len(seen) == len(set(seen))
+
+
+def test_authors_search_and_projection(authed_client, authors):
+    resp = authed_client.get("/api/authors/", {"q": "AL", "fields": "name"})
+    assert resp.status_code == 200
+    assert sorted(row["name"] for row in resp.data["results"]) == ["Alice", "alan"]
+    assert all(set(row) == {"name"} for row in resp.data["results"])
+
+
+def test_authors_projection_includes_balance(authed_client, authors):
+    carol = authors[0]
+    book = Book.objects.create(title="Author Book", publication_date="2020-01-01", isbn_13="9780000000001")
+    AuthorBook.objects.create(author=carol, book=book, royalty_rate=Decimal("0.10"))
+    Sale.objects.create(book=book, date="2023-01-01", quantity=1, publisher_revenue=Decimal("100.00")).create_author_sales()
+
+    resp = authed_client.get("/api/authors/", {"q": "Car", "fields": "id,unpaid_total,unpaid_count"})
+    assert resp.json()["results"] == [{"id": carol.id, "unpaid_total": "10.00", "unpaid_count": 1}]
+
+
+def test_authors_ids_batch_lookup(authed_client, authors):
+    wanted = [authors[0].id, authors[3].id, 999999]
+    resp = authed_client.get("/api/authors/", {"ids": ",".join(map(str, wanted))})
+    assert resp.status_code == 200
+    assert {row["id"] for row in resp.data["results"]} == {authors[0].id, authors[3].id}
+
+    assert authed_client.get("/api/authors/", {"ids": "1,x"}).status_code == 400
+
+
+def test_authors_legacy_flag_keeps_unpaginated_list(authed_client, authors):
+    resp = authed_client.get("/api/authors/", {"legacy": "true"})
+    assert resp.status_code == 200
+    assert isinstance(resp.data, list)
+    assert len(resp.data) == len(authors)
+    assert set(resp.data[0]) == {"id", "name"}
+
+
+def test_authors_rejects_bad_cursor(authed_client, authors):
+    assert authed_client.get("/api/authors/", {"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_authors_list_is_one_query(authed_client, authors, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        authed_client.get("/api/authors/", {"limit": 2, "fields": "id,name,unpaid_total"})
+
+
+def test_author_names_are_unique_ignoring_case(authors):
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Author.objects.create(name="CAROL")
+    assert list(Author.objects.with_name("cArOl")) == [authors[0]]
+
+
+def test_create_author_returns_existing_case_variant(authed_client, authors):
+    resp = authed_client.post("/api/authors/", {"name": "  bea  "}, format="json")
+    assert resp.status_code == 200
+    assert resp.data == {"id": authors[2].id, "name": "Bea"}
+
+    resp = authed_client.post("/api/authors/", {"name": "Dana"}, format="json")
+    assert resp.status_code == 201
+    assert Author.objects.count() == len(authors) + 1
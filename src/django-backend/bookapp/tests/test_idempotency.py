@@ -0,0 +1,163 @@
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale, IdempotencyKey
+from bookapp.services import idempotency
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def book():
+    author = Author.objects.create(name="Idem Author")
+    book = Book.objects.create(title="Idem Book", publication_date="2020-01-01", isbn_13="9780000000001")
+    AuthorBook.objects.create(author=author, book=book, royalty_rate=Decimal("0.10"))
+    return book
+
+
+def sale_row(book_id, **overrides):
+    row = {"book": book_id, "quantity": 10, "publisher_revenue": "100.00", "date": "2023-01-01"}
+    row.update(overrides)
+    return row
+
+
+def test_createmany_retry_replays_response_without_inserting(authed_client, book, django_assert_num_queries):
+    payload = [sale_row(book.id), sale_row(book.id, quantity=3)]
+    first = authed_client.post("/api/sale/createmany", payload, format="json", HTTP_IDEMPOTENCY_KEY="batch-1")
+    assert first.status_code == 201, first.content
+
+    with django_assert_num_queries(1):
+        retry = authed_client.post("/api/sale/createmany", payload, format="json", HTTP_IDEMPOTENCY_KEY="batch-1")
+
+    assert retry.status_code == 201
+    assert retry["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert Sale.objects.count() == 2
+    assert AuthorSale.objects.count() == 2
+
+
+def test_create_without_key_is_not_recorded(authed_client, book):
+    for _ in range(2):
+        assert authed_client.post("/api/sale/create", sale_row(book.id), format="json").status_code == 201
+    assert Sale.objects.count() == 2
+    assert IdempotencyKey.objects.count() == 0
+
+
+def test_validation_errors_are_replayed(authed_client, book):
+    row = sale_row(book.id, quantity=-1)
+    first = authed_client.post("/api/sale/create", row, format="json", HTTP_IDEMPOTENCY_KEY="k")
+    retry = authed_client.post("/api/sale/create", row, format="json", HTTP_IDEMPOTENCY_KEY="k")
+    assert first.status_code == retry.status_code == 400
+    assert retry.json() == first.json()
+
+
+def test_key_reused_with_different_body_is_rejected(authed_client, book):
+    authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    resp = authed_client.post("/api/sale/create", sale_row(book.id, quantity=2), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    assert resp.status_code == 422
+    assert Sale.objects.count() == 1
+
+
+def test_keys_are_scoped_per_endpoint(authed_client, book):
+    authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    resp = authed_client.post("/api/sale/createmany", [sale_row(book.id)], format="json", HTTP_IDEMPOTENCY_KEY="k")
+    assert resp.status_code == 201
+    assert Sale.objects.count() == 2
+
+
+def test_in_progress_key_returns_conflict(authed_client, book):
+    authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    IdempotencyKey.objects.update(response_status=None, response_body=None)
+    resp = authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    assert resp.status_code == 409
+    assert Sale.objects.count() == 1
+
+
+def test_stale_in_progress_claim_is_taken_over(authed_client, book):
+    authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    # as if the worker was killed mid-request: its writes rolled back, its claim row stayed behind
+    Sale.objects.all().delete()
+    IdempotencyKey.objects.update(
+        response_status=None,
+        response_body=None,
+        claimed_at=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS + 1),
+    )
+
+    # only the same request may take it over
+    resp = authed_client.post("/api/sale/create", sale_row(book.id, quantity=2), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    assert resp.status_code == 422
+
+    resp = authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    assert resp.status_code == 201, resp.content
+    assert Sale.objects.count() == 1
+    record = IdempotencyKey.objects.get()
+    assert record.response_status == 201
+    assert record.claimed_at > timezone.now() - timedelta(seconds=5)
+
+
+def test_response_is_stored_with_the_view_writes(authed_client, book, monkeypatch):
+    def fail(data):
+        raise RuntimeError("storing the response failed")
+
+    monkeypatch.setattr(idempotency, "_to_json", fail)
+    with pytest.raises(RuntimeError):
+        authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    # nothing half-done: no sale without a stored response, and the key is free again
+    assert Sale.objects.count() == 0
+    assert IdempotencyKey.objects.count() == 0
+
+
+def test_request_whose_claim_was_taken_over_rolls_back(authed_client, book, monkeypatch):
+    to_json = idempotency._to_json
+
+    def taken_over(data):
+        IdempotencyKey.objects.update(claimed_at=timezone.now() + timedelta(seconds=1))
+        return to_json(data)
+
+    monkeypatch.setattr(idempotency, "_to_json", taken_over)
+    resp = authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    assert resp.status_code == 409
+    assert Sale.objects.count() == 0
+    assert IdempotencyKey.objects.get().response_status is None
+
+
+def test_expired_key_runs_request_again_and_purge_removes_it(authed_client, book):
+    authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    resp = authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k")
+    assert resp.status_code == 201
+    assert "Idempotent-Replayed" not in resp
+    assert Sale.objects.count() == 2
+
+    IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    call_command("purge_idempotency_keys")
+    assert IdempotencyKey.objects.count() == 0
+
+
+def test_overlong_key_is_rejected(authed_client, book):
+    resp = authed_client.post("/api/sale/create", sale_row(book.id), format="json", HTTP_IDEMPOTENCY_KEY="k" * 256)
+    assert resp.status_code == 400
+    assert Sale.objects.count() == 0
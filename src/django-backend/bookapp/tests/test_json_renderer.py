@@ -0,0 +1,83 @@
+import io
+import uuid
+import zoneinfo
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from bookapp.models import Book
+from bookapp.parsers import ORJSONParser
+from bookapp.renderers import ORJSONRenderer
+
+
+PAYLOAD = ReturnDict(
+    {
+        "id": 7,
+        "title": "Zoë     \"quoted\"",
+        "publisher_revenue": Decimal("1234.50"),
+        "rate": Decimal("0.15"),
+        "date": date(2024, 2, 29),
+        "created": datetime(2024, 1, 2, 3, 4, 5, 120000, tzinfo=timezone.utc),
+        "created_london": datetime(2024, 7, 1, 12, tzinfo=zoneinfo.ZoneInfo("Europe/London")),
+        "naive": datetime(2024, 1, 2, 3, 4, 5),
+        "at": time(9, 30),
+        "elapsed": timedelta(minutes=90),
+        "token": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "label": gettext_lazy("Sale"),
+        "errors": [ErrorDetail("This field is required.", code="required")],
+        "totals": {1: Decimal("10.00"), 2: None},
+        "nested": [(1, 2.5, True), {"empty": []}],
+        "huge": 2**70,
+    },
+    serializer=None,
+)
+
+
+def test_renderer_output_matches_drf():
+    assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+    assert ORJSONRenderer().render(None) == b""
+
+
+def test_renderer_pretty_print_uses_stock_path():
+    media_type = "application/json; indent=4"
+    assert ORJSONRenderer().render(PAYLOAD, media_type) == JSONRenderer().render(PAYLOAD, media_type)
+
+
+def test_parser_matches_drf():
+    body = '{"title": "Zoë", "rate": 0.15, "ids": [1, 2], "big": 123456789012345678901234567890, "none": null}'.encode()
+    assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    with pytest.raises(ParseError) as fast:
+        ORJSONParser().parse(io.BytesIO(b'{"title": '))
+    with pytest.raises(ParseError) as stock:
+        JSONParser().parse(io.BytesIO(b'{"title": '))
+    assert str(fast.value) == str(stock.value)
+
+
+@pytest.mark.django_db
+def test_api_uses_orjson_for_requests_and_responses(monkeypatch):
+    calls = []
+    original = ORJSONParser.parse
+    monkeypatch.setattr(ORJSONParser, "parse", lambda self, *args: calls.append(1) or original(self, *args))
+
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create_user(username="u1", password="pass12345"))
+    payload = {
+        "title": "Fast JSON",
+        "publication_date": "2020-01-01",
+        "isbn_13": "9780000000099",
+        "authors": [{"author_name": "Alice", "royalty_rate": "0.15"}],
+    }
+    resp = client.post("/api/books/", payload, format="json")
+    assert resp.status_code == 201, resp.content
+    assert calls == [1]
+    assert resp.content == JSONRenderer().render(resp.data)
+    assert Book.objects.filter(title="Fast JSON").exists()
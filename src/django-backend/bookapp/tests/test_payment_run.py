@@ -0,0 +1,197 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale, PaymentBatch, PaymentLine
+from bookapp.services.payments import run_payout
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def catalog():
+    alice = Author.objects.create(name="Alice")
+    bob = Author.objects.create(name="Bob")
+    b1 = Book.objects.create(title="Pay Book 1", publication_date="2020-01-01", isbn_13="9780000000001")
+    b2 = Book.objects.create(title="Pay Book 2", publication_date="2020-01-01", isbn_13="9780000000002")
+    AuthorBook.objects.create(author=alice, book=b1, royalty_rate=Decimal("0.10"))
+    AuthorBook.objects.create(author=bob, book=b1, royalty_rate=Decimal("0.20"))
+    AuthorBook.objects.create(author=bob, book=b2, royalty_rate=Decimal("0.50"))
+    return alice, bob, b1, b2
+
+
+def make_sale(book, date, revenue="100.00"):
+    sale = Sale.objects.create(book=book, date=date, quantity=1, publisher_revenue=Decimal(revenue))
+    sale.create_author_sales()
+    return sale
+
+
+def test_payment_run_pays_filtered_rows_and_returns_author_totals(authed_client, catalog):
+    alice, bob, b1, b2 = catalog
+    q1_b1 = make_sale(b1, "2023-01-01")
+    q1_b2 = make_sale(b2, "2023-03-31")
+    q2_b1 = make_sale(b1, "2023-04-01")
+    AuthorSale.objects.filter(sale=q1_b1, author=alice).update(author_paid=True)  # already paid
+
+    resp = authed_client.post("/api/payments/run", {"start_date": "2023-01", "end_date": "2023-03"}, format="json")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["author_sales_marked_paid"] == 2
+    assert resp.data["total_royalties_paid"] == "70.00"
+    assert resp.data["authors"] == [
+        {
+            "author_id": bob.id,
+            "author_name": "Bob",
+            "author_sales_marked_paid": 2,
+            "total_royalties_paid": "70.00",
+            "sales_affected": 2,
+        }
+    ]
+
+    assert AuthorSale.objects.filter(sale__in=[q1_b1, q1_b2], author_paid=False).count() == 0
+    assert AuthorSale.objects.filter(sale=q2_b1, author_paid=False).count() == 2
+
+    # a second run over the same range pays nothing
+    again = authed_client.post("/api/payments/run", {"start_date": "2023-01", "end_date": "2023-03"}, format="json")
+    assert again.data["author_sales_marked_paid"] == 0
+    assert again.data["authors"] == []
+
+
+def test_payment_run_book_and_author_filters(authed_client, catalog):
+    alice, bob, b1, b2 = catalog
+    make_sale(b1, "2023-01-01")
+    make_sale(b2, "2023-01-01")
+
+    resp = authed_client.post("/api/payments/run", {"book_ids": [b1.id], "author_ids": [bob.id]}, format="json")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["author_sales_marked_paid"] == 1
+    assert resp.data["total_royalties_paid"] == "20.00"
+    assert AuthorSale.objects.filter(author_paid=True).count() == 1
+
+
+def test_payment_run_requires_a_filter(authed_client, catalog):
+    make_sale(catalog[2], "2023-01-01")
+    assert authed_client.post("/api/payments/run", {}, format="json").status_code == 400
+    assert authed_client.post("/api/payments/run", {"book_ids": "1"}, format="json").status_code == 400
+    assert authed_client.post("/api/payments/run", {"start_date": "2023"}, format="json").status_code == 400
+    assert AuthorSale.objects.filter(author_paid=True).count() == 0
+
+    resp = authed_client.post("/api/payments/run", {"all": True}, format="json")
+    assert resp.data["author_sales_marked_paid"] == 2
+
+
+def test_run_payout_one_update_per_chunk(catalog, django_assert_num_queries):
+    alice, bob, b1, b2 = catalog
+    for _ in range(5):
+        make_sale(b1, "2023-01-01")  # 10 unpaid rows
+
+    # 3 chunks of <= 4 rows: savepoint + UPDATE + batch INSERT/UPDATE + lines INSERT
+    # + balance upsert + release, then an empty chunk (savepoint + UPDATE + release)
+    # and the final EXISTS check
+    with django_assert_num_queries(3 * 6 + 3 + 1):
+        by_author, batch = run_payout(AuthorSale.objects.all(), chunk_size=4)
+
+    assert by_author[alice.id]["author_sales"] == 5
+    assert by_author[bob.id]["total"] == Decimal("100.00")
+    assert not AuthorSale.objects.filter(author_paid=False).exists()
+
+    batch.refresh_from_db()
+    assert (batch.source, batch.line_count, batch.total_amount) == ("run", 10, Decimal("150.00"))
+    assert PaymentLine.objects.filter(batch=batch).count() == 10
+
+
+def test_author_payout_is_one_update(authed_client, catalog, django_assert_num_queries):
+    alice, bob, b1, b2 = catalog
+    s1 = make_sale(b1, "2023-01-01")
+    s2 = make_sale(b2, "2023-02-01", revenue="10.00")
+    AuthorSale.objects.filter(sale=s1, author=bob).update(author_paid=True)
+
+    # savepoint + UPDATE ... RETURNING + ledger batch + ledger lines + balance upsert + release
+    with django_assert_num_queries(6):
+        resp = authed_client.post(f"/api/author/{bob.id}/pay_unpaid_sales")
+    assert resp.status_code == 200, resp.content
+    assert resp.data == {
+        "author_id": bob.id,
+        "author_sales_marked_paid": 1,
+        "total_royalties_paid": "5.00",
+        "sale_ids_affected": [s2.id],
+    }
+
+    again = authed_client.post(f"/api/author/{bob.id}/pay_unpaid_sales")
+    assert again.data["author_sales_marked_paid"] == 0
+    assert again.data["total_royalties_paid"] == "0.00"
+    assert again.data["sale_ids_affected"] == []
+
+    assert authed_client.post("/api/author/999999/pay_unpaid_sales").status_code == 404
+
+
+def test_sale_payout_is_one_update(authed_client, catalog, django_assert_num_queries):
+    alice, bob, b1, b2 = catalog
+    sale = make_sale(b1, "2023-01-01")
+
+    with django_assert_num_queries(6):
+        resp = authed_client.post(f"/api/sale/{sale.id}/pay_authors")
+    assert resp.status_code == 200, resp.content
+    assert resp.data == {"sale_id": sale.id, "authors_marked_paid": 2, "total_royalties_paid": "30.00"}
+    assert not AuthorSale.objects.filter(sale=sale, author_paid=False).exists()
+
+    assert authed_client.post("/api/sale/999999/pay_authors").status_code == 404
+
+
+def test_payouts_write_ledger_and_history(authed_client, catalog):
+    alice, bob, b1, b2 = catalog
+    s1 = make_sale(b1, "2023-01-01")
+    s2 = make_sale(b2, "2023-02-01", revenue="10.00")
+
+    authed_client.post(f"/api/sale/{s1.id}/pay_authors")
+    authed_client.post(f"/api/author/{bob.id}/pay_unpaid_sales")
+    assert authed_client.post(f"/api/author/{bob.id}/pay_unpaid_sales").status_code == 200  # nothing left
+    assert PaymentBatch.objects.count() == 2
+
+    make_sale(b1, "2023-03-01")  # unpaid: 10.00 for alice, 20.00 for bob
+
+    resp = authed_client.get(f"/api/author/{bob.id}/payments")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["count"] == 2
+    assert resp.data["paid_total"] == "25.00"
+    assert resp.data["unpaid_balance"] == "20.00"
+
+    newest, oldest = resp.data["results"]
+    assert (newest["source"], newest["total_amount"]) == ("author", "5.00")
+    assert [line["sale_id"] for line in newest["lines"]] == [s2.id]
+    assert newest["lines"][0]["book_title"] == b2.title
+    assert (oldest["source"], oldest["total_amount"]) == ("sale", "20.00")
+
+    # paging by payout, and history survives deleting the sale
+    Sale.objects.filter(id=s2.id).delete()
+    page = authed_client.get(f"/api/author/{bob.id}/payments", {"page_size": 1})
+    assert page.data["total_pages"] == 2
+    assert page.data["results"][0]["lines"][0] == {
+        "sale_id": s2.id,
+        "author_sale_id": page.data["results"][0]["lines"][0]["author_sale_id"],
+        "amount": "5.00",
+        "sale_date": None,
+        "book_id": None,
+        "book_title": None,
+    }
+
+    # month filter on paid_at
+    assert authed_client.get(f"/api/author/{bob.id}/payments", {"end_date": "2000-01"}).data["count"] == 0
+    assert authed_client.get(f"/api/author/{bob.id}/payments", {"start_date": "bad"}).status_code == 400
+    assert authed_client.get("/api/author/999999/payments").status_code == 404
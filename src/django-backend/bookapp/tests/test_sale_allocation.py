@@ -0,0 +1,171 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def make_book(*, isbn_13, authors=()):
+    book = Book.objects.create(
+        title="T",
+        publication_date="2000-01-01",
+        isbn_13=isbn_13,
+    )
+    for author, rate in authors:
+        AuthorBook.objects.create(author=author, book=book, royalty_rate=Decimal(rate))
+    return book
+
+
+@pytest.fixture
+def four_author_book():
+    authors = [Author.objects.create(name=f"Author {i}") for i in range(4)]
+    book = make_book(isbn_13="9780000000001", authors=[(a, "0.10") for a in authors])
+    return book, authors
+
+
+def test_create_author_sales_costs_three_queries(four_author_book, django_assert_num_queries):
+    book, authors = four_author_book
+    sale = Sale.objects.create(book=book, date="2023-01-01", quantity=1, publisher_revenue=Decimal("200.00"))
+
+    # one SELECT for the rates + one bulk INSERT + one balance upsert, independent of the author count
+    with django_assert_num_queries(3):
+        sale.create_author_sales()
+
+    rows = AuthorSale.objects.filter(sale=sale)
+    assert rows.count() == 4
+    assert {r.royalty_amount for r in rows} == {Decimal("20.00")}
+    assert not any(r.author_paid for r in rows)
+
+
+def test_create_author_sales_applies_overrides(four_author_book):
+    book, authors = four_author_book
+    sale = Sale.objects.create(book=book, date="2023-01-01", quantity=1, publisher_revenue=Decimal("200.00"))
+
+    sale.create_author_sales(
+        author_royalties={str(authors[0].id): Decimal("55.00")},
+        author_paid={str(authors[1].id): True},
+    )
+
+    by_author = {r.author_id: r for r in AuthorSale.objects.filter(sale=sale)}
+    assert by_author[authors[0].id].royalty_amount == Decimal("55.00")
+    assert by_author[authors[1].id].author_paid is True
+    assert by_author[authors[2].id].royalty_amount == Decimal("20.00")
+
+
+def test_edit_book_change_rebuilds_author_sales(authed_client, four_author_book):
+    book, authors = four_author_book
+    other_author = Author.objects.create(name="Other")
+    other_book = make_book(isbn_13="9780000000002", authors=[(other_author, "0.25")])
+
+    resp = authed_client.post(
+        "/api/sale/create",
+        {"book": book.id, "quantity": 1, "publisher_revenue": "100.00", "date": "2023-01-01"},
+        format="json",
+    )
+    assert resp.status_code == 201, resp.content
+    sale_id = resp.data["id"]
+    assert AuthorSale.objects.filter(sale_id=sale_id).count() == 4
+
+    resp = authed_client.post(
+        f"/api/sale/{sale_id}/edit",
+        {
+            "book": other_book.id,
+            "quantity": 1,
+            "publisher_revenue": "100.00",
+            "date": "2023-01-01",
+            "author_paid": {str(other_author.id): True},
+        },
+        format="json",
+    )
+    assert resp.status_code == 200, resp.content
+
+    rows = list(AuthorSale.objects.filter(sale_id=sale_id))
+    assert len(rows) == 1
+    assert rows[0].author_id == other_author.id
+    assert rows[0].royalty_amount == Decimal("25.00")
+    assert rows[0].author_paid is True
+
+
+def test_single_create_query_count(authed_client, four_author_book, django_assert_num_queries):
+    book, authors = four_author_book
+    payload = {
+        "book": book.id,
+        "quantity": 1,
+        "publisher_revenue": "100.00",
+        "date": "2023-01-01",
+        "author_royalties": {str(authors[0].id): "-1.00", str(authors[1].id): "-2.00"},
+    }
+
+    # invalid: one preload query, negative override messages use the preloaded names
+    with django_assert_num_queries(1):
+        resp = authed_client.post("/api/sale/create", payload, format="json")
+    assert resp.status_code == 400
+    assert "Author 0" in resp.data["author_royalties"][0]
+
+    # valid: preload + savepoint + sale INSERT + AuthorSale bulk INSERT + balance upsert
+    # + release + response
+    payload["author_royalties"] = {str(authors[0].id): "1.00"}
+    with django_assert_num_queries(7):
+        resp = authed_client.post("/api/sale/create", payload, format="json")
+    assert resp.status_code == 201, resp.content
+    assert len(resp.data["author_details"]) == 4
+
+
+def test_single_edit_overrides_use_one_bulk_update(authed_client, four_author_book, django_assert_num_queries):
+    book, authors = four_author_book
+    sale = Sale.objects.create(book=book, date="2023-01-01", quantity=1, publisher_revenue=Decimal("100.00"))
+    sale.create_author_sales()
+
+    payload = {
+        "book": book.id,
+        "quantity": 2,
+        "publisher_revenue": "100.00",
+        "date": "2023-01-01",
+        "author_royalties": {str(a.id): "3.00" for a in authors},
+        "author_paid": {str(a.id): True for a in authors[:2]},
+    }
+
+    # sale + preload + savepoint + sale UPDATE + AuthorSale SELECT + bulk UPDATE + balance upsert
+    # + release + response
+    with django_assert_num_queries(9):
+        resp = authed_client.post(f"/api/sale/{sale.id}/edit", payload, format="json")
+    assert resp.status_code == 200, resp.content
+
+    rows = {r.author_id: r for r in AuthorSale.objects.filter(sale=sale)}
+    assert {r.royalty_amount for r in rows.values()} == {Decimal("3.00")}
+    assert [rows[a.id].author_paid for a in authors] == [True, True, False, False]
+
+
+def test_single_edit_book_change_query_count(authed_client, four_author_book, django_assert_num_queries):
+    book, authors = four_author_book
+    other_book = make_book(isbn_13="9780000000002", authors=[(a, "0.20") for a in authors])
+    sale = Sale.objects.create(book=book, date="2023-01-01", quantity=1, publisher_revenue=Decimal("100.00"))
+    sale.create_author_sales()
+
+    payload = {"book": other_book.id, "quantity": 1, "publisher_revenue": "100.00", "date": "2023-01-01"}
+
+    # sale + preload + savepoint + sale UPDATE + AuthorSale SELECT (stats invalidation) + AuthorSale
+    # DELETE + bulk INSERT (each followed by a balance upsert) + release + response
+    with django_assert_num_queries(11):
+        resp = authed_client.post(f"/api/sale/{sale.id}/edit", payload, format="json")
+    assert resp.status_code == 200, resp.content
+    assert {d["royalty_amount"] for d in resp.data["author_details"]} == {Decimal("20.00")}
@@ -0,0 +1,125 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale
+from bookapp.services.versioning import VersionConflict, bulk_update_with_versions
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sale():
+    author = Author.objects.create(name="Version Author")
+    book = Book.objects.create(title="Version Book", publication_date="2020-01-01", isbn_13="9780000000001")
+    AuthorBook.objects.create(author=author, book=book, royalty_rate=Decimal("0.10"))
+    sale = Sale.objects.create(book=book, date="2023-01-01", quantity=1, publisher_revenue=Decimal("100.00"))
+    sale.create_author_sales()
+    return sale
+
+
+def edit_payload(sale, **overrides):
+    payload = {"book": sale.book_id, "quantity": 1, "publisher_revenue": "100.00", "date": "2023-01-01"}
+    payload.update(overrides)
+    return payload
+
+
+def test_edit_bumps_version_and_rejects_stale_version(authed_client, sale):
+    loaded = authed_client.get(f"/api/sale/{sale.id}/get").data
+    assert loaded["version"] == 1
+    assert loaded["author_details"][0]["version"] == 1
+
+    # tab A saves
+    resp = authed_client.post(f"/api/sale/{sale.id}/edit", edit_payload(sale, quantity=5, version=1), format="json")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["version"] == 2
+
+    # tab B still holds version 1
+    stale = authed_client.post(f"/api/sale/{sale.id}/edit", edit_payload(sale, quantity=9, version=1), format="json")
+    assert stale.status_code == 409
+    assert stale.data["current_version"] == 2
+
+    sale.refresh_from_db()
+    assert (sale.quantity, sale.version) == (5, 2)
+
+
+def test_edit_without_version_still_works(authed_client, sale):
+    resp = authed_client.post(f"/api/sale/{sale.id}/edit", edit_payload(sale, quantity=3), format="json")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["version"] == 2
+
+    bad = authed_client.post(f"/api/sale/{sale.id}/edit", edit_payload(sale, version="x"), format="json")
+    assert bad.status_code == 400
+
+
+def test_override_edit_cannot_undo_a_concurrent_payout(authed_client, sale):
+    ars = AuthorSale.objects.get(sale=sale)
+    loaded_versions = {str(ars.author_id): ars.version}
+
+    # payout happens after the edit form was loaded
+    assert authed_client.post(f"/api/sale/{sale.id}/pay_authors").status_code == 200
+
+    resp = authed_client.post(
+        f"/api/sale/{sale.id}/edit",
+        edit_payload(
+            sale,
+            version=1,
+            author_paid={str(ars.author_id): False},
+            author_versions=loaded_versions,
+        ),
+        format="json",
+    )
+    assert resp.status_code == 409
+
+    ars.refresh_from_db()
+    assert ars.author_paid is True
+    # the sale UPDATE ran in the same transaction and was rolled back too
+    assert Sale.objects.get(id=sale.id).version == 1
+
+
+def test_bulk_edit_reports_version_conflicts(authed_client, sale):
+    other = Sale.objects.create(book=sale.book, date="2023-01-01", quantity=1, publisher_revenue=Decimal("1.00"))
+    Sale.objects.filter(id=sale.id).update(version=3)
+
+    resp = authed_client.post(
+        "/api/sale/bulk_edit",
+        [{"id": other.id, "quantity": 2, "version": 1}, {"id": sale.id, "quantity": 2, "version": 2}],
+        format="json",
+    )
+    assert resp.status_code == 409
+    assert resp.data["conflicts"] == [sale.id]
+    assert Sale.objects.get(id=other.id).quantity == 1
+
+    ok = authed_client.post("/api/sale/bulk_edit", [{"id": sale.id, "quantity": 2, "version": 3}], format="json")
+    assert ok.status_code == 200, ok.content
+    assert ok.data[0]["version"] == 4
+
+
+def test_bulk_update_with_versions_is_one_statement(sale, django_assert_num_queries):
+    rows = list(AuthorSale.objects.filter(sale=sale))
+    for row in rows:
+        row.royalty_amount = Decimal("1.23")
+
+    with django_assert_num_queries(1):
+        bulk_update_with_versions(rows, ["royalty_amount"])
+    assert [r.version for r in rows] == [2]
+
+    with pytest.raises(VersionConflict):
+        bulk_update_with_versions(rows, ["royalty_amount"], {rows[0].pk: 1})
@@ -0,0 +1,116 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale
+from bookapp.services.sales_bulk import delete_sales_chunked
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def books():
+    a1 = Author.objects.create(name="Del One")
+    a2 = Author.objects.create(name="Del Two")
+    b1 = Book.objects.create(title="Del Book 1", publication_date="2020-01-01", isbn_13="9780000000001")
+    b2 = Book.objects.create(title="Del Book 2", publication_date="2020-01-01", isbn_13="9780000000002")
+    for book in (b1, b2):
+        AuthorBook.objects.create(author=a1, book=book, royalty_rate=Decimal("0.10"))
+        AuthorBook.objects.create(author=a2, book=book, royalty_rate=Decimal("0.20"))
+    return b1, b2
+
+
+def make_sale(book, date):
+    sale = Sale.objects.create(book=book, date=date, quantity=1, publisher_revenue=Decimal("100.00"))
+    sale.create_author_sales()
+    return sale
+
+
+def test_bulk_delete_by_ids(authed_client, books):
+    b1, _ = books
+    s1, s2, s3 = (make_sale(b1, "2023-01-01") for _ in range(3))
+
+    resp = authed_client.post("/api/sale/bulk_delete", {"ids": [s1.id, s3.id]}, format="json")
+    assert resp.status_code == 200, resp.content
+    assert resp.data == {"deleted_sales": 2, "deleted_author_sales": 4}
+    assert list(Sale.objects.values_list("id", flat=True)) == [s2.id]
+    assert AuthorSale.objects.count() == 2
+
+
+def test_bulk_delete_by_filters_matches_get_all(authed_client, books):
+    b1, b2 = books
+    make_sale(b1, "2023-01-01")
+    make_sale(b1, "2023-02-15")
+    make_sale(b1, "2023-03-31")
+    make_sale(b1, "2023-04-01")
+    make_sale(b2, "2023-02-01")
+
+    filters = {"book_id": b1.id, "start_date": "2023-02", "end_date": "2023-03-01"}
+    listed = authed_client.get("/api/sale/get_all", {**filters, "all": "true"})
+    expected_ids = sorted(r["id"] for r in listed.data["results"])
+    assert len(expected_ids) == 2
+
+    preview = authed_client.post("/api/sale/bulk_delete", {**filters, "dry_run": True}, format="json")
+    assert preview.status_code == 200, preview.content
+    assert preview.data["sales"] == 2
+    assert preview.data["author_sales"] == 4
+    assert preview.data["sale_ids"] == expected_ids
+    assert Sale.objects.count() == 5
+
+    resp = authed_client.post("/api/sale/bulk_delete", filters, format="json")
+    assert resp.data == {"deleted_sales": 2, "deleted_author_sales": 4}
+    assert not Sale.objects.filter(id__in=expected_ids).exists()
+    assert Sale.objects.count() == 3
+
+
+def test_bulk_delete_requires_a_selection(authed_client, books):
+    make_sale(books[0], "2023-01-01")
+
+    assert authed_client.post("/api/sale/bulk_delete", {}, format="json").status_code == 400
+    assert authed_client.post("/api/sale/bulk_delete", {"ids": ["x"]}, format="json").status_code == 400
+    assert authed_client.post("/api/sale/bulk_delete", {"start_date": "2023"}, format="json").status_code == 400
+    assert Sale.objects.count() == 1
+
+
+def test_bulk_delete_rejects_unsupported_filters(authed_client, user, books):
+    b1, b2 = books
+    make_sale(b1, "2023-01-01")
+    make_sale(b2, "2023-01-01")
+
+    # there is no per-user scoping: user_id must not be dropped and widen the delete to book_id alone
+    for body in ({"user_id": user.id}, {"book_id": b1.id, "user_id": user.id}):
+        resp = authed_client.post("/api/sale/bulk_delete", body, format="json")
+        assert resp.status_code == 400
+        assert "user_id" in resp.data["error"]
+    assert Sale.objects.count() == 2
+
+    # sale/get_all shares filter_sales and simply has no user_id filter
+    assert authed_client.get("/api/sale/get_all", {"user_id": user.id}).status_code == 200
+
+
+def test_delete_sales_chunked_uses_bounded_chunks(books, django_assert_num_queries):
+    sales = [make_sale(books[0], "2023-01-01") for _ in range(5)]
+
+    # 3 chunks x (id SELECT + savepoint + 2 DELETEs + balance upsert + release) + the final empty SELECT
+    with django_assert_num_queries(3 * 6 + 1):
+        deleted = delete_sales_chunked(Sale.objects.all(), chunk_size=2)
+
+    assert deleted == (5, 10)
+    assert not AuthorSale.objects.filter(sale_id__in=[s.id for s in sales]).exists()
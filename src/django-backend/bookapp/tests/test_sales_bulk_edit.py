@@ -0,0 +1,128 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def make_book(*, isbn_13, authors=(), publication_date="2020-01-01"):
+    book = Book.objects.create(title=f"Book {isbn_13}", publication_date=publication_date, isbn_13=isbn_13)
+    for author, rate in authors:
+        AuthorBook.objects.create(author=author, book=book, royalty_rate=Decimal(rate))
+    return book
+
+
+def make_sale(book, revenue="100.00"):
+    sale = Sale.objects.create(book=book, date="2023-01-01", quantity=10, publisher_revenue=Decimal(revenue))
+    sale.create_author_sales()
+    return sale
+
+
+@pytest.fixture
+def setup():
+    a1 = Author.objects.create(name="Bulk One")
+    a2 = Author.objects.create(name="Bulk Two")
+    book = make_book(isbn_13="9780000000001", authors=[(a1, "0.10"), (a2, "0.20")])
+    other = make_book(isbn_13="9780000000002", authors=[(a2, "0.50")])
+    return a1, a2, book, other
+
+
+def test_bulk_edit_applies_partial_updates(authed_client, setup):
+    a1, a2, book, other = setup
+    s1, s2, s3 = make_sale(book), make_sale(book), make_sale(book)
+
+    payload = [
+        {"id": s1.id, "publisher_revenue": "80.00"},
+        {"id": s2.id, "author_royalties": {str(a1.id): "1.50"}, "author_paid": {str(a2.id): True}},
+        {"id": s3.id, "book": other.id, "quantity": 4},
+    ]
+    resp = authed_client.post("/api/sale/bulk_edit", payload, format="json")
+    assert resp.status_code == 200, resp.content
+    assert [r["id"] for r in resp.data] == [s1.id, s2.id, s3.id]
+
+    s1.refresh_from_db()
+    assert (s1.publisher_revenue, s1.quantity, s1.book_id) == (Decimal("80.00"), 10, book.id)
+    # like sale/edit: existing royalty snapshots are not recomputed
+    assert AuthorSale.objects.get(sale=s1, author=a1).royalty_amount == Decimal("10.00")
+
+    by_author = {r.author_id: r for r in AuthorSale.objects.filter(sale=s2)}
+    assert by_author[a1.id].royalty_amount == Decimal("1.50")
+    assert by_author[a2.id].author_paid is True
+    assert by_author[a2.id].royalty_amount == Decimal("20.00")
+
+    # book change rebuilds allocations from the new book's rates
+    rows = list(AuthorSale.objects.filter(sale=s3))
+    assert [(r.author_id, r.royalty_amount) for r in rows] == [(a2.id, Decimal("50.00"))]
+    assert Sale.objects.get(id=s3.id).quantity == 4
+
+
+def test_bulk_edit_is_all_or_nothing(authed_client, setup):
+    a1, a2, book, other = setup
+    s1, s2 = make_sale(book), make_sale(book)
+
+    payload = [
+        {"id": s1.id, "publisher_revenue": "1.00"},
+        {"id": s2.id, "quantity": -1},
+        {"id": 999999, "quantity": 1},
+        {"id": s1.id, "quantity": 2},
+        {"quantity": 2},
+    ]
+    resp = authed_client.post("/api/sale/bulk_edit", payload, format="json")
+    assert resp.status_code == 400
+    assert [e["index"] for e in resp.data] == [1, 2, 3, 4]
+    assert resp.data[0]["errors"] == {"quantity": ["Quantity must be a positive integer."]}
+    assert "does not exist" in resp.data[1]["errors"]["id"][0]
+    assert "more than once" in resp.data[2]["errors"]["id"][0]
+
+    s1.refresh_from_db()
+    assert s1.publisher_revenue == Decimal("100.00")
+
+
+def test_bulk_edit_errors_match_single_edit(authed_client, setup):
+    a1, a2, book, other = setup
+    sale = make_sale(book)
+    update = {"book": book.id, "quantity": 1, "publisher_revenue": "--", "date": "2023-01-01"}
+
+    bulk = authed_client.post("/api/sale/bulk_edit", [dict(update, id=sale.id)], format="json")
+    single = authed_client.post(f"/api/sale/{sale.id}/edit", update, format="json")
+    assert bulk.status_code == single.status_code == 400
+    assert bulk.data[0]["errors"] == single.data
+
+
+def test_bulk_edit_query_count_independent_of_rows(authed_client, setup):
+    a1, a2, book, other = setup
+    sales = [make_sale(book) for _ in range(30)]
+
+    def run(chunk):
+        payload = [
+            {"id": s.id, "quantity": 3, "author_royalties": {str(a1.id): "2.00"}}
+            for s in chunk
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            resp = authed_client.post("/api/sale/bulk_edit", payload, format="json")
+        assert resp.status_code == 200, resp.content
+        return len(ctx.captured_queries)
+
+    assert run(sales[:5]) == run(sales[5:])
+    assert AuthorSale.objects.filter(author=a1, royalty_amount=Decimal("2.00")).count() == 30
@@ -0,0 +1,118 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def make_book(*, isbn_13, authors=()):
+    book = Book.objects.create(
+        title=f"Book {isbn_13}",
+        publication_date="2020-01-01",
+        isbn_13=isbn_13,
+    )
+    for author, rate in authors:
+        AuthorBook.objects.create(author=author, book=book, royalty_rate=Decimal(rate))
+    return book
+
+
+def sale_row(book_id, **overrides):
+    row = {"book": book_id, "quantity": 10, "publisher_revenue": "100.00", "date": "2023-01-01"}
+    row.update(overrides)
+    return row
+
+
+def test_createmany_allocates_royalties_and_returns_full_rows(authed_client):
+    a1 = Author.objects.create(name="A One")
+    a2 = Author.objects.create(name="A Two")
+    b1 = make_book(isbn_13="9780000000001", authors=[(a1, "0.10"), (a2, "0.20")])
+    b2 = make_book(isbn_13="9780000000002", authors=[(a2, "0.50")])
+
+    payload = [
+        sale_row(b1.id),
+        sale_row(str(b2.id), author_royalties={str(a2.id): "7.00"}, author_paid={str(a2.id): True}),
+    ]
+    resp = authed_client.post("/api/sale/createmany", payload, format="json")
+    assert resp.status_code == 201, resp.content
+
+    assert [r["book"] for r in resp.data] == [b1.id, b2.id]
+    assert resp.data[0]["book_title"] == b1.title
+    assert len(resp.data[0]["author_details"]) == 2
+
+    override = AuthorSale.objects.get(sale_id=resp.data[1]["id"])
+    assert override.royalty_amount == Decimal("7.00")
+    assert override.author_paid is True
+    assert AuthorSale.objects.get(sale_id=resp.data[0]["id"], author=a2).royalty_amount == Decimal("20.00")
+
+
+def test_createmany_errors_match_single_create(authed_client):
+    author = Author.objects.create(name="Neg Author")
+    book = make_book(isbn_13="9780000000003", authors=[(author, "0.10")])
+
+    bad_rows = [
+        sale_row(book.id, quantity=None),
+        sale_row(book.id, quantity=-5),
+        sale_row(book.id, publisher_revenue="--"),
+        sale_row(book.id, date="2019-06-01"),
+        sale_row(book.id, date="bad-date"),
+        sale_row(999999),
+        sale_row("abc"),
+        sale_row(book.id, author_royalties={str(author.id): "-1.00"}),
+    ]
+
+    resp = authed_client.post("/api/sale/createmany", [sale_row(book.id)] + bad_rows, format="json")
+    assert resp.status_code == 400
+    assert [e["index"] for e in resp.data] == list(range(1, len(bad_rows) + 1))
+
+    for error, row in zip(resp.data, bad_rows):
+        single = authed_client.post("/api/sale/create", row, format="json")
+        assert single.status_code == 400
+        assert error["errors"] == single.data
+
+    # all-or-nothing: the valid first row was not written
+    assert Sale.objects.count() == 0
+
+
+def test_createmany_query_count_independent_of_rows(authed_client):
+    authors = [Author.objects.create(name=f"Author {i}") for i in range(4)]
+    books = [
+        make_book(isbn_13=f"97800000001{i:02d}", authors=[(a, "0.05") for a in authors])
+        for i in range(5)
+    ]
+
+    def run(n):
+        payload = [sale_row(books[i % len(books)].id) for i in range(n)]
+        with CaptureQueriesContext(connection) as ctx:
+            resp = authed_client.post("/api/sale/createmany", payload, format="json")
+        assert resp.status_code == 201, resp.content
+        return len(ctx.captured_queries)
+
+    # preload + sale insert + author sale insert + response (sales, author_sales, authors)
+    # plus savepoint bookkeeping; none of it scales with the row count.
+    small, large = run(10), run(40)
+    assert small == large
+    assert large <= 10
+
+    assert Sale.objects.count() == 50
+    assert AuthorSale.objects.count() == 200
@@ -0,0 +1,137 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale
+from bookapp.services.balances import author_balance_drift
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != "postgresql", reason="CSV import uses COPY (PostgreSQL only)"),
+]
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def book():
+    a1 = Author.objects.create(name="Csv One")
+    a2 = Author.objects.create(name="Csv Two")
+    book = Book.objects.create(title="Csv Book", publication_date="2020-01-01", isbn_13="9780000000001")
+    AuthorBook.objects.create(author=a1, book=book, royalty_rate=Decimal("0.10"))
+    AuthorBook.objects.create(author=a2, book=book, royalty_rate=Decimal("0.0333"))
+    return book
+
+
+def post_csv(client, text, query=""):
+    return client.post(
+        f"/api/sale/createmany/csv{query}",
+        {"file": SimpleUploadedFile("sales.csv", text.encode(), content_type="text/csv")},
+        format="multipart",
+    )
+
+
+def test_csv_import_creates_sales_and_royalties(authed_client, book):
+    text = (
+        "﻿publisher_revenue,quantity,date,book,notes\r\n"
+        f"100.00,10,2023-01-01,{book.id},first\r\n"
+        f"15.55,3,2023-2-1,{book.id},\"quoted, note\"\r\n"
+    )
+    resp = post_csv(authed_client, text)
+    assert resp.status_code == 201, resp.content
+    assert resp.data["created_count"] == 2
+    assert resp.data["total_rows"] == 2
+
+    sales = list(Sale.objects.order_by("id"))
+    assert [(s.quantity, s.publisher_revenue) for s in sales] == [(10, Decimal("100.00")), (3, Decimal("15.55"))]
+    assert str(sales[1].date) == "2023-02-01"
+
+    # rounding matches the ORM path (numeric(10,2) rounding of revenue * rate)
+    orm_sale = Sale.objects.create(book=book, date="2023-02-01", quantity=3, publisher_revenue=Decimal("15.55"))
+    orm_sale.create_author_sales()
+    csv_amounts = sorted(AuthorSale.objects.filter(sale=sales[1]).values_list("royalty_amount", flat=True))
+    orm_amounts = sorted(AuthorSale.objects.filter(sale=orm_sale).values_list("royalty_amount", flat=True))
+    assert csv_amounts == orm_amounts
+    assert author_balance_drift() == []
+
+
+def test_csv_errors_match_single_create_messages(authed_client, book):
+    bad_rows = [
+        {"book": book.id, "quantity": "", "publisher_revenue": "1.00", "date": "2023-01-01"},
+        {"book": book.id, "quantity": "-5", "publisher_revenue": "1.00", "date": "2023-01-01"},
+        {"book": book.id, "quantity": "abc", "publisher_revenue": "1.00", "date": ""},
+        {"book": book.id, "quantity": "1", "publisher_revenue": "--", "date": "2023-01-01"},
+        {"book": book.id, "quantity": "1", "publisher_revenue": "-2.00", "date": "2023-01-01"},
+        {"book": book.id, "quantity": "1", "publisher_revenue": "1.005", "date": "2023-01-01"},
+        {"book": book.id, "quantity": "1", "publisher_revenue": "1.00", "date": "2019-06-01"},
+        {"book": book.id, "quantity": "1", "publisher_revenue": "1.00", "date": "2023-02-30"},
+        {"book": book.id, "quantity": "1", "publisher_revenue": "1.00", "date": ""},
+        {"book": "999999", "quantity": "1", "publisher_revenue": "1.00", "date": "2023-01-01"},
+        {"book": "abc", "quantity": "1", "publisher_revenue": "1.00", "date": "2023-01-01"},
+        {"book": "", "quantity": "1", "publisher_revenue": "1.00", "date": "2023-01-01"},
+    ]
+    lines = ["book,date,quantity,publisher_revenue", f"{book.id},2023-01-01,1,1.00"]
+    lines += [f"{r['book']},{r['date']},{r['quantity']},{r['publisher_revenue']}" for r in bad_rows]
+
+    resp = post_csv(authed_client, "\n".join(lines) + "\n")
+    assert resp.status_code == 400, resp.content
+    assert resp.data["error_count"] == len(bad_rows)
+    assert [e["index"] for e in resp.data["errors"]] == list(range(1, len(bad_rows) + 1))
+
+    for error, row in zip(resp.data["errors"], bad_rows):
+        # an empty CSV cell means the value is missing
+        payload = {k: v for k, v in row.items() if v != ""}
+        single = authed_client.post("/api/sale/create", payload, format="json")
+        assert single.status_code == 400
+        assert error["errors"] == single.data, row
+
+    assert Sale.objects.count() == 0
+
+
+def test_csv_dry_run_writes_nothing(authed_client, book):
+    resp = post_csv(authed_client, f"book,date,quantity,publisher_revenue\n{book.id},2023-01-01,1,1.00\n", "?dry_run=true")
+    assert resp.status_code == 200, resp.content
+    assert resp.data["total_rows"] == 1
+    assert Sale.objects.count() == 0
+
+
+def test_csv_missing_column_is_rejected(authed_client, book):
+    resp = post_csv(authed_client, f"book,date,quantity\n{book.id},2023-01-01,1\n")
+    assert resp.status_code == 400
+    assert "publisher_revenue" in resp.data["error"]
+
+
+def test_import_sales_command(book, tmp_path):
+    path = tmp_path / "sales.csv"
+    path.write_text(f"book,date,quantity,publisher_revenue\n{book.id},2023-01-01,2,20.00\n")
+
+    call_command("import_sales", str(path), "--dry-run")
+    assert Sale.objects.count() == 0
+
+    call_command("import_sales", str(path))
+    assert Sale.objects.count() == 1
+    assert AuthorSale.objects.count() == 2
+
+    path.write_text(f"book,date,quantity,publisher_revenue\n{book.id},2023-01-01,0,20.00\n")
+    with pytest.raises(CommandError):
+        call_command("import_sales", str(path))
+    assert Sale.objects.count() == 1
@@ -0,0 +1,228 @@
+import json
+import pytest
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale, AuthorSale, SaleImportJob
+from bookapp.services import sales_import
+
+# transaction=True: the worker manages its own connections/transactions like in production
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def book():
+    author = Author.objects.create(name="Import Author")
+    book = Book.objects.create(title="Imported", publication_date="2020-01-01", isbn_13="9780000000001")
+    AuthorBook.objects.create(author=author, book=book, royalty_rate=Decimal("0.10"))
+    return book
+
+
+def upload(client, rows):
+    content = json.dumps(rows).encode()
+    return client.post(
+        "/api/sale/import",
+        {"file": SimpleUploadedFile("sales.json", content, content_type="application/json")},
+        format="multipart",
+    )
+
+
+def sale_row(book_id, **overrides):
+    row = {"book": book_id, "quantity": 1, "publisher_revenue": "10.00", "date": "2023-01-01"}
+    row.update(overrides)
+    return row
+
+
+def test_import_job_is_queued_then_processed_in_chunks(authed_client, book):
+    resp = upload(authed_client, [sale_row(book.id) for _ in range(25)])
+    assert resp.status_code == 202, resp.content
+    job_id = resp.data["id"]
+    assert resp.data["status"] == SaleImportJob.STATUS_QUEUED
+    assert Sale.objects.count() == 0
+
+    call_command("run_sale_import_worker", "--once", "--chunk-size", "10")
+
+    resp = authed_client.get(f"/api/sale/import/{job_id}")
+    assert resp.status_code == 200
+    assert resp.data["status"] == SaleImportJob.STATUS_SUCCEEDED
+    assert resp.data["total_rows"] == 25
+    assert resp.data["validated_rows"] == 25
+    assert resp.data["created_count"] == 25
+    assert resp.data["error_count"] == 0
+    assert resp.data["finished_at"] is not None
+
+    assert Sale.objects.count() == 25
+    assert AuthorSale.objects.count() == 25
+
+
+def test_import_job_reports_row_errors_and_writes_nothing(authed_client, book):
+    rows = [sale_row(book.id) for _ in range(12)]
+    rows[3]["quantity"] = -1
+    rows[11]["date"] = "2019-01-01"
+
+    job_id = upload(authed_client, rows).data["id"]
+    call_command("run_sale_import_worker", "--once", "--chunk-size", "5")
+
+    data = authed_client.get(f"/api/sale/import/{job_id}").data
+    assert data["status"] == SaleImportJob.STATUS_FAILED
+    assert data["error_count"] == 2
+    assert [e["index"] for e in data["errors"]] == [3, 11]
+    assert data["errors"][0]["errors"] == {"quantity": ["Quantity must be a positive integer."]}
+    assert data["created_count"] == 0
+    assert Sale.objects.count() == 0
+
+
+def test_import_job_rejects_unparseable_file(authed_client):
+    resp = authed_client.post(
+        "/api/sale/import",
+        {"file": SimpleUploadedFile("sales.json", b"{not json", content_type="application/json")},
+        format="multipart",
+    )
+    job_id = resp.data["id"]
+    call_command("run_sale_import_worker", "--once")
+
+    data = authed_client.get(f"/api/sale/import/{job_id}").data
+    assert data["status"] == SaleImportJob.STATUS_FAILED
+    assert "JSON" in data["message"]
+
+
+def test_import_requires_file(authed_client):
+    resp = authed_client.post("/api/sale/import", {}, format="multipart")
+    assert resp.status_code == 400
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="CSV import uses COPY (PostgreSQL only)")
+def test_csv_import_job_uses_copy_importer(authed_client, book):
+    content = f"book,date,quantity,publisher_revenue\n{book.id},2023-01-01,1,10.00\n{book.id},2023-02-01,2,20.00\n"
+    resp = authed_client.post(
+        "/api/sale/import",
+        {"file": SimpleUploadedFile("sales.csv", content.encode(), content_type="text/csv")},
+        format="multipart",
+    )
+    job_id = resp.data["id"]
+    call_command("run_sale_import_worker", "--once")
+
+    data = authed_client.get(f"/api/sale/import/{job_id}").data
+    assert data["status"] == SaleImportJob.STATUS_SUCCEEDED
+    assert data["total_rows"] == 2
+    assert data["created_count"] == 2
+    assert AuthorSale.objects.count() == 2
+
+
+class WorkerKilled(BaseException):
+    """Stands in for the worker process dying (not an Exception, so nothing is recorded)."""
+
+
+def test_stale_job_is_reclaimed_and_resumes_after_committed_chunks(authed_client, book, monkeypatch):
+    job_id = upload(authed_client, [sale_row(book.id, quantity=i + 1) for i in range(25)]).data["id"]
+
+    chunks = []
+    original = sales_import.bulk_create_sales
+
+    def die_on_third_chunk(*args, **kwargs):
+        chunks.append(1)
+        if len(chunks) == 3:
+            raise WorkerKilled
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(sales_import, "bulk_create_sales", die_on_third_chunk)
+    job = sales_import.claim_next_job()
+    with pytest.raises(WorkerKilled):
+        sales_import.run_import_job(job, chunk_size=10)
+    monkeypatch.setattr(sales_import, "bulk_create_sales", original)
+
+    job.refresh_from_db()
+    assert (job.status, job.created_count, Sale.objects.count()) == (SaleImportJob.STATUS_IMPORTING, 20, 20)
+
+    # still inside the lease: nobody takes it over
+    assert sales_import.claim_next_job() is None
+
+    SaleImportJob.objects.filter(id=job_id).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+    # a different chunk size: the resume point falls inside a chunk
+    call_command("run_sale_import_worker", "--once", "--chunk-size", "15")
+
+    data = authed_client.get(f"/api/sale/import/{job_id}").data
+    assert data["status"] == SaleImportJob.STATUS_SUCCEEDED
+    assert data["created_count"] == 25
+    assert sorted(Sale.objects.values_list("quantity", flat=True)) == list(range(1, 26))
+    assert AuthorSale.objects.count() == 25
+
+
+def test_worker_that_lost_its_job_rolls_back_its_chunk(authed_client, book, monkeypatch):
+    job_id = upload(authed_client, [sale_row(book.id) for _ in range(5)]).data["id"]
+    job = sales_import.claim_next_job()
+
+    original = sales_import.validate_sale_rows
+    calls = []
+
+    def reclaimed_before_the_first_chunk(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:  # the import pass: another worker took the job over meanwhile
+            SaleImportJob.objects.filter(id=job_id).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+            assert sales_import.claim_next_job().id == job_id
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(sales_import, "validate_sale_rows", reclaimed_before_the_first_chunk)
+    with pytest.raises(sales_import.SaleImportJobLost):
+        sales_import.run_import_job(job)
+
+    assert Sale.objects.count() == 0
+    current = SaleImportJob.objects.get(id=job_id)
+    assert (current.status, current.created_count) == (SaleImportJob.STATUS_VALIDATING, 0)
+
+
+def test_import_job_accepts_ndjson(authed_client, book):
+    content = "\n".join(json.dumps(sale_row(book.id, quantity=i + 1)) for i in range(3)) + "\n\n"
+    resp = authed_client.post(
+        "/api/sale/import",
+        {"file": SimpleUploadedFile("sales.ndjson", content.encode(), content_type="application/x-ndjson")},
+        format="multipart",
+    )
+    call_command("run_sale_import_worker", "--once")
+
+    data = authed_client.get(f"/api/sale/import/{resp.data['id']}").data
+    assert data["status"] == SaleImportJob.STATUS_SUCCEEDED, data["message"]
+    assert sorted(Sale.objects.values_list("quantity", flat=True)) == [1, 2, 3]
+
+
+def stored_job(content, name="sales.json"):
+    return SaleImportJob.objects.create(upload=ContentFile(content.encode(), name=name))
+
+
+def test_json_list_is_read_in_blocks(monkeypatch):
+    monkeypatch.setattr(sales_import, "SALE_IMPORT_READ_SIZE", 3)
+    rows = [{"book": 1, "title": "Zoë \"quoted\" ]", "quantity": 12345}, 7, [], {"nested": {"a": [1, 2.5]}}]
+    assert list(sales_import.iter_import_rows(stored_job("﻿  " + json.dumps(rows, indent=2)))) == rows
+    assert list(sales_import.iter_import_rows(stored_job("[ ]"))) == []
+
+    for content in ("{not json", "[1, 2", "[1 2]", "[1,]", "[1] 2", '[{"book": 1}'):
+        with pytest.raises(sales_import.SaleImportFileError, match="JSON"):
+            list(sales_import.iter_import_rows(stored_job(content)))
@@ -0,0 +1,92 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from bookapp.models import Book, Author, AuthorBook, Sale
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="u1", password="pass12345")
+
+
+@pytest.fixture
+def authed_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def make_book(*, isbn_13, title="T", authors=()):
+    book = Book.objects.create(
+        title=title,
+        publication_date="2000-01-01",
+        isbn_13=isbn_13,
+    )
+    for author, rate in authors:
+        AuthorBook.objects.create(author=author, book=book, royalty_rate=Decimal(rate))
+    return book
+
+
+def make_sale(book, revenue, paid_author_ids=()):
+    sale = Sale.objects.create(book=book, date="2023-01-01", quantity=1, publisher_revenue=Decimal(revenue))
+    sale.create_author_sales(author_paid={str(a): True for a in paid_author_ids})
+    return sale
+
+
+def test_batch_totals_match_single_book_view(authed_client):
+    a1 = Author.objects.create(name="A One")
+    a2 = Author.objects.create(name="A Two")
+    b1 = make_book(isbn_13="9780000000001", authors=[(a1, "0.10"), (a2, "0.20")])
+    b2 = make_book(isbn_13="9780000000002", authors=[(a1, "0.50")])
+    b3 = make_book(isbn_13="9780000000003")
+
+    make_sale(b1, "100.00", paid_author_ids=[a1.id])
+    make_sale(b1, "50.00")
+    make_sale(b2, "10.00")
+
+    resp = authed_client.get(f"/api/sale/books/totals?ids={b2.id},{b1.id},{b3.id}")
+    assert resp.status_code == 200, resp.content
+
+    results = resp.data["results"]
+    assert [r["book_id"] for r in results] == [b2.id, b1.id, b3.id]
+
+    for row in results:
+        single = authed_client.get(f"/api/sale/book/{row['book_id']}/totals")
+        assert single.status_code == 200
+        for key in ("publisher_revenue", "total_royalties", "paid_royalties", "unpaid_royalties"):
+            assert Decimal(row[key]) == Decimal(single.data[key])
+
+    # two authors on b1 must not double publisher revenue
+    b1_row = results[1]
+    assert Decimal(b1_row["publisher_revenue"]) == Decimal("150.00")
+    assert Decimal(b1_row["paid_royalties"]) == Decimal("10.00")
+    assert Decimal(b1_row["total_royalties"]) == Decimal("45.00")
+
+
+def test_batch_totals_uses_two_queries(authed_client, django_assert_num_queries):
+    a1 = Author.objects.create(name="A One")
+    books = [make_book(isbn_13=f"97800000001{i:02d}", authors=[(a1, "0.10")]) for i in range(5)]
+    for book in books:
+        make_sale(book, "20.00")
+
+    ids = ",".join(str(b.id) for b in books)
+    with django_assert_num_queries(2):
+        resp = authed_client.get(f"/api/sale/books/totals?ids={ids}")
+    assert resp.status_code == 200
+    assert len(resp.data["results"]) == 5
+
+
+def test_batch_totals_rejects_bad_ids(authed_client):
+    assert authed_client.get("/api/sale/books/totals").status_code == 400
+    assert authed_client.get("/api/sale/books/totals?ids=1,abc").status_code == 400
+
+    too_many = ",".join(str(i) for i in range(1, 502))
+    assert authed_client.get(f"/api/sale/books/totals?ids={too_many}").status_code == 400
@@ -1,24 +1,43 @@
+from django.conf import settings
 from django.urls import path
 from .views.auth import LoginView, LogoutView
 from .views.registration import RegisterView
 from .views.change_password import ChangePasswordView
 from .views.account import MeView
 from .views.csrf import csrf
-from .views.book import BookListCreateView, BookDetailView
-from .views.author_payments import AuthorPaymentsGroupedView
+from .views.book import BookListCreateView, AsyncBookListCreateView, BookDetailView
+from .views.author_payments import AuthorPaymentsGroupedView, AsyncAuthorPaymentsGroupedView, AuthorPaymentRowsView
+from .views.payments import PaymentRunView, AuthorPaymentHistoryView
 
 from .views.sales import (
     SaleGetView,
+    AsyncSaleGetView,
     SaleCreateView,
     SaleCreateManyView,
     SaleEditView,
+    SaleBulkEditView,
+    SaleBulkDeleteView,
     SaleDeleteView,
     SalePayAuthorsView,
     BookSalesTotalsView,
+    AsyncBookSalesTotalsView,
+    BookSalesTotalsBatchView,
+    AsyncBookSalesTotalsBatchView,
 )
 
+from .views.sales_import import SaleImportCreateView, SaleImportJobView, SaleCsvCreateManyView
+
 from .views.author import AuthorUnpaidSubtotalView, AuthorPayUnpaidSalesView
-from .views.author import AuthorListCreateView
+from .views.author import AuthorListCreateView, AuthorDetailView, AuthorMergeView
+
+
+# Under ASGI the read-heavy endpoints are served by their async twins (same paths and payloads).
+if settings.ASYNC_READ_VIEWS:
+    BookListCreateView = AsyncBookListCreateView
+    SaleGetView = AsyncSaleGetView
+    BookSalesTotalsView = AsyncBookSalesTotalsView
+    BookSalesTotalsBatchView = AsyncBookSalesTotalsBatchView
+    AuthorPaymentsGroupedView = AsyncAuthorPaymentsGroupedView
 
 
 urlpatterns = [
@@ -36,14 +55,25 @@ urlpatterns = [
     path("sale/<int:sale_id>/get", SaleGetView.as_view()),
     path("sale/create", SaleCreateView.as_view()),
     path("sale/createmany", SaleCreateManyView.as_view()),
+    path("sale/createmany/csv", SaleCsvCreateManyView.as_view()),
     path("sale/<int:sale_id>/edit", SaleEditView.as_view()),
+    path("sale/bulk_edit", SaleBulkEditView.as_view()),
+    path("sale/bulk_delete", SaleBulkDeleteView.as_view()),
     path("sale/<int:sale_id>", SaleDeleteView.as_view()),
     path("sale/<int:sale_id>/pay_authors", SalePayAuthorsView.as_view()),
+    path("sale/import", SaleImportCreateView.as_view()),
+    path("sale/import/<int:job_id>", SaleImportJobView.as_view()),
 
     path("sale/book/<int:book_id>/totals", BookSalesTotalsView.as_view()),
+    path("sale/books/totals", BookSalesTotalsBatchView.as_view()),
 
+    path("author/<int:author_id>/", AuthorDetailView.as_view()),
     path("author/<int:author_id>/unpaid/subtotal", AuthorUnpaidSubtotalView.as_view()),
     path("author/<int:author_id>/pay_unpaid_sales", AuthorPayUnpaidSalesView.as_view()),
+    path("author/<int:author_id>/payments", AuthorPaymentHistoryView.as_view()),
+    path("author/<int:author_id>/payments/rows", AuthorPaymentRowsView.as_view()),
     path("authors/", AuthorListCreateView.as_view()),
+    path("authors/merge", AuthorMergeView.as_view()),
     path("author/payments/grouped", AuthorPaymentsGroupedView.as_view()),
+    path("payments/run", PaymentRunView.as_view()),
 ]
@@ -1,3 +1,5 @@
+import calendar
+
 from django.db.models import OuterRef, Subquery
 from .models import Author
 
@@ -11,3 +13,17 @@ def get_first_author_name_subquery(outer_ref_field="pk"):
             authorbook__book=OuterRef(outer_ref_field)
         ).order_by('id').values('name')[:1]
     )
+
+
+def first_of_month(value):
+    """'YYYY-MM' or 'YYYY-MM-DD' -> 'YYYY-MM-01' (sales are stored by month)."""
+    parts = value.split("-")
+    return f"{parts[0]}-{parts[1]}-01"
+
+
+def last_of_month(value):
+    """'YYYY-MM' or 'YYYY-MM-DD' -> last day of that month as 'YYYY-MM-DD'."""
+    parts = value.split("-")
+    year, month = int(parts[0]), int(parts[1])
+    last_day = calendar.monthrange(year, month)[1]
+    return f"{year}-{month:02d}-{last_day:02d}"
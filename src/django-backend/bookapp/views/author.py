@@ -1,7 +1,9 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from decimal import Decimal
-from django.db.models import Sum
+from django.db.models import F, Q, Value, DecimalField, IntegerField
+from django.db.models.functions import Coalesce
 from django.db import IntegrityError
-from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -9,21 +11,33 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from ..serializers.author import AuthorListSerializer, AuthorCreateSerializer
 
-from ..models import Author, AuthorSale
+from ..models import Author, PaymentBatch
+from ..services.author_merge import AuthorMergeError, find_duplicate_authors, merge_authors
+from ..services.author_stats import author_stats
+from ..services.payments import pay_royalties
 
 
-class AuthorUnpaidSubtotalView(APIView):
+class AuthorDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, author_id):
-        get_object_or_404(Author, id=author_id)
+        # books, units, royalty totals and latest sale in one query, cached briefly
+        stats = author_stats(author_id)
+        if stats is None:
+            return Response({"error": "Author not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(stats, status=status.HTTP_200_OK)
+
+
+class AuthorUnpaidSubtotalView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        subtotal = (
-            AuthorSale.objects
-            .filter(author_id=author_id, author_paid=False)
-            .aggregate(total=Sum("royalty_amount"))
-            .get("total")
-        ) or Decimal("0.00")
+    def get(self, request, author_id):
+        # AuthorBalance is kept current by every AuthorSale write: one primary-key lookup
+        author = get_object_or_404(
+            Author.objects.annotate(unpaid_total=F("balance__unpaid_total")).only("id"),
+            id=author_id,
+        )
+        subtotal = author.unpaid_total or Decimal("0.00")
 
         return Response(
             {
@@ -37,43 +51,135 @@ class AuthorPayUnpaidSalesView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, author_id):
-        get_object_or_404(Author, id=author_id)
-
-        with transaction.atomic():
-            qs = (
-                 AuthorSale.objects
-                 .select_for_update()
-                 .filter(author_id=author_id, author_paid=False)
-             )
-
-
-            total_to_pay = qs.aggregate(total=Sum("royalty_amount")).get("total") or Decimal("0.00")
-
-            sale_ids = list(
-               AuthorSale.objects
-                .filter(author_id=author_id, author_paid=False)
-                .values_list("sale_id", flat=True)
-                .distinct()
-            )
+        # One UPDATE ... RETURNING: totals, affected sales and the ledger lines come from the
+        # rows it flipped, so no extra lock/aggregate/distinct queries run while rows are locked.
+        rows, _ = pay_royalties(
+            "author_id = %s",
+            [author_id],
+            source=PaymentBatch.SOURCE_AUTHOR,
+            filters={"author_id": int(author_id)},
+            user=request.user,
+        )
+        if not rows:
+            get_object_or_404(Author, id=author_id)
 
-            updated_count = qs.update(author_paid=True)
+        total_to_pay = sum((amount for _, _, _, amount in rows), Decimal("0.00"))
+        sale_ids = sorted({sale_id for _, _, sale_id, _ in rows})
 
         return Response(
             {
                 "author_id": int(author_id),
-                "author_sales_marked_paid": updated_count,
+                "author_sales_marked_paid": len(rows),
                 "total_royalties_paid": str(total_to_pay),
                 "sale_ids_affected": sale_ids,
             },
             status=status.HTTP_200_OK,
         )
 
+# authors/ ?fields= projection: output name -> annotation (None for plain columns)
+AUTHOR_LIST_FIELDS = {
+    "id": None,
+    "name": None,
+    "unpaid_total": Coalesce(F("balance__unpaid_total"), Value(Decimal("0.00")), output_field=DecimalField()),
+    "unpaid_count": Coalesce(F("balance__unpaid_count"), Value(0), output_field=IntegerField()),
+}
+AUTHOR_LIST_DEFAULT_FIELDS = ("id", "name")
+AUTHOR_LIST_LIMIT = 50
+AUTHOR_LIST_MAX_LIMIT = 500
+
+
+def encode_author_cursor(name, author_id):
+    """Keyset position after (name, id); url-safe base64 of a JSON pair."""
+    return urlsafe_b64encode(json.dumps([name, author_id]).encode()).decode().rstrip("=")
+
+
+def decode_author_cursor(cursor):
+    """Inverse of encode_author_cursor(); raises ValueError for anything malformed."""
+    try:
+        name, author_id = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (TypeError, ValueError):  # bad base64/UTF-8/JSON or not a pair
+        raise ValueError("Invalid cursor.")
+    if not isinstance(name, str) or isinstance(author_id, bool) or not isinstance(author_id, int):
+        raise ValueError("Invalid cursor.")
+    return name, author_id
+
+
+def _format_money(rows):
+    # values() hands back Decimal; money goes out as "12.34" like the other author endpoints
+    for row in rows:
+        if "unpaid_total" in row:
+            row["unpaid_total"] = str(Decimal(row["unpaid_total"]).quantize(Decimal("0.01")))
+    return rows
+
+
 class AuthorListCreateView(APIView):
+    """
+    GET authors/ -> { results: [...], next_cursor }  (by name, cursor paginated)
+
+      q=<text>              case-insensitive name search
+      limit=<n>             page size (default 50, max 500)
+      cursor=<next_cursor>  continue after the previous page
+      fields=id,name,...    projection (id, name, unpaid_total, unpaid_count)
+      ids=1,2,3             batch lookup of known ids (max 500; no pagination, missing ids omitted)
+      legacy=true           the old unpaginated [{id, name}, ...] list of every author
+
+    Rows come straight from values(); no model instances or serializers per author.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        authors = Author.objects.all().order_by("name")
-        return Response(AuthorListSerializer(authors, many=True).data)
+        params = request.query_params
+        if params.get("legacy") in ("1", "true", "True", "yes"):
+            return Response(list(Author.objects.order_by("name").values("id", "name")))
+
+        wanted = [f.strip() for f in (params.get("fields") or "").split(",") if f.strip() in AUTHOR_LIST_FIELDS]
+        fields = list(dict.fromkeys(wanted)) or list(AUTHOR_LIST_DEFAULT_FIELDS)
+        queryset = Author.objects.order_by("name", "id").annotate(
+            **{name: AUTHOR_LIST_FIELDS[name] for name in fields if AUTHOR_LIST_FIELDS[name] is not None}
+        )
+
+        ids = params.get("ids")
+        if ids is not None:
+            try:
+                id_list = sorted({int(part) for part in ids.split(",") if part.strip()})
+            except ValueError:
+                return Response({"error": "ids must be comma-separated integers."}, status=status.HTTP_400_BAD_REQUEST)
+            if len(id_list) > AUTHOR_LIST_MAX_LIMIT:
+                return Response(
+                    {"error": f"At most {AUTHOR_LIST_MAX_LIMIT} ids per request."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            rows = list(queryset.filter(id__in=id_list).values(*fields))
+            return Response({"results": _format_money(rows), "next_cursor": None})
+
+        try:
+            limit = min(max(int(params.get("limit") or AUTHOR_LIST_LIMIT), 1), AUTHOR_LIST_MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        q = (params.get("q") or "").strip()
+        if q:
+            queryset = queryset.filter(name__icontains=q)
+
+        cursor = params.get("cursor")
+        if cursor:
+            try:
+                after_name, after_id = decode_author_cursor(cursor)
+            except ValueError as exc:
+                return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(Q(name__gt=after_name) | Q(name=after_name, id__gt=after_id))
+
+        # name/id are always read for the cursor, whatever the projection
+        extra = [name for name in ("name", "id") if name not in fields]
+        rows = list(queryset.values(*fields, *extra)[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_author_cursor(rows[-1]["name"], rows[-1]["id"])
+        if extra:
+            rows = [{name: row[name] for name in fields} for row in rows]
+
+        return Response({"results": _format_money(rows), "next_cursor": next_cursor})
 
     def post(self, request):
         serializer = AuthorCreateSerializer(data=request.data)
@@ -83,7 +189,7 @@ class AuthorListCreateView(APIView):
         name = serializer.validated_data["name"]
 
         # "Create if not exists" behavior (nice for your UX)
-        existing = Author.objects.filter(name__iexact=name).first()
+        existing = Author.objects.with_name(name).first()
         if existing:
             return Response(
                 AuthorListSerializer(existing).data,
@@ -94,9 +200,47 @@ class AuthorListCreateView(APIView):
             author = Author.objects.create(name=name)
         except IntegrityError:
             # In case of race condition or DB constraint hit
-            author = Author.objects.filter(name__iexact=name).first()
+            author = Author.objects.with_name(name).first()
             if author:
                 return Response(AuthorListSerializer(author).data, status=status.HTTP_200_OK)
             raise
 
         return Response(AuthorListSerializer(author).data, status=status.HTTP_201_CREATED)
+
+
+class AuthorMergeView(APIView):
+    """
+    Fold duplicate authors into a canonical one (AuthorBook, AuthorSale, PaymentLine and the
+    balance move over; the duplicates are deleted). JSON body:
+      {"canonical_id": 1, "duplicate_ids": [2, 3]}  merge these authors, or
+      {"auto": true}                                 merge every case/spacing duplicate group.
+    ``"dry_run": true`` runs the merge and rolls it back, returning the same counts.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        data = request.data
+        if not isinstance(data, dict):
+            return Response({"error": "Expected an object"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if data.get("auto") is True:
+            plan = find_duplicate_authors()
+        else:
+            canonical_id = data.get("canonical_id")
+            duplicate_ids = data.get("duplicate_ids")
+            if (
+                isinstance(canonical_id, bool) or not isinstance(canonical_id, int)
+                or not isinstance(duplicate_ids, list) or not duplicate_ids
+                or any(isinstance(i, bool) or not isinstance(i, int) for i in duplicate_ids)
+            ):
+                return Response(
+                    {"error": "Provide canonical_id (integer) and duplicate_ids (non-empty list of integers), or auto: true."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            plan = {canonical_id: duplicate_ids}
+
+        try:
+            result = merge_authors(plan, dry_run=data.get("dry_run") is True)
+        except AuthorMergeError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
@@ -1,20 +1,297 @@
+from datetime import date
 from math import ceil
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
-from django.db.models import (
-    Sum, Count, Case, When, Value, IntegerField, DecimalField
-)
-from django.db.models.functions import Coalesce
+from django.db.models import F, Q, Value, IntegerField, DecimalField, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
+from adrf.views import APIView as AsyncAPIView
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
 from ..models import Author, AuthorSale
+from ..renderers import json_dumps
+
+# Rows returned inline per author group; the rest are paged via author/<id>/payments/rows.
+ROWS_PER_AUTHOR = 50
+MAX_ROWS_PER_AUTHOR = 500
+
+# Authors fetched per query while streaming ?all=true.
+STREAM_AUTHOR_CHUNK_SIZE = 100
+
+# newest first; AuthorSale id breaks ties so the keyset cursor is exact
+ROW_ORDERING = ("-sale__date", "-sale_id", "-id")
+
+# One tuple per AuthorSale row (values_list): no Author/Sale/Book instances are built.
+ROW_FIELDS = (
+    "id", "author_id", "royalty_amount", "author_paid",
+    "sale_id", "sale__book_id", "sale__book__title", "sale__date", "sale__quantity", "sale__publisher_revenue",
+)
+
+_EPOCH = date(1970, 1, 1)
+
+# ?ordering= values -> ORDER BY (always ending in a unique key, so pages and streaming are stable)
+AUTHOR_ORDERINGS = {
+    "name": ("name", "id"),
+    "unpaid_total": ("unpaid_total", "name", "id"),
+    "-unpaid_total": ("-unpaid_total", "name", "id"),
+}
+
+
+def _bounded_int(value, default, maximum):
+    return min(max(int(value or default), 1), maximum)
+
+
+def _authors_with_unpaid(ordering="name"):
+    """Authors with their unpaid royalty total/count (from AuthorBalance; no aggregate)."""
+    return (
+        Author.objects
+        .all()
+        .annotate(
+            unpaid_total=Coalesce(F("balance__unpaid_total"), Value(Decimal("0.00")), output_field=DecimalField()),
+            unpaid_count=Coalesce(F("balance__unpaid_count"), Value(0), output_field=IntegerField()),
+        )
+        .order_by(*AUTHOR_ORDERINGS[ordering])
+    )
+
+
+def filter_authors(queryset, params):
+    """
+    Apply the grouped view's filters (in SQL, before pagination):
+      unpaid_only=true   only authors who are owed something
+      min_unpaid=<amt>   only authors owed at least <amt>
+      q=<text>           case-insensitive name search
+    Raises ValueError for a malformed min_unpaid.
+    """
+    if params.get("unpaid_only") in ("1", "true", "True", "yes"):
+        # balance__ lookups make this an inner join on AuthorBalance
+        queryset = queryset.filter(balance__unpaid_total__gt=0)
+
+    min_unpaid = params.get("min_unpaid")
+    if min_unpaid not in (None, ""):
+        try:
+            amount = Decimal(min_unpaid)
+        except InvalidOperation:
+            raise ValueError("min_unpaid must be a number.")
+        if not amount.is_finite():
+            raise ValueError("min_unpaid must be a number.")
+        queryset = queryset.filter(balance__unpaid_total__gte=amount) if amount > 0 else queryset
+
+    q = (params.get("q") or "").strip()
+    if q:
+        queryset = queryset.filter(name__icontains=q)
+
+    return queryset
+
+
+def _keyset_after(ordering, last):
+    """WHERE clause selecting rows after ``last`` in ``ordering`` (lexicographic over its fields)."""
+    condition = Q()
+    equal = {}
+    for field in ordering:
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        value = getattr(last, name)
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return condition
+
+
+def encode_rows_cursor(values):
+    """Keyset position just after a ROW_FIELDS tuple: "<sale date>_<sale id>_<author sale id>"."""
+    return f"{values[7].isoformat()}_{values[4]}_{values[0]}"
+
+
+def decode_rows_cursor(cursor):
+    """Inverse of encode_rows_cursor(); raises ValueError for anything malformed."""
+    sale_date, sale_id, pk = cursor.split("_")
+    return date.fromisoformat(sale_date), int(sale_id), int(pk)
+
+
+def _rows_after(queryset, cursor):
+    sale_date, sale_id, pk = decode_rows_cursor(cursor)
+    return queryset.filter(
+        Q(sale__date__lt=sale_date)
+        | Q(sale__date=sale_date, sale_id__lt=sale_id)
+        | Q(sale__date=sale_date, sale_id=sale_id, id__lt=pk)
+    )
+
+
+def _date_parts(sale_date, cache):
+    """(ISO string, epoch seconds at UTC midnight) per distinct date; rows share few dates."""
+    parts = cache.get(sale_date)
+    if parts is None:
+        parts = cache[sale_date] = (sale_date.isoformat(), (sale_date - _EPOCH).days * 86400)
+    return parts
+
+
+def build_payment_row(values, author_name, date_cache):
+    """One frontend row from a ROW_FIELDS tuple; ``date_cache`` is a dict shared per response."""
+    pk, author_id, royalty, paid, sale_id, book_id, book_title, sale_date, quantity, revenue = values[:10]
+    date_str, date_key = _date_parts(sale_date, date_cache)
+    royalty_str = str(royalty)
+    paid = bool(paid)
+    # shape matches your frontend rows: { sale, author, paid, royalty, dateKey }
+    return {
+        "sale": {
+            "id": sale_id,
+            "book": book_id,
+            "book_title": book_title or "",
+            "date": date_str,
+            "quantity": quantity,
+            "publisher_revenue": str(revenue),
+        },
+        "author": {
+            "id": author_id,
+            "name": author_name,
+            "royalty_amount": royalty_str,
+            "paid": paid,
+        },
+        "paid": paid,
+        "royalty": float(royalty),
+        "dateKey": date_key,
+    }
+
+
+def _group_rows(author_ids, rows_per_author):
+    """
+    One query for the rows of every author in ``author_ids``: ROW_NUMBER() per author, keeping
+    rows_per_author + 1 so we know whether to hand out a rows_cursor, without ever reading an
+    author's full history.
+    """
+    return (
+        AuthorSale.objects
+        .filter(author_id__in=author_ids)
+        .annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=[F("author_id")],
+                order_by=[F("sale__date").desc(), F("sale_id").desc(), F("id").desc()],
+            )
+        )
+        .filter(row_number__lte=rows_per_author + 1)
+        .order_by("author_id", *ROW_ORDERING)
+        .values_list(*ROW_FIELDS, "row_number")
+    )
+
+
+def _fill_groups(authors, rows, rows_per_author):
+    """Groups for ``authors`` (in order) from their _group_rows() rows."""
+    groups = {a.id: {
+        "author": {"id": a.id, "name": a.name},
+        "unpaidTotal": float(a.unpaid_total or Decimal("0.00")),
+        "unpaidCount": int(a.unpaid_count or 0),
+        "rows": [],
+        "rows_cursor": None,
+    } for a in authors}
+
+    date_cache = {}
+    last_kept = {}
+    for values in rows:
+        author_id = values[1]
+        group = groups[author_id]
+        if values[10] > rows_per_author:
+            group["rows_cursor"] = encode_rows_cursor(last_kept[author_id])
+            continue
+        group["rows"].append(build_payment_row(values, group["author"]["name"], date_cache))
+        last_kept[author_id] = values
+
+    # Ensure author order is preserved
+    return [groups[a.id] for a in authors]
+
+
+def _build_groups(authors, rows_per_author):
+    """Groups for ``authors`` (in order) with at most ``rows_per_author`` newest rows each."""
+    return _fill_groups(authors, _group_rows([a.id for a in authors], rows_per_author), rows_per_author)
+
+
+def _stream_all_groups(author_qs, ordering, total_authors, rows_per_author):
+    """
+    JSON body for ?all=true, produced author chunk by author chunk (keyset on the ordering)
+    so memory stays bounded by STREAM_AUTHOR_CHUNK_SIZE groups however many authors exist.
+    """
+    yield _stream_head(total_authors)
+
+    first = True
+    last = None
+    while True:
+        authors = list(_stream_chunk(author_qs, ordering, last))
+        if not authors:
+            break
+
+        for group in _build_groups(authors, rows_per_author):
+            yield (b"" if first else b",") + json_dumps(group)
+            first = False
+        last = authors[-1]
+
+    yield b"]}"
+
+
+async def _abuild_groups(authors, rows_per_author):
+    rows = [values async for values in _group_rows([a.id for a in authors], rows_per_author)]
+    return _fill_groups(authors, rows, rows_per_author)
+
+
+async def _astream_all_groups(author_qs, ordering, total_authors, rows_per_author):
+    """_stream_all_groups() for ASGI: each chunk's queries are awaited."""
+    yield _stream_head(total_authors)
+
+    first = True
+    last = None
+    while True:
+        authors = [author async for author in _stream_chunk(author_qs, ordering, last)]
+        if not authors:
+            break
+
+        for group in await _abuild_groups(authors, rows_per_author):
+            yield (b"" if first else b",") + json_dumps(group)
+            first = False
+        last = authors[-1]
+
+    yield b"]}"
 
 
+def _stream_head(total_authors):
+    head = {"count": total_authors, "page": 1, "page_size": total_authors, "total_pages": 1}
+    return json_dumps(head)[:-1] + b',"results":['
+
+
+def _stream_chunk(author_qs, ordering, last):
+    """The next STREAM_AUTHOR_CHUNK_SIZE authors after ``last`` (keyset on the ordering)."""
+    if last is not None:
+        author_qs = author_qs.filter(_keyset_after(AUTHOR_ORDERINGS[ordering], last))
+    return author_qs[:STREAM_AUTHOR_CHUNK_SIZE]
+
+
+def grouped_page_params(params):
+    """(show_all, page, page_size, rows_per_author) for the grouped view."""
+    show_all = params.get("all") in ("1", "true", "True", "yes")
+    page = int(params.get("page", 1))
+    page_size = int(params.get("page_size", 10))
+    rows_per_author = _bounded_int(params.get("rows_per_author"), ROWS_PER_AUTHOR, MAX_ROWS_PER_AUTHOR)
+    return show_all, max(page, 1), min(max(page_size, 1), 100), rows_per_author
+
+
+def grouped_authors(params):
+    """(ordering, filtered author queryset); ValueError carries the 400 message."""
+    ordering = params.get("ordering") or "name"
+    if ordering not in AUTHOR_ORDERINGS:
+        raise ValueError(f"ordering must be one of: {', '.join(AUTHOR_ORDERINGS)}.")
+    return ordering, filter_authors(_authors_with_unpaid(ordering), params)
+
+
+def grouped_page_payload(total_authors, page, page_size, results):
+    return {
+        "count": total_authors,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": ceil(total_authors / page_size) if page_size else 0,
+        "results": results,
+    }
 class AuthorPaymentsGroupedView(APIView):
     """
     Returns author-grouped payment rows, paginated by AUTHOR.
@@ -29,129 +306,112 @@ class AuthorPaymentsGroupedView(APIView):
           unpaidCount: number,
           rows: [
             { sale: <SaleSerializer-like fields>, author: <author_details row>, paid, royalty, dateKey }
-          ]
+          ],
+          rows_cursor: string | null
         }
       ]
     }
+
+    rows holds the author's newest ?rows_per_author= rows (default 50, max 500); when there are
+    more, rows_cursor continues them via author/<id>/payments/rows. ?all=true streams every
+    author instead of paginating (rows are capped the same way).
+
+    Filters: unpaid_only=true, min_unpaid=<amount>, q=<name search>.
+    ?ordering= name (default) | unpaid_total | -unpaid_total ("who do we owe most").
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # pagination params
-        show_all = request.query_params.get("all") in ("1", "true", "True", "yes")
-        page = int(request.query_params.get("page", 1))
-        page_size = int(request.query_params.get("page_size", 10))
-
-        page = max(page, 1)
-        page_size = min(max(page_size, 1), 100)
-
-        # default (and only) ordering per your spec: author name asc
-        # (keeping ordering param out for now intentionally)
-        author_qs = (
-            Author.objects
-            .all()
-            .order_by("name", "id")
-            .annotate(
-                unpaid_total=Coalesce(
-                    Sum(
-                        Case(
-                            # FIX: authorsale__... -> sales_records__...
-                            When(sales_records__author_paid=False, then="sales_records__royalty_amount"),
-                            default=Value(0),
-                            output_field=DecimalField(),
-                        )
-                    ),
-                    Value(0),
-                    output_field=DecimalField(),
-                ),
-                unpaid_count=Count(
-                    Case(
-                        # FIX: authorsale__... -> sales_records__...
-                        When(sales_records__author_paid=False, then=1),
-                        output_field=IntegerField(),
-                    )
-                ),
+        show_all, page, page_size, rows_per_author = grouped_page_params(request.query_params)
+        try:
+            ordering, author_qs = grouped_authors(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        total_authors = author_qs.count()
+
+        if show_all:
+            return StreamingHttpResponse(
+                _stream_all_groups(author_qs, ordering, total_authors, rows_per_author),
+                content_type="application/json",
             )
+
+        start = (page - 1) * page_size
+        page_authors = list(author_qs[start:start + page_size])
+        results = _build_groups(page_authors, rows_per_author) if page_authors else []
+
+        return Response(
+            grouped_page_payload(total_authors, page, page_size, results),
+            status=status.HTTP_200_OK,
         )
 
-        total_authors = author_qs.count()
+
+class AsyncAuthorPaymentsGroupedView(AsyncAPIView, AuthorPaymentsGroupedView):
+    """author/payments/grouped for ASGI (same queries and payloads, awaited)."""
+
+    async def get(self, request):
+        show_all, page, page_size, rows_per_author = grouped_page_params(request.query_params)
+        try:
+            ordering, author_qs = grouped_authors(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        total_authors = await author_qs.acount()
 
         if show_all:
-            page_authors = list(author_qs)
-            page = 1
-            page_size_out = total_authors
-            total_pages = 1
-        else:
-            start = (page - 1) * page_size
-            end = start + page_size
-            page_authors = list(author_qs[start:end])
-            page_size_out = page_size
-            total_pages = ceil(total_authors / page_size) if page_size else 0
-
-        author_ids = [a.id for a in page_authors]
-        if not author_ids:
-            return Response(
-                {
-                    "count": total_authors,
-                    "page": page,
-                    "page_size": page_size_out,
-                    "total_pages": total_pages,
-                    "results": [],
-                },
-                status=status.HTTP_200_OK,
+            return StreamingHttpResponse(
+                _astream_all_groups(author_qs, ordering, total_authors, rows_per_author),
+                content_type="application/json",
             )
 
-        # Fetch all AuthorSale rows for authors on THIS page.
-        # This bounds queries unless user hits "Show all".
+        start = (page - 1) * page_size
+        page_authors = [author async for author in author_qs[start:start + page_size]]
+        results = await _abuild_groups(page_authors, rows_per_author) if page_authors else []
+
+        return Response(
+            grouped_page_payload(total_authors, page, page_size, results),
+            status=status.HTTP_200_OK,
+        )
+
+
+class AuthorPaymentRowsView(APIView):
+    """
+    Keyset-paginated AuthorSale rows for one author, newest first (same row shape as the
+    grouped view). Pass the group's rows_cursor (or a previous next_cursor) as ?cursor=:
+    { author_id, rows: [...], next_cursor }  -- next_cursor is null on the last page.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, author_id):
+        author = get_object_or_404(Author, id=author_id)
+
+        try:
+            limit = _bounded_int(request.query_params.get("limit"), ROWS_PER_AUTHOR, MAX_ROWS_PER_AUTHOR)
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
         rows_qs = (
             AuthorSale.objects
-            .filter(author_id__in=author_ids)
-            .select_related("author", "sale", "sale__book")
-            .order_by("author__name", "-sale__date", "-sale__id")
+            .filter(author_id=author.id)
+            .order_by(*ROW_ORDERING)
+            .values_list(*ROW_FIELDS)
         )
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            try:
+                rows_qs = _rows_after(rows_qs, cursor)
+            except ValueError:
+                return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Build groups in the same order as author_qs pagination returned
-        author_by_id = {a.id: a for a in page_authors}
-        groups = {a.id: {
-            "author": {"id": a.id, "name": a.name},
-            "unpaidTotal": float(a.unpaid_total or Decimal("0.00")),
-            "unpaidCount": int(a.unpaid_count or 0),
-            "rows": [],
-        } for a in page_authors}
-
-        for ars in rows_qs:
-            sale = ars.sale
-            # shape matches your frontend rows: { sale, author, paid, royalty, dateKey }
-            groups[ars.author_id]["rows"].append({
-                "sale": {
-                    "id": sale.id,
-                    "book": sale.book_id,
-                    "book_title": sale.book.title if sale.book else "",
-                    "date": str(sale.date),
-                    "quantity": sale.quantity,
-                    "publisher_revenue": str(sale.publisher_revenue),
-                },
-                "author": {
-                    "id": ars.author_id,
-                    "name": ars.author.name if ars.author else "",
-                    "royalty_amount": str(ars.royalty_amount),
-                    "paid": bool(ars.author_paid),
-                },
-                "paid": bool(ars.author_paid),
-                "royalty": float(ars.royalty_amount or Decimal("0.00")),
-                "dateKey": int(sale.date.strftime("%s")) if sale and sale.date else 0,
-            })
-
-        # Ensure author order is preserved
-        results = [groups[a.id] for a in page_authors]
+        page_rows = list(rows_qs[:limit + 1])
+        date_cache = {}
+        next_cursor = encode_rows_cursor(page_rows[limit - 1]) if len(page_rows) > limit else None
 
         return Response(
             {
-                "count": total_authors,
-                "page": page,
-                "page_size": page_size_out,
-                "total_pages": total_pages,
-                "results": results,
+                "author_id": author.id,
+                "rows": [build_payment_row(values, author.name, date_cache) for values in page_rows[:limit]],
+                "next_cursor": next_cursor,
             },
             status=status.HTTP_200_OK,
         )
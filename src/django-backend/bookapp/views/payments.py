@@ -0,0 +1,195 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from math import ceil
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Sum
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+
+from ..models import Author, AuthorBalance, AuthorSale, PaymentLine
+from ..services.payments import run_payout, payout_summary
+from ..utils import first_of_month, last_of_month
+
+
+def _money(value):
+    return str((value or Decimal("0")).quantize(Decimal("0.01")))
+
+
+def _int_list(value):
+    return isinstance(value, list) and all(isinstance(i, int) and not isinstance(i, bool) for i in value)
+
+
+class PaymentRunView(APIView):
+    """
+    Payout run: mark every unpaid royalty matching the filters as paid.
+
+    Body (JSON): start_date / end_date (YYYY-MM or YYYY-MM-DD, whole months like sale/get_all),
+    book_ids, author_ids. At least one filter is required; send "all": true to pay everything.
+
+    Returns overall totals plus per-author totals for exactly the rows this run paid.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        data = request.data
+        if not isinstance(data, dict):
+            return Response({"error": "Expected an object"}, status=status.HTTP_400_BAD_REQUEST)
+
+        start_date = data.get("start_date")
+        end_date = data.get("end_date")
+        book_ids = data.get("book_ids")
+        author_ids = data.get("author_ids")
+
+        if not (start_date or end_date or book_ids is not None or author_ids is not None or data.get("all") is True):
+            return Response(
+                {"error": "Provide start_date, end_date, book_ids or author_ids (or \"all\": true)."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        for name, value in (("book_ids", book_ids), ("author_ids", author_ids)):
+            if value is not None and not _int_list(value):
+                return Response({"error": f"{name} must be a list of integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = AuthorSale.objects.all()
+        try:
+            if start_date:
+                queryset = queryset.filter(sale__date__gte=first_of_month(start_date))
+            if end_date:
+                queryset = queryset.filter(sale__date__lte=last_of_month(end_date))
+        except (ValueError, IndexError, AttributeError, DjangoValidationError):
+            return Response(
+                {"error": "start_date and end_date must be YYYY-MM or YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if book_ids is not None:
+            queryset = queryset.filter(sale__book_id__in=book_ids)
+        if author_ids is not None:
+            queryset = queryset.filter(author_id__in=author_ids)
+
+        filters = {
+            k: v for k, v in
+            (("start_date", start_date), ("end_date", end_date), ("book_ids", book_ids), ("author_ids", author_ids))
+            if v
+        }
+        by_author, batch = run_payout(queryset, filters=filters, user=request.user)
+        return Response(payout_summary(by_author, batch), status=status.HTTP_200_OK)
+
+
+def _paid_at_bounds(start_date, end_date):
+    """Whole-month [start, end) datetimes for filtering PaymentLine.paid_at (index friendly)."""
+    tz = timezone.get_current_timezone()
+    start = end = None
+    if start_date:
+        start = datetime.combine(date.fromisoformat(first_of_month(start_date)), time.min, tz)
+    if end_date:
+        end = datetime.combine(date.fromisoformat(last_of_month(end_date)) + timedelta(days=1), time.min, tz)
+    return start, end
+
+
+class AuthorPaymentHistoryView(APIView):
+    """
+    Payment history for one author from the ledger, newest payout first, paginated by payout:
+    {
+      author_id, paid_total, unpaid_balance, count, page, page_size, total_pages,
+      results: [
+        { batch_id, paid_at, source, line_count, total_amount,
+          lines: [ { sale_id, author_sale_id, amount, sale_date, book_id, book_title } ] }
+      ]
+    }
+    Optional start_date / end_date (YYYY-MM or YYYY-MM-DD) filter on the payout month.
+    paid_total covers the filtered range; unpaid_balance is the author's current unpaid royalties.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, author_id):
+        get_object_or_404(Author, id=author_id)
+
+        page = int(request.query_params.get("page", 1))
+        page_size = int(request.query_params.get("page_size", 20))
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), 100)
+
+        try:
+            start, end = _paid_at_bounds(
+                request.query_params.get("start_date"), request.query_params.get("end_date")
+            )
+        except (ValueError, IndexError):
+            return Response(
+                {"error": "start_date and end_date must be YYYY-MM or YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # (author_id, paid_at) index
+        lines_qs = PaymentLine.objects.filter(author_id=author_id)
+        if start:
+            lines_qs = lines_qs.filter(paid_at__gte=start)
+        if end:
+            lines_qs = lines_qs.filter(paid_at__lt=end)
+
+        batches = (
+            lines_qs
+            .values("batch_id", "paid_at", "batch__source")
+            .annotate(line_count=Count("id"), total_amount=Sum("amount"))
+            .order_by("-paid_at", "-batch_id")
+        )
+
+        totals = lines_qs.aggregate(payouts=Count("batch_id", distinct=True), paid_total=Sum("amount"))
+        total = totals["payouts"]
+        start_index = (page - 1) * page_size
+        page_batches = list(batches[start_index:start_index + page_size])
+
+        lines_by_batch = {b["batch_id"]: [] for b in page_batches}
+        page_lines = (
+            lines_qs
+            .filter(batch_id__in=list(lines_by_batch))
+            .select_related("sale__book")
+            .order_by("sale_id", "id")
+        )
+        for line in page_lines:
+            sale = line.sale
+            lines_by_batch[line.batch_id].append(
+                {
+                    "sale_id": line.sale_id,
+                    "author_sale_id": line.author_sale_id,
+                    "amount": _money(line.amount),
+                    # the sale may have been deleted since it was paid
+                    "sale_date": sale.date if sale else None,
+                    "book_id": sale.book_id if sale else None,
+                    "book_title": sale.book.title if sale else None,
+                }
+            )
+
+        unpaid_balance = (
+            AuthorBalance.objects.filter(author_id=author_id).values_list("unpaid_total", flat=True).first()
+        )
+
+        return Response(
+            {
+                "author_id": int(author_id),
+                "paid_total": _money(totals["paid_total"]),
+                "unpaid_balance": _money(unpaid_balance),
+                "count": total,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": max(1, ceil(total / page_size)),
+                "results": [
+                    {
+                        "batch_id": b["batch_id"],
+                        "paid_at": b["paid_at"],
+                        "source": b["batch__source"],
+                        "line_count": b["line_count"],
+                        "total_amount": _money(b["total_amount"]),
+                        "lines": lines_by_batch[b["batch_id"]],
+                    }
+                    for b in page_batches
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
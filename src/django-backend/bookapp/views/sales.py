@@ -3,14 +3,30 @@
 #    rebuild AuthorSale rows from the *new* book's AuthorBook rows.
 #    Everything else is unchanged.
 
+from adrf.views import APIView as AsyncAPIView
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.core.exceptions import ValidationError as DjangoValidationError
 
-from ..models import Sale, Book, AuthorSale, AuthorBook, Author
+from ..models import Sale, Book, AuthorSale, AuthorBook, Author, PaymentBatch
 from ..serializers.sales import SaleSerializer, SaleCreateSerializer
+from ..services.sales_bulk import (
+    create_sales_bulk,
+    edit_sales_bulk,
+    delete_sales_chunked,
+    preview_sale_deletion,
+    serialize_sales,
+    load_sale_context,
+    referenced_book_ids,
+)
+from ..services.idempotency import idempotent
+from ..services.balances import delete_author_sales
+from ..services.payments import pay_royalties
+from ..services.versioning import VersionConflict, parse_version
 
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -30,130 +46,210 @@ from django.db.models import (
 from django.db.models.functions import Coalesce
 
 from ..config.sort_config import SALES_SORT_FIELD_MAP, SALES_DEFAULT_SORT
-from ..utils import get_first_author_name_subquery
+from ..utils import get_first_author_name_subquery, first_of_month, last_of_month
 
 from math import ceil
 
 
+def filter_sales(queryset, params):
+    """
+    Apply the sale list filters (book_id, start_date, end_date) from ``params``.
+    Shared by sale/get_all and sale/bulk_delete so both select exactly the same rows.
+    Raises ValueError/IndexError for malformed dates.
+    """
+    book_id = params.get("book_id")
+
+    if book_id:
+        queryset = queryset.filter(book_id=book_id)
+
+    # Date filtering at month/year granularity
+    # Sales are stored by month, so we normalize filter dates to include the whole month
+    start_date = params.get("start_date")
+    end_date = params.get("end_date")
+
+    if start_date:
+        queryset = queryset.filter(date__gte=first_of_month(start_date))
+
+    if end_date:
+        queryset = queryset.filter(date__lte=last_of_month(end_date))
+
+    return queryset
+
+
+SALE_DETAIL_QUERYSET = Sale.objects.select_related("book").prefetch_related("author_sales__author")
+
+
+def sale_list_query(params):
+    """
+    Parse the sale/get_all params. Returns (queryset, page, page_size, show_all); shared by
+    the sync view and its async twin so both list exactly the same sales.
+    """
+    queryset = Sale.objects.all()
+    queryset = queryset.select_related("book").prefetch_related("author_sales__author")
+    queryset = filter_sales(queryset, params)
+
+    # annotate with computed fields for sorting
+    queryset = queryset.annotate(
+        first_author_name=get_first_author_name_subquery("book"),
+        total_royalties=Sum("author_sales__royalty_amount"),
+        unpaid_count=Count(
+            Case(
+                When(author_sales__author_paid=False, then=1),
+                output_field=IntegerField(),
+            )
+        ),
+        paid_count=Count(
+            Case(
+                When(author_sales__author_paid=True, then=1),
+                output_field=IntegerField(),
+            )
+        ),
+        total_author_count=Count("author_sales"),
+        paid_status_order=Case(
+            When(unpaid_count=0, total_author_count__gt=0, then=Value(0)),
+            When(paid_count__gt=0, unpaid_count__gt=0, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        ),
+    )
+
+    # server-side ordering
+    ordering = params.get("ordering", SALES_DEFAULT_SORT)
+    is_desc = ordering.startswith("-")
+    field = ordering[1:] if is_desc else ordering
+
+    if field in SALES_SORT_FIELD_MAP:
+        order_field = ("-" if is_desc else "") + SALES_SORT_FIELD_MAP[field]
+        queryset = queryset.order_by(order_field)
+    else:
+        queryset = queryset.order_by("-date")
+
+    # show-all support
+    show_all = params.get("all") in ("1", "true", "True", "yes")
+    if show_all:
+        return queryset, 1, None, True
+
+    # pagination params
+    page = int(params.get("page", 1))
+    page_size = int(params.get("page_size", 50))
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 100)
+    return queryset, page, page_size, False
+
+
+def sale_page(queryset, page, page_size, show_all):
+    if show_all:
+        return queryset
+    start = (page - 1) * page_size
+    return queryset[start:start + page_size]
+
+
+def sale_list_payload(total, sales, page, page_size, show_all):
+    serializer = SaleSerializer(sales, many=True)
+    if show_all:
+        return {
+            "count": total,
+            "page": 1,
+            "page_size": total,
+            "total_pages": 1,
+            "results": serializer.data,
+        }
+
+    # ✅ FIX: never return total_pages = 0 (frontend assumes 1-based pages)
+    total_pages = max(1, ceil(total / page_size))  # total=0 => 1
+
+    return {
+        "count": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "results": serializer.data,
+    }
+
+
 class SaleGetView(APIView):
     def get(self, request, sale_id=None):
         # If sale_id is provided, return a single sale
         if sale_id is not None:
-            sale = get_object_or_404(
-                Sale.objects.select_related("book").prefetch_related("author_sales__author"),
-                id=sale_id,
-            )
+            sale = get_object_or_404(SALE_DETAIL_QUERYSET, id=sale_id)
             serializer = SaleSerializer(sale)
             return Response(serializer.data)
 
-        book_id = request.query_params.get("book_id")
-        user_id = request.query_params.get("user_id")
+        queryset, page, page_size, show_all = sale_list_query(request.query_params)
+        total = queryset.count()
+        sales = sale_page(queryset, page, page_size, show_all)
+        return Response(sale_list_payload(total, sales, page, page_size, show_all))
 
-        queryset = Sale.objects.all()
-        queryset = queryset.select_related("book").prefetch_related("author_sales__author")
-
-        if book_id:
-            queryset = queryset.filter(book_id=book_id)
-
-        # ✅ keep functional user scoping
-        if user_id:
-            queryset = queryset.filter(book__publisher_user_id=user_id)
-
-        # Date filtering at month/year granularity
-        # Sales are stored by month, so we normalize filter dates to include the whole month
-        start_date = request.query_params.get("start_date")
-        end_date = request.query_params.get("end_date")
-
-        if start_date:
-            parts = start_date.split("-")
-            first_of_month = f"{parts[0]}-{parts[1]}-01"
-            queryset = queryset.filter(date__gte=first_of_month)
-
-        if end_date:
-            import calendar
-
-            parts = end_date.split("-")
-            year, month = int(parts[0]), int(parts[1])
-            last_day = calendar.monthrange(year, month)[1]
-            last_of_month = f"{year}-{month:02d}-{last_day:02d}"
-            queryset = queryset.filter(date__lte=last_of_month)
-
-        # annotate with computed fields for sorting
-        queryset = queryset.annotate(
-            first_author_name=get_first_author_name_subquery("book"),
-            total_royalties=Sum("author_sales__royalty_amount"),
-            unpaid_count=Count(
+
+class AsyncSaleGetView(AsyncAPIView, SaleGetView):
+    """sale/get_all and sale/<id>/get for ASGI (same queries and payloads, awaited)."""
+
+    async def get(self, request, sale_id=None):
+        if sale_id is not None:
+            sale = await SALE_DETAIL_QUERYSET.filter(id=sale_id).afirst()
+            if sale is None:
+                raise Http404("No Sale matches the given query.")
+            return Response(SaleSerializer(sale).data)
+
+        queryset, page, page_size, show_all = sale_list_query(request.query_params)
+        total = await queryset.acount()
+        sales = [sale async for sale in sale_page(queryset, page, page_size, show_all)]
+        return Response(sale_list_payload(total, sales, page, page_size, show_all))
+
+
+def _publisher_revenue_total():
+    return Coalesce(
+        Sum("publisher_revenue"),
+        Value(0),
+        output_field=DecimalField(),
+    )
+
+
+def _royalty_total_aggregates():
+    """
+    Royalty sums over AuthorSale rows (total / paid / unpaid).
+    Shared by the single-book and batched totals endpoints so the math stays identical.
+    """
+    return {
+        "total_royalties": Coalesce(
+            Sum("royalty_amount"),
+            Value(0),
+            output_field=DecimalField(),
+        ),
+        "paid_royalties": Coalesce(
+            Sum(
                 Case(
-                    When(author_sales__author_paid=False, then=1),
-                    output_field=IntegerField(),
+                    When(author_paid=True, then="royalty_amount"),
+                    default=Value(0),
+                    output_field=DecimalField(),
                 )
             ),
-            paid_count=Count(
+            Value(0),
+            output_field=DecimalField(),
+        ),
+        "unpaid_royalties": Coalesce(
+            Sum(
                 Case(
-                    When(author_sales__author_paid=True, then=1),
-                    output_field=IntegerField(),
+                    When(author_paid=False, then="royalty_amount"),
+                    default=Value(0),
+                    output_field=DecimalField(),
                 )
             ),
-            total_author_count=Count("author_sales"),
-            paid_status_order=Case(
-                When(unpaid_count=0, total_author_count__gt=0, then=Value(0)),
-                When(paid_count__gt=0, unpaid_count__gt=0, then=Value(1)),
-                default=Value(2),
-                output_field=IntegerField(),
-            ),
-        )
+            Value(0),
+            output_field=DecimalField(),
+        ),
+    }
 
-        # server-side ordering
-        ordering = request.query_params.get("ordering", SALES_DEFAULT_SORT)
-        is_desc = ordering.startswith("-")
-        field = ordering[1:] if is_desc else ordering
-
-        if field in SALES_SORT_FIELD_MAP:
-            order_field = ("-" if is_desc else "") + SALES_SORT_FIELD_MAP[field]
-            queryset = queryset.order_by(order_field)
-        else:
-            queryset = queryset.order_by("-date")
-
-        # show-all support
-        show_all = request.query_params.get("all") in ("1", "true", "True", "yes")
-        if show_all:
-            total = queryset.count()
-            serializer = SaleSerializer(queryset, many=True)
-            return Response(
-                {
-                    "count": total,
-                    "page": 1,
-                    "page_size": total,
-                    "total_pages": 1,
-                    "results": serializer.data,
-                }
-            )
 
-        # pagination params
-        page = int(request.query_params.get("page", 1))
-        page_size = int(request.query_params.get("page_size", 50))
-        page = max(page, 1)
-        page_size = min(max(page_size, 1), 100)
-
-        total = queryset.count()
-        start = (page - 1) * page_size
-        end = start + page_size
-        page_qs = queryset[start:end]
-
-        serializer = SaleSerializer(page_qs, many=True)
-
-        # ✅ FIX: never return total_pages = 0 (frontend assumes 1-based pages)
-        total_pages = max(1, ceil(total / page_size))  # total=0 => 1
-
-        return Response(
-            {
-                "count": total,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": total_pages,
-                "results": serializer.data,
-            }
-        )
+def book_totals_payload(book_id, publisher_revenue, royalties):
+    zero = Decimal("0")
+    return {
+        "book_id": book_id,
+        "publisher_revenue": str(publisher_revenue),
+        "total_royalties": str(royalties.get("total_royalties", zero)),
+        "paid_royalties": str(royalties.get("paid_royalties", zero)),
+        "unpaid_royalties": str(royalties.get("unpaid_royalties", zero)),
+    }
 
 
 # ✅ totals endpoint for a single book (for BookDetailPage summary cards)
@@ -161,65 +257,126 @@ class BookSalesTotalsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, book_id):
-        from ..models import AuthorSale
-        
         # ✅ FIX: Calculate publisher_revenue separately to avoid duplication
         # When we join Sale with author_sales, publisher_revenue gets duplicated
         # for each author on the sale. So we calculate it in a separate query.
         publisher_revenue = Sale.objects.filter(book_id=book_id).aggregate(
-            total=Coalesce(
-                Sum("publisher_revenue"),
-                Value(0),
-                output_field=DecimalField(),
-            )
+            total=_publisher_revenue_total()
         )["total"]
 
         # Calculate royalty totals from AuthorSale directly (no join duplication)
         royalty_totals = AuthorSale.objects.filter(sale__book_id=book_id).aggregate(
-            total_royalties=Coalesce(
-                Sum("royalty_amount"),
-                Value(0),
-                output_field=DecimalField(),
-            ),
-            paid_royalties=Coalesce(
-                Sum(
-                    Case(
-                        When(author_paid=True, then="royalty_amount"),
-                        default=Value(0),
-                        output_field=DecimalField(),
-                    )
-                ),
-                Value(0),
-                output_field=DecimalField(),
-            ),
-            unpaid_royalties=Coalesce(
-                Sum(
-                    Case(
-                        When(author_paid=False, then="royalty_amount"),
-                        default=Value(0),
-                        output_field=DecimalField(),
-                    )
-                ),
-                Value(0),
-                output_field=DecimalField(),
-            ),
+            **_royalty_total_aggregates()
         )
 
-        return Response(
-            {
-                "book_id": book_id,
-                "publisher_revenue": str(publisher_revenue),
-                "total_royalties": str(royalty_totals["total_royalties"]),
-                "paid_royalties": str(royalty_totals["paid_royalties"]),
-                "unpaid_royalties": str(royalty_totals["unpaid_royalties"]),
-            },
-            status=status.HTTP_200_OK,
+        return Response(book_totals_payload(book_id, publisher_revenue, royalty_totals), status=status.HTTP_200_OK)
+
+
+class AsyncBookSalesTotalsView(AsyncAPIView, BookSalesTotalsView):
+    async def get(self, request, book_id):
+        publisher_revenue = (
+            await Sale.objects.filter(book_id=book_id).aaggregate(total=_publisher_revenue_total())
+        )["total"]
+        royalty_totals = await AuthorSale.objects.filter(sale__book_id=book_id).aaggregate(
+            **_royalty_total_aggregates()
         )
+        return Response(book_totals_payload(book_id, publisher_revenue, royalty_totals), status=status.HTTP_200_OK)
+
+
+BOOK_TOTALS_MAX_IDS = 500
+
+
+def parse_book_ids(raw_ids):
+    """Validated, de-duplicated ids for sale/books/totals; ValueError carries the 400 message."""
+    try:
+        book_ids = [int(part) for part in raw_ids.split(",") if part.strip()]
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of integers.") from None
+
+    if not book_ids:
+        raise ValueError("ids is required.")
+
+    # de-duplicate while keeping the caller's order
+    book_ids = list(dict.fromkeys(book_ids))
+    if len(book_ids) > BOOK_TOTALS_MAX_IDS:
+        raise ValueError(f"At most {BOOK_TOTALS_MAX_IDS} ids can be requested at once.")
+    return book_ids
+
+
+def book_revenue_totals(book_ids):
+    # Publisher revenue is grouped over Sale only (same duplication guard as the single-book view)
+    return (
+        Sale.objects
+        .filter(book_id__in=book_ids)
+        .values("book_id")
+        .annotate(total=_publisher_revenue_total())
+        .order_by()
+        .values_list("book_id", "total")
+    )
+
+
+def book_royalty_totals(book_ids):
+    return (
+        AuthorSale.objects
+        .filter(sale__book_id__in=book_ids)
+        .values("sale__book_id")
+        .annotate(**_royalty_total_aggregates())
+        .order_by()
+    )
+
+
+def batch_totals_results(book_ids, revenue_by_book, royalties_by_book):
+    zero = Decimal("0")
+    return [
+        book_totals_payload(book_id, revenue_by_book.get(book_id, zero), royalties_by_book.get(book_id, {}))
+        for book_id in book_ids
+    ]
+
+
+# ✅ batched totals for many books (for list pages with revenue/royalty columns)
+class BookSalesTotalsBatchView(APIView):
+    """
+    GET sale/books/totals?ids=1,2,3
+
+    Same numbers as BookSalesTotalsView, for up to BOOK_TOTALS_MAX_IDS books,
+    computed with two GROUP BY queries (one over Sale, one over AuthorSale).
+    Results keep the order of ``ids``; books without sales report zeros.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            book_ids = parse_book_ids(request.query_params.get("ids", ""))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        revenue_by_book = dict(book_revenue_totals(book_ids))
+        royalties_by_book = {row["sale__book_id"]: row for row in book_royalty_totals(book_ids)}
+        results = batch_totals_results(book_ids, revenue_by_book, royalties_by_book)
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class AsyncBookSalesTotalsBatchView(AsyncAPIView, BookSalesTotalsBatchView):
+    async def get(self, request):
+        try:
+            book_ids = parse_book_ids(request.query_params.get("ids", ""))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        revenue_by_book = {book_id: total async for book_id, total in book_revenue_totals(book_ids)}
+        royalties_by_book = {row["sale__book_id"]: row async for row in book_royalty_totals(book_ids)}
+        results = batch_totals_results(book_ids, revenue_by_book, royalties_by_book)
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
 
 
 class SaleCreateView(APIView):
+    @idempotent("sale/create")
     def post(self, request):
-        serializer = SaleCreateSerializer(data=request.data)
+        # book, rates and author names in one query; validation and allocation reuse them
+        context = load_sale_context(referenced_book_ids([request.data]))
+        serializer = SaleCreateSerializer(data=request.data, context=context)
         if serializer.is_valid():
             with transaction.atomic():
                 sale = serializer.save()
@@ -230,29 +387,23 @@ class SaleCreateView(APIView):
 
 
 class SaleCreateManyView(APIView):
+    """
+    All-or-nothing batch create. Rows are validated in memory against books/rates preloaded
+    in one query (same messages as sale/create), then bulk inserted in chunks.
+
+    Send an Idempotency-Key header to make retries safe: a repeated key replays the
+    stored response instead of inserting the batch again.
+    """
+    @idempotent("sale/createmany")
     def post(self, request):
         if not isinstance(request.data, list):
             return Response({"error": "Expected a list of sales"}, status=status.HTTP_400_BAD_REQUEST)
 
-        created_sales = []
-        errors = []
+        sale_ids, errors = create_sales_bulk(request.data)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
-        with transaction.atomic():
-            for index, sale_data in enumerate(request.data):
-                serializer = SaleCreateSerializer(data=sale_data)
-                if serializer.is_valid():
-                    sale = serializer.save()
-                    created_sales.append(sale)
-                else:
-                    print(f"Validation Error at index {index}: {serializer.errors}")
-                    errors.append({"index": index, "errors": serializer.errors})
-
-            if errors:
-                transaction.set_rollback(True)
-                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
-
-        full_serializer = SaleSerializer(created_sales, many=True)
-        return Response(full_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serialize_sales(sale_ids), status=status.HTTP_201_CREATED)
 
 
 class SaleEditView(APIView):
@@ -276,50 +427,138 @@ class SaleEditView(APIView):
         incoming_author_royalties = data.get("author_royalties") or {}
         incoming_author_paid = data.get("author_paid") or {}
 
-        serializer = SaleCreateSerializer(sale, data=data, partial=partial)
+        # ✅ optimistic concurrency: the versions the client loaded (optional; when omitted the
+        #    versions read by this request are checked, which still closes the read/write window)
+        try:
+            expected_version = parse_version(request.data.get("version"))
+            author_versions = {
+                str(k): parse_version(v) for k, v in (request.data.get("author_versions") or {}).items()
+            }
+            author_versions = {k: v for k, v in author_versions.items() if v is not None}
+        except (ValueError, AttributeError):
+            return Response(
+                {"error": "version and author_versions values must be positive integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        context = load_sale_context(referenced_book_ids([data]))
+        context.update(expected_version=expected_version, author_versions=author_versions)
+        serializer = SaleCreateSerializer(sale, data=data, partial=partial, context=context)
         if serializer.is_valid():
-            with transaction.atomic():
-                # ✅ IMPORTANT: do NOT delete author_sales on edit (historical snapshot)
-                #    ...EXCEPT when the sale's *book* itself changes: then rebuild AuthorSale rows for the new book.
-                updated_sale = serializer.save()
-
-                # ✅ ONLY NEW BEHAVIOR:
-                # If the user changed the sale's associated book, reset author_sales
-                # to match the current AuthorBook rows for the newly selected book.
-                if updated_sale.book_id != old_book_id:
-                    # Remove old author allocations (they belong to the previous book)
-                    AuthorSale.objects.filter(sale=updated_sale).delete()
-
-                    # Recreate allocations using the new book's current author set
-                    author_books = AuthorBook.objects.select_related("author").filter(book=updated_sale.book)
-
-                    for ab in author_books:
-                        key = str(ab.author_id)
-
-                        # Override royalty if provided; otherwise compute from current revenue snapshot
-                        if key in incoming_author_royalties:
-                            royalty_amount = incoming_author_royalties[key]
-                        else:
-                            royalty_amount = updated_sale.publisher_revenue * ab.royalty_rate
-
-                        author_paid = bool(incoming_author_paid.get(key, False))
-
-                        AuthorSale.objects.create(
-                            sale=updated_sale,
-                            author=ab.author,
-                            royalty_amount=royalty_amount,
-                            author_paid=author_paid,
-                        )
+            try:
+                updated_sale = self._save(serializer, old_book_id, incoming_author_royalties, incoming_author_paid)
+            except VersionConflict as exc:
+                current = Sale.objects.filter(id=sale.id).values_list("version", flat=True).first()
+                return Response(
+                    {"error": str(exc), "current_version": current},
+                    status=status.HTTP_409_CONFLICT,
+                )
 
             full_serializer = SaleSerializer(updated_sale)
             return Response(full_serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def _save(self, serializer, old_book_id, incoming_author_royalties, incoming_author_paid):
+        with transaction.atomic():
+            # ✅ IMPORTANT: do NOT delete author_sales on edit (historical snapshot)
+            #    ...EXCEPT when the sale's *book* itself changes: then rebuild AuthorSale rows for the new book.
+            updated_sale = serializer.save()
+
+            # ✅ ONLY NEW BEHAVIOR:
+            # If the user changed the sale's associated book, reset author_sales
+            # to match the current AuthorBook rows for the newly selected book.
+            if updated_sale.book_id != old_book_id:
+                # Remove old author allocations (they belong to the previous book)
+                delete_author_sales(AuthorSale.objects.filter(sale=updated_sale))
+
+                # Recreate allocations using the new book's current author set
+                # (overrides from the request still win over the computed amounts)
+                updated_sale.create_author_sales(
+                    incoming_author_royalties,
+                    incoming_author_paid,
+                    rates=serializer.context_rates(updated_sale.book_id),
+                )
+
+        return updated_sale
+
+
+class SaleBulkEditView(APIView):
+    """
+    Partial edits for many sales: [{"id": <sale id>, <any sale/{id}/edit fields>}, ...].
+    Omitted fields keep their current values; author_royalties/author_paid overrides and the
+    optional version/author_versions checks behave as in sale/{id}/edit (409 on conflict).
+    All-or-nothing: errors use the createmany shape and nothing is written.
+    Returns the edited sales in id order.
+    """
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response({"error": "Expected a list of sale updates"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            sale_ids, errors = edit_sales_bulk(request.data)
+        except VersionConflict as exc:
+            return Response({"error": str(exc), "conflicts": exc.pks}, status=status.HTTP_409_CONFLICT)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(serialize_sales(sale_ids), status=status.HTTP_200_OK)
+
+
+class SaleBulkDeleteView(APIView):
+    """
+    Delete many sales (and their AuthorSales) selected by explicit ``ids`` and/or the
+    sale/get_all filters (book_id, start_date, end_date), given in the JSON body.
+    ``"dry_run": true`` returns a preview of what would be removed instead.
+    """
+    def post(self, request):
+        data = request.data
+        if not isinstance(data, dict):
+            return Response({"error": "Expected an object"}, status=status.HTTP_400_BAD_REQUEST)
+
+        filter_keys = ("book_id", "start_date", "end_date")
+        # an unknown filter must not be silently dropped: the delete would select more rows
+        unknown = sorted(set(data) - {"ids", "dry_run", *filter_keys})
+        if unknown:
+            return Response(
+                {"error": f"Unsupported field(s): {', '.join(unknown)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        ids = data.get("ids")
+        if ids is None and not any(data.get(k) for k in filter_keys):
+            return Response(
+                {"error": "Provide ids or at least one of book_id, start_date, end_date."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = Sale.objects.all()
+        if ids is not None:
+            if not isinstance(ids, list) or any(isinstance(i, bool) or not isinstance(i, int) for i in ids):
+                return Response({"error": "ids must be a list of integers."}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(id__in=ids)
+
+        try:
+            queryset = filter_sales(queryset, {k: data.get(k) for k in filter_keys})
+        except (ValueError, IndexError, AttributeError, TypeError, DjangoValidationError):
+            return Response(
+                {"error": "book_id must be an integer; start_date and end_date must be YYYY-MM or YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if data.get("dry_run") in (True, "true", "1"):
+            return Response({"dry_run": True, **preview_sale_deletion(queryset)}, status=status.HTTP_200_OK)
+
+        deleted_sales, deleted_author_sales = delete_sales_chunked(queryset)
+        return Response(
+            {"deleted_sales": deleted_sales, "deleted_author_sales": deleted_author_sales},
+            status=status.HTTP_200_OK,
+        )
+
 
 class SaleDeleteView(APIView):
     def delete(self, request, sale_id):
         sale = get_object_or_404(Sale, id=sale_id)
         with transaction.atomic():
+            delete_author_sales(sale.author_sales.all())
             sale.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -328,21 +567,23 @@ class SalePayAuthorsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, sale_id):
-        sale = get_object_or_404(Sale, id=sale_id)
-
-        with transaction.atomic():
-            qs = (
-                AuthorSale.objects.select_for_update()
-                .filter(sale_id=sale.id, author_paid=False)
-            )
+        # One UPDATE ... RETURNING (see AuthorPayUnpaidSalesView)
+        rows, _ = pay_royalties(
+            "sale_id = %s",
+            [sale_id],
+            source=PaymentBatch.SOURCE_SALE,
+            filters={"sale_id": int(sale_id)},
+            user=request.user,
+        )
+        if not rows:
+            get_object_or_404(Sale, id=sale_id)
 
-            total_to_pay = qs.aggregate(total=Sum("royalty_amount")).get("total") or Decimal("0.00")
-            updated_count = qs.update(author_paid=True)
+        total_to_pay = sum((amount for _, _, _, amount in rows), Decimal("0.00"))
 
         return Response(
             {
-                "sale_id": sale.id,
-                "authors_marked_paid": updated_count,
+                "sale_id": int(sale_id),
+                "authors_marked_paid": len(rows),
                 "total_royalties_paid": str(total_to_pay),
             },
             status=status.HTTP_200_OK,
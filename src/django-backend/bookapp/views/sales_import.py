@@ -0,0 +1,71 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import SaleImportJob
+from ..serializers.sales_import import SaleImportJobSerializer
+from ..services.sales_csv import SaleCsvImportError, import_sales_csv
+
+
+class SaleImportCreateView(APIView):
+    """
+    POST sale/import (multipart, field "file": JSON list of sales, same shape as sale/createmany,
+                      a .ndjson/.jsonl file with one such sale per line,
+                      or a .csv file as accepted by sale/createmany/csv)
+
+    Stores the upload and queues a SaleImportJob for `manage.py run_sale_import_worker`.
+    Returns 202 with the job; poll sale/import/<job_id> for progress.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Expected a file upload in field 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = SaleImportJob.objects.create(upload=upload, created_by=request.user)
+        return Response(SaleImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class SaleImportJobView(APIView):
+    """GET sale/import/<job_id>: status, progress counters, per-row errors and final counts."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(SaleImportJob, id=job_id)
+        return Response(SaleImportJobSerializer(job).data)
+
+
+class SaleCsvCreateManyView(APIView):
+    """
+    POST sale/createmany/csv (multipart, field "file": CSV with book, date, quantity, publisher_revenue)
+
+    Synchronous CSV counterpart of sale/createmany: the upload is streamed through COPY into a
+    staging table and validated/inserted with set-based SQL. All-or-nothing.
+    Add ?dry_run=true to validate without writing.
+    Returns counts (not the created rows) so large files stay cheap to answer.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Expected a file upload in field 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = request.query_params.get("dry_run") in ("1", "true", "True", "yes")
+
+        try:
+            with upload.open("rb") as fh:
+                result = import_sales_csv(fh, dry_run=dry_run)
+        except SaleCsvImportError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if result["error_count"]:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
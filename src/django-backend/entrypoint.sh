@@ -3,6 +3,7 @@ set -e
 
 echo "Running migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 echo "Creating superuser if needed..."
 python manage.py shell -c "
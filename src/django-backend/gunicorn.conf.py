@@ -0,0 +1,73 @@
+"""
+Gunicorn configuration (production). Loaded automatically when gunicorn starts in this
+directory, or explicitly with ``gunicorn -c gunicorn.conf.py``.
+
+Worker model, GUNICORN_WORKER_CLASS:
+  gthread  (default) WSGI, GUNICORN_THREADS threads per worker process. A slow request
+           (all=true payments, CSV exports) holds one thread, not the whole worker.
+  sync     WSGI, one request per worker process (the previous behaviour).
+  uvicorn  ASGI (backend.asgi) on uvicorn workers; turns on the async read endpoints
+           (DJANGO_ASYNC_VIEWS) and, since persistent connections do not work under ASGI,
+           DB_POOL, unless they are set.
+
+Other settings (environment variables, defaults in brackets):
+  GUNICORN_BIND [0.0.0.0:8000]
+  GUNICORN_WORKERS [gthread/uvicorn: CPUs + 1, sync: 2 * CPUs + 1]
+  GUNICORN_THREADS [4]
+  GUNICORN_MAX_REQUESTS [1000], GUNICORN_MAX_REQUESTS_JITTER [100]: recycle each worker after
+      about that many requests, so slow leaks and fragmentation do not accumulate
+  GUNICORN_TIMEOUT [120]: a worker silent for longer is killed and replaced (for sync workers
+      this is the longest a request may run)
+  GUNICORN_GRACEFUL_TIMEOUT [30], GUNICORN_KEEPALIVE [5]
+  GUNICORN_PRELOAD [True]: import Django once in the master and fork workers from it
+"""
+
+import multiprocessing
+import os
+
+WORKER_CLASSES = {
+    "gthread": "gthread",
+    "sync": "sync",
+    "uvicorn": "uvicorn_worker.UvicornWorker",
+}
+
+_mode = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if _mode not in WORKER_CLASSES:
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, not {_mode!r}.")
+
+_cpus = multiprocessing.cpu_count()
+
+if _mode == "uvicorn":
+    wsgi_app = "backend.asgi:application"
+    # each worker keeps a pool instead of per-thread persistent connections
+    os.environ.setdefault("DB_POOL", "True")
+    os.environ.setdefault("DJANGO_ASYNC_VIEWS", "True")
+else:
+    wsgi_app = "backend.wsgi:application"
+
+worker_class = WORKER_CLASSES[_mode]
+workers = int(os.environ.get("GUNICORN_WORKERS", 2 * _cpus + 1 if _mode == "sync" else _cpus + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", "4")) if _mode == "gthread" else 1
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+# heartbeat files on tmpfs: a slow container disk cannot make healthy workers look hung
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # with preload_app the master imported Django; never let workers share its connections
+    from django.db import connections
+
+    connections.close_all()
@@ -16,8 +16,14 @@ export function getBooks(queryParams = "") {
 }
 
 // AUTHORS
-export function listAuthors() {
-  return apiFetch("/api/authors/");
+/**
+ * GET /api/authors/?q=&limit=&fields=id,name
+ * Backend returns: { results: [{ id, name }], next_cursor }
+ */
+export function searchAuthors(q = "", limit = 20) {
+  const params = new URLSearchParams({ limit: String(limit), fields: "id,name" });
+  if (q) params.set("q", q);
+  return apiFetch(`/api/authors/?${params.toString()}`);
 }
 
 export function createAuthor(name) {
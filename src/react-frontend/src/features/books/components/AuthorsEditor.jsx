@@ -65,7 +65,9 @@ export function AuthorsEditor({
             })
             .slice(0, 20);
 
-          const showDropdown = openAuthorIdx === idx && !authorsLoading;
+          // authorOptions come from a backend search for the focused row; earlier results
+          // stay visible (filtered locally) while the next search runs
+          const showDropdown = openAuthorIdx === idx;
 
           return (
             <div key={idx} className="flex flex-col gap-2 sm:flex-row sm:items-center">
@@ -94,6 +96,8 @@ export function AuthorsEditor({
                       <div className="px-3 py-2 text-sm text-slate-500">
                         Start typing to search authors…
                       </div>
+                    ) : suggestions.length === 0 && authorsLoading ? (
+                      <div className="px-3 py-2 text-sm text-slate-500">Searching authors…</div>
                     ) : suggestions.length === 0 ? (
                       <div className="px-3 py-2 text-sm text-slate-500">
                         No matches — will create “{typed}” on save
@@ -0,0 +1,39 @@
+// src/features/books/hooks/useAuthorSearch.js
+import { useEffect, useState } from "react";
+import { searchAuthors } from "../api/booksApi";
+
+/**
+ * Author suggestions for the author pickers, searched on the backend
+ * (authors/?q=) instead of downloading every author up front.
+ * Debounced so typing sends one request per pause, not per keystroke.
+ */
+export function useAuthorSearch(query, { limit = 20, delay = 200 } = {}) {
+  const [options, setOptions] = useState([]);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    const q = (query || "").trim();
+
+    const timer = setTimeout(async () => {
+      setLoading(true);
+      setError(null);
+      try {
+        const data = await searchAuthors(q, limit);
+        if (!cancelled) setOptions(data?.results ?? []);
+      } catch (e) {
+        if (!cancelled) setError(e);
+      } finally {
+        if (!cancelled) setLoading(false);
+      }
+    }, delay);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query, limit, delay]);
+
+  return { options, loading, error };
+}
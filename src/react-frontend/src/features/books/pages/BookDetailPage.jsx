@@ -8,6 +8,7 @@ import { errorMessage } from "../../../shared/utils/errors";
 import * as booksApi from "../api/booksApi";
 import { DeleteBookDialog } from "../components/DeleteBookDialog";
 import { AuthorsEditor } from "../components/AuthorsEditor";
+import { useAuthorSearch } from "../hooks/useAuthorSearch";
 import { useBookSales } from "../hooks/useBookSales";
 import BookSalesTable from "../components/BookSalesTable";
 import SaleEntryRow from "../../../shared/components/SaleEntryRow";
@@ -68,10 +69,12 @@ export default function BookDetailPage() {
   const [isbn10, setIsbn10] = useState("");
   const [authors, setAuthors] = useState([{ author_name: "", royalty_rate: "0.50" }]);
 
-  // authors list for dropdown
-  const [authorOptions, setAuthorOptions] = useState([]);
-  const [authorsLoading, setAuthorsLoading] = useState(true);
+  // author suggestions for the dropdown: backend search for the row being edited
   const [openAuthorIdx, setOpenAuthorIdx] = useState(null);
+  const activeAuthorQuery = openAuthorIdx === null ? "" : authors[openAuthorIdx]?.author_name ?? "";
+  const { options: authorOptions, loading: authorsLoading } = useAuthorSearch(
+    activeAuthorQuery.trim().replace(/\s+/g, " ")
+  );
 
   // ✅ paginated sales + show-all toggle
   const {
@@ -185,13 +188,9 @@ export default function BookDetailPage() {
     async function load() {
       setLoading(true);
       setErr(null);
-      setAuthorsLoading(true);
 
       try {
-        const [b, a] = await Promise.all([
-          booksApi.getBook(bookId),
-          booksApi.listAuthors().catch(() => []),
-        ]);
+        const b = await booksApi.getBook(bookId);
 
         if (cancelled) return;
 
@@ -211,12 +210,10 @@ export default function BookDetailPage() {
             : [{ author_name: "", royalty_rate: "0.50" }];
 
         setAuthors(initialAuthors);
-        setAuthorOptions(Array.isArray(a) ? a : []);
       } catch (e) {
         if (!cancelled) setErr(errorMessage(e));
       } finally {
         if (!cancelled) setLoading(false);
-        if (!cancelled) setAuthorsLoading(false);
       }
     }
 
@@ -286,14 +283,6 @@ export default function BookDetailPage() {
       setBook(updated);
       setEditing(false);
       resetFormToBook(updated);
-
-      // Optional: refresh dropdown suggestions (so newly created author names appear)
-      try {
-        const a = await booksApi.listAuthors();
-        setAuthorOptions(Array.isArray(a) ? a : []);
-      } catch {
-        // ignore
-      }
     } catch (e) {
       setErr(errorMessage(e));
     } finally {
@@ -1,11 +1,12 @@
 // src/features/books/pages/CreateBookPage.jsx
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useMemo, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { Card, CardContent, CardHeader } from "../../../shared/components/Card";
 import { Input } from "../../../shared/components/Input";
 import { Button } from "../../../shared/components/Button";
 import { errorMessage } from "../../../shared/utils/errors";
 import * as booksApi from "../api/booksApi";
+import { useAuthorSearch } from "../hooks/useAuthorSearch";
 
 function normalizeName(s) {
   return s.trim().replace(/\s+/g, " ");
@@ -20,18 +21,20 @@ export default function CreateBookPage() {
   const [isbn13, setIsbn13] = useState("");
   const [isbn10, setIsbn10] = useState("");
 
-  // --- Author options ---
-  // shape: [{id, name}]
-  const [authorOptions, setAuthorOptions] = useState([]);
-  const [authorsLoading, setAuthorsLoading] = useState(true);
-  const [authorsErr, setAuthorsErr] = useState(null);
-
   // --- Author rows (name + royalty) ---
   const [authors, setAuthors] = useState([{ author_name: "", royalty_rate: "0.50" }]);
 
   // Which author input dropdown is open (null = none)
   const [openAuthorIdx, setOpenAuthorIdx] = useState(null);
 
+  // --- Author options (searched on the backend for the row being edited) ---
+  // shape: [{id, name}]
+  const activeAuthorQuery = openAuthorIdx === null ? "" : authors[openAuthorIdx]?.author_name ?? "";
+  const { options: authorOptions, error: authorsSearchErr } = useAuthorSearch(
+    normalizeName(activeAuthorQuery)
+  );
+  const authorsErr = authorsSearchErr ? errorMessage(authorsSearchErr) : null;
+
   const [submitting, setSubmitting] = useState(false);
   const [err, setErr] = useState(null);
 
@@ -44,28 +47,6 @@ export default function CreateBookPage() {
     );
   }, [authors]);
 
-  useEffect(() => {
-    let cancelled = false;
-
-    async function load() {
-      setAuthorsLoading(true);
-      setAuthorsErr(null);
-      try {
-        const data = await booksApi.listAuthors();
-        if (!cancelled) setAuthorOptions(Array.isArray(data) ? data : []);
-      } catch (e) {
-        if (!cancelled) setAuthorsErr(errorMessage(e));
-      } finally {
-        if (!cancelled) setAuthorsLoading(false);
-      }
-    }
-
-    load();
-    return () => {
-      cancelled = true;
-    };
-  }, []);
-
   function updateAuthorRow(idx, patch) {
     setAuthors((prev) => prev.map((row, i) => (i === idx ? { ...row, ...patch } : row)));
   }
@@ -197,18 +178,16 @@ export default function CreateBookPage() {
                     const typed = normalizeName(row.author_name);
                     const typedKey = typed.toLowerCase();
 
-                    const matches = authorsLoading
-                      ? []
-                      : authorOptions
-                          .filter((a) => {
-                            const key = normalizeName(a.name).toLowerCase();
-                            const selectedElsewhere = selectedNames.has(key) && key !== typedKey;
-                            return !selectedElsewhere && (typedKey === "" || key.includes(typedKey));
-                          })
-                          .slice(0, 20);
+                    // previous results stay visible (filtered locally) while the next search runs
+                    const matches = authorOptions
+                      .filter((a) => {
+                        const key = normalizeName(a.name).toLowerCase();
+                        const selectedElsewhere = selectedNames.has(key) && key !== typedKey;
+                        return !selectedElsewhere && (typedKey === "" || key.includes(typedKey));
+                      })
+                      .slice(0, 20);
 
-                    const showDropdown =
-                      openAuthorIdx === idx && !authorsLoading && matches.length > 0;
+                    const showDropdown = openAuthorIdx === idx && matches.length > 0;
 
                     return (
                       <div key={idx} className="flex flex-col gap-2 sm:flex-row sm:items-center">
@@ -225,7 +204,7 @@ export default function CreateBookPage() {
                             onBlur={() => {
                               setTimeout(() => setOpenAuthorIdx(null), 120);
                             }}
-                            placeholder={authorsLoading ? "Loading authors..." : "Enter an author name..."}
+                            placeholder="Enter an author name..."
                             required
                           />
 
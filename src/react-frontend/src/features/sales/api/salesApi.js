@@ -37,3 +37,9 @@ export function getAuthorPaymentsGrouped(queryParams = "") {
   const qs = queryParams ? `?${queryParams}` : "";
   return apiFetch(`/api/author/payments/grouped${qs}`);
 }
+
+export function getAuthorPaymentRows(authorId, cursor, limit = 50) {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) params.set("cursor", cursor);
+  return apiFetch(`/api/author/${authorId}/payments/rows?${params.toString()}`);
+}
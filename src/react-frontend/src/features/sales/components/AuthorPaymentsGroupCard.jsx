@@ -1,7 +1,8 @@
-import React, { useState } from "react";
+import React, { useEffect, useState } from "react";
 import { Card, CardContent } from "../../../shared/components/Card";
 import { Button } from "../../../shared/components/Button";
 import AuthorPaymentsTable from "./AuthorPaymentsTable";
+import { getAuthorPaymentRows } from "../api/salesApi";
 
 function money(x) {
   const n = Number(x);
@@ -10,7 +11,31 @@ function money(x) {
 }
 
 export default function AuthorPaymentsGroupCard({ group, onMarkAllPaid, onGoBook, onGoSale }) {
-  const { author, rows, unpaidTotal, unpaidCount } = group;
+  const { author, unpaidTotal, unpaidCount } = group;
+
+  // The grouped endpoint only returns the newest rows; older ones are fetched on demand.
+  const [rows, setRows] = useState(group.rows);
+  const [rowsCursor, setRowsCursor] = useState(group.rows_cursor);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  useEffect(() => {
+    setRows(group.rows);
+    setRowsCursor(group.rows_cursor);
+  }, [group]);
+
+  const loadMoreRows = async () => {
+    if (!rowsCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await getAuthorPaymentRows(author.id, rowsCursor);
+      setRows((prev) => [...prev, ...(data?.rows ?? [])]);
+      setRowsCursor(data?.next_cursor ?? null);
+    } catch (e) {
+      console.error("Error loading more author payment rows:", e);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
   
   // Per-author pagination state
   const [page, setPage] = useState(1);
@@ -101,6 +126,14 @@ export default function AuthorPaymentsGroupCard({ group, onMarkAllPaid, onGoBook
               </div>
             </div>
           )}
+
+          {rowsCursor && (
+            <div className="mt-3 flex justify-center">
+              <Button variant="secondary" size="sm" onClick={loadMoreRows} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load older records"}
+              </Button>
+            </div>
+          )}
         </div>
       </CardContent>
     </Card>
@@ -15,6 +15,11 @@ export function useAuthorPayments() {
   // ✅ show-all toggle (only time we allow unbounded)
   const [showAll, setShowAll] = useState(false);
 
+  // server-side filters / sort
+  const [ordering, setOrdering] = useState("name");
+  const [unpaidOnly, setUnpaidOnly] = useState(false);
+  const [search, setSearch] = useState("");
+
   const [confirm, setConfirm] = useState({ open: false, author: null });
   const [paying, setPaying] = useState(false);
 
@@ -29,6 +34,9 @@ export function useAuthorPayments() {
         params.set("page", String(page));
         params.set("page_size", String(pageSize));
       }
+      params.set("ordering", ordering);
+      if (unpaidOnly) params.set("unpaid_only", "true");
+      if (search.trim()) params.set("q", search.trim());
 
       const data = await getAuthorPaymentsGrouped(params.toString());
 
@@ -48,13 +56,28 @@ export function useAuthorPayments() {
   useEffect(() => {
     fetchGroups();
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [page, pageSize, showAll]);
+  }, [page, pageSize, showAll, ordering, unpaidOnly, search]);
 
   const toggleShowAll = () => {
     setPage(1);
     setShowAll((prev) => !prev);
   };
 
+  const changeOrdering = (value) => {
+    setPage(1);
+    setOrdering(value);
+  };
+
+  const toggleUnpaidOnly = () => {
+    setPage(1);
+    setUnpaidOnly((prev) => !prev);
+  };
+
+  const changeSearch = (value) => {
+    setPage(1);
+    setSearch(value);
+  };
+
   const openConfirm = (author) => setConfirm({ open: true, author });
   const closeConfirm = () => {
     if (paying) return;
@@ -89,6 +112,13 @@ export function useAuthorPayments() {
     showAll,
     toggleShowAll,
 
+    ordering,
+    changeOrdering,
+    unpaidOnly,
+    toggleUnpaidOnly,
+    search,
+    changeSearch,
+
     refresh: fetchGroups,
 
     confirm,
@@ -2,6 +2,7 @@ import React from "react";
 import { useNavigate } from "react-router-dom";
 import { Button } from "../../../shared/components/Button";
 import { Card, CardContent } from "../../../shared/components/Card";
+import { Input } from "../../../shared/components/Input";
 import { Spinner } from "../../../shared/components/Spinner";
 import { useAuthorPayments } from "../hooks/useAuthorPayments";
 import ConfirmDialog from "../components/ConfirmDialog";
@@ -21,6 +22,13 @@ export default function AuthorPaymentsPage() {
     showAll,
     toggleShowAll,
 
+    ordering,
+    changeOrdering,
+    unpaidOnly,
+    toggleUnpaidOnly,
+    search,
+    changeSearch,
+
     confirm,
     paying,
     openConfirm,
@@ -52,6 +60,31 @@ export default function AuthorPaymentsPage() {
         </div>
       </div>
 
+      <div className="mb-4 flex flex-wrap items-center gap-3">
+        <div className="w-64">
+          <Input
+            value={search}
+            onChange={(e) => changeSearch(e.target.value)}
+            placeholder="Search authors"
+          />
+        </div>
+
+        <select
+          value={ordering}
+          onChange={(e) => changeOrdering(e.target.value)}
+          className="rounded-xl border border-slate-200 bg-white px-3 py-2 text-slate-900"
+        >
+          <option value="name">Name (A–Z)</option>
+          <option value="-unpaid_total">Unpaid (highest first)</option>
+          <option value="unpaid_total">Unpaid (lowest first)</option>
+        </select>
+
+        <label className="flex items-center gap-2 text-sm text-slate-600">
+          <input type="checkbox" checked={unpaidOnly} onChange={toggleUnpaidOnly} />
+          Only authors with unpaid royalties
+        </label>
+      </div>
+
       {loading ? (
         <div className="flex items-center gap-2 text-slate-500">
           <Spinner />
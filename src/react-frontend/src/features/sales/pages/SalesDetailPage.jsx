@@ -73,6 +73,7 @@ function saleToRow(sale, bookData) {
 
   const author_royalties = {};
   const author_paid = {};
+  const author_versions = {};
   const overrides = {};
 
   // ✅ build a lookup so we can determine whether a saved royalty differs from default
@@ -86,6 +87,7 @@ function saleToRow(sale, bookData) {
 
     author_royalties[id] = String(a.royalty_amount);
     author_paid[id] = !!a.paid;
+    author_versions[id] = a.version;
 
     // ✅ If saved royalty differs from the default computed royalty, mark as overridden
     const rate = rateByAuthorId[id];
@@ -113,6 +115,9 @@ function saleToRow(sale, bookData) {
     author_royalties,
     author_paid,
     overrides,
+    // ✅ optimistic concurrency: the server rejects the save (409) if someone else changed it
+    version: sale.version,
+    author_versions,
   };
 }
 
@@ -197,6 +202,8 @@ export default function SalesDetailPage() {
       publisher_revenue: String(row.publisher_revenue),
       author_royalties: row.author_royalties || {},
       author_paid: row.author_paid || {},
+      version: row.version,
+      author_versions: row.author_versions || {},
     };
   }, [row]);
 